@@ -0,0 +1,79 @@
+"""Benchmark token usage and latency when sending several pages per LLM request.
+
+Usage (from the project root):
+
+    uv run python -m evals.benchmark_pages_per_request [PDF ...] [--pages-per-request 1,2,4]
+
+Each PDF (by default the PDFs of the evals dataset) is converted once for every value of
+``--pages-per-request`` and a table of the token usage, number of LLM requests and time spent
+interpreting is printed. Run the evals with the chosen value to check the accuracy is unchanged.
+"""
+
+import argparse
+from pathlib import Path
+
+from dotenv import load_dotenv
+from rich.console import Console
+from rich.table import Table
+
+from evals.datasets.pdf_to_questionnaire_dataset import load_dataset
+from survaize.config.interpreter_config import InterpreterConfig
+from survaize.config.llm_config import create_llm_config_from_env
+from survaize.interpreter.ai_interpreter import AIQuestionnaireInterpreter
+from survaize.interpreter.usage import track_usage
+from survaize.reader.pdf_reader import PDFReader
+from survaize.telemetry.profiler import Profiler, profiling
+
+load_dotenv()
+
+
+def _stage_totals(profiler: Profiler, stage: str) -> tuple[int, float]:
+    records = [record for record in profiler.records if record.name == stage]
+    return len(records), sum(record.wall_seconds for record in records)
+
+
+def run_benchmark(pdf_paths: list[Path], pages_per_request_values: list[int]) -> None:
+    config = create_llm_config_from_env()
+    table = Table(title="Pages per request benchmark")
+    for column in ("PDF", "Pages/request", "LLM requests", "Prompt tokens", "Completion tokens", "Interpret time"):
+        table.add_column(column, justify="left" if column == "PDF" else "right")
+
+    for pdf_path in pdf_paths:
+        for pages_per_request in pages_per_request_values:
+            interpreter = AIQuestionnaireInterpreter(
+                llm_config=config, interpreter_config=InterpreterConfig(pages_per_request=pages_per_request)
+            )
+            profiler = Profiler()
+            with track_usage() as usage, profiling(profiler, trace_memory=False), open(pdf_path, "rb") as f:
+                PDFReader(interpreter).read(f)
+            requests, _ = _stage_totals(profiler, "llm_request")
+            _, interpret_seconds = _stage_totals(profiler, "interpret_page")
+            table.add_row(
+                pdf_path.name,
+                str(pages_per_request),
+                str(requests),
+                str(usage.prompt_tokens),
+                str(usage.completion_tokens),
+                f"{interpret_seconds:.1f}s",
+            )
+
+    Console().print(table)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("pdfs", nargs="*", type=Path, help="PDFs to convert, defaults to the evals dataset")
+    parser.add_argument(
+        "--pages-per-request",
+        default="1,2,4",
+        help="Comma separated values of pages per request to compare (default: 1,2,4)",
+    )
+    args = parser.parse_args()
+
+    pdf_paths: list[Path] = args.pdfs or [case.inputs for case in load_dataset().cases]
+    pages_per_request_values = [int(value) for value in args.pages_per_request.split(",")]
+    run_benchmark(pdf_paths, pages_per_request_values)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,10 @@
+import os
 from pathlib import Path
 
 from dotenv import load_dotenv
 
 from evals.datasets.pdf_to_questionnaire_dataset import load_dataset
+from survaize.config.interpreter_config import InterpreterConfig
 from survaize.config.llm_config import create_llm_config_from_env
 from survaize.interpreter.ai_interpreter import AIQuestionnaireInterpreter
 from survaize.model.questionnaire import Questionnaire
@@ -13,7 +15,10 @@ config = create_llm_config_from_env()
 
 async def convert_questionnaire(pdf_path: Path) -> Questionnaire:
 
-    interpreter = AIQuestionnaireInterpreter(llm_config=config)
+    interpreter = AIQuestionnaireInterpreter(
+        llm_config=config,
+        interpreter_config=InterpreterConfig(pages_per_request=int(os.environ.get("SURVAIZE_PAGES_PER_REQUEST", "1"))),
+    )
     pdf_reader = PDFReader(interpreter)
     with open(pdf_path, "rb") as f:
         questionnaire = pdf_reader.read(f)
@@ -0,0 +1,20 @@
+from dataclasses import dataclass
+from pathlib import Path
+
+
+@dataclass(frozen=True)
+class InterpreterConfig:
+    """Options controlling how scanned questionnaires are interpreted."""
+
+    # Directory to save a checkpoint to after each page so that failed interpretations
+    # can be resumed, no checkpoints are saved if None
+    checkpoint_dir: Path | None = None
+    # Continue from the last checkpoint of the same document instead of starting over
+    resume: bool = False
+    # Directory to cache the interpretation of each page in, so that revisions of a document
+    # only send the pages that changed (and the pages depending on them) to the LLM.
+    # Pages are not cached if None
+    page_cache_dir: Path | None = None
+    # Number of consecutive pages after the first sent to the LLM in a single request. Larger
+    # values send the fixed instructions less often at the cost of larger requests
+    pages_per_request: int = 1
@@ -1,6 +1,9 @@
+import json
 import os
-from dataclasses import dataclass
+from dataclasses import dataclass, replace
 from enum import Enum
+from pathlib import Path
+from typing import cast
 
 
 class OpenAIProviderType(Enum):
@@ -8,6 +11,31 @@ class OpenAIProviderType(Enum):
     AZURE = "azure"
 
 
+class RoutingPolicy(Enum):
+    """How requests are distributed across the endpoints of a pool."""
+
+    LEAST_OUTSTANDING = "least-outstanding"
+    WEIGHTED_ROUND_ROBIN = "weighted-round-robin"
+
+
+DEFAULT_AZURE_API_VERSION = "2025-04-01-preview"
+
+
+@dataclass(frozen=True)
+class LLMEndpoint:
+    """An additional deployment requests are balanced across, e.g. in another Azure region."""
+
+    api_url: str | None
+    # Defaults to the API key of the LLMConfig
+    api_key: str | None = None
+    api_version: str | None = None
+    provider: OpenAIProviderType = OpenAIProviderType.OPENAI
+    # Share of the requests relative to the other endpoints, the main endpoint has a weight of 1
+    weight: int = 1
+    # Model used for all requests sent to this endpoint instead of the configured models
+    model: str | None = None
+
+
 @dataclass(frozen=True)
 class LLMConfig:
     """Configuration for the OpenAI API."""
@@ -17,6 +45,123 @@ class LLMConfig:
     api_url: str | None
     model: str
     provider: OpenAIProviderType = OpenAIProviderType.OPENAI
+    # Maximum number of concurrent requests to the API per interpreter, unlimited if None
+    max_concurrent_requests: int | None = None
+    # Adjust the number of concurrent requests, up to max_concurrent_requests, based on latency
+    # and overload errors instead of using a fixed limit
+    adaptive_concurrency: bool = False
+    # Cheaper/faster models tried before `model`, in order. A page is escalated to the next
+    # model, ending with `model`, when a model fails to produce a usable result
+    cascade_models: tuple[str, ...] = ()
+    # Rate limits of the deployment shared by all conversions in the process, unlimited if None
+    requests_per_minute: int | None = None
+    tokens_per_minute: int | None = None
+    # Send a duplicate of a request that is slower than this percentile (e.g. 0.95) of recent
+    # request latencies and use whichever response arrives first, no hedging if None
+    hedge_percentile: float | None = None
+    # Deployments used together with the one above, each with its own quota. The model names
+    # must be deployed on each of them
+    endpoints: tuple[LLMEndpoint, ...] = ()
+    routing_policy: RoutingPolicy = RoutingPolicy.LEAST_OUTSTANDING
+    # Deployment, possibly of another provider, used while the circuit breakers of all the
+    # deployments above are open because they keep failing
+    fallback: LLMEndpoint | None = None
+    # Seconds a failing deployment's circuit breaker stays open before a probe request is sent
+    circuit_open_seconds: float = 30.0
+    # Successful requests slower than this count as failures for the circuit breaker
+    slow_request_seconds: float | None = None
+    # Seconds to wait to connect to the API and for a response to each request
+    connect_timeout: float = 10.0
+    read_timeout: float = 180.0
+    # Number of times requests failing on every deployment with connection errors, timeouts, 429 or
+    # 5xx responses are retried. The interpreter retries them rather than the OpenAI SDK
+    sdk_max_retries: int = 2
+    # Seconds allowed for all the LLM requests of a page, including validation retries and
+    # escalations, after which the conversion fails. Unlimited if None
+    page_deadline_seconds: float | None = None
+
+    @property
+    def models(self) -> tuple[str, ...]:
+        """Models to try for each page in order, the last one being `model`."""
+        return (*self.cascade_models, self.model)
+
+    def endpoint_config(self, endpoint: LLMEndpoint | None) -> "LLMConfig":
+        """Configuration for a single deployment.
+
+        Args:
+            endpoint: One of the endpoints or the fallback, None for the main deployment
+
+        Returns:
+            This configuration with the connection settings of the endpoint and no other endpoints
+        """
+        main = replace(self, endpoints=(), fallback=None)
+        if endpoint is None:
+            return main
+        return replace(
+            main,
+            api_url=endpoint.api_url,
+            api_key=endpoint.api_key or self.api_key,
+            api_version=endpoint.api_version
+            or (DEFAULT_AZURE_API_VERSION if endpoint.provider == OpenAIProviderType.AZURE else None),
+            provider=endpoint.provider,
+            model=endpoint.model or self.model,
+        )
+
+
+def parse_model_list(models: str | None) -> tuple[str, ...]:
+    """Parse a comma separated list of model names.
+
+    Args:
+        models: Comma separated model names, e.g. "gpt-4.1-nano,gpt-4.1-mini"
+
+    Returns:
+        Tuple of model names, empty if models is None or blank
+    """
+    return tuple(model.strip() for model in (models or "").split(",") if model.strip())
+
+
+def load_endpoints(path: Path) -> tuple[LLMEndpoint, ...]:
+    """Load additional endpoints from a JSON file.
+
+    The file contains a list of objects with an ``api_url`` and optionally ``api_key`` (or
+    ``api_key_env``, the name of an environment variable holding the key), ``api_version``,
+    ``provider`` ("openai" or "azure"), ``weight`` and ``model``.
+
+    Args:
+        path: Path of the JSON file
+
+    Returns:
+        The endpoints
+
+    Raises:
+        ValueError: If the file is not a list of valid endpoints
+    """
+    data: object = json.loads(path.read_text(encoding="utf-8"))
+    if not isinstance(data, list):
+        raise ValueError(f"{path} must contain a list of endpoints")
+    endpoints: list[LLMEndpoint] = []
+    for item in cast(list[object], data):
+        entry = cast(dict[str, object], item) if isinstance(item, dict) else {}
+        if not isinstance(entry.get("api_url"), str):
+            raise ValueError(f"Each endpoint in {path} must be an object with an api_url")
+        api_key_env = entry.get("api_key_env")
+        api_key = os.environ.get(str(api_key_env)) if api_key_env else entry.get("api_key")
+        api_version = entry.get("api_version")
+        model = entry.get("model")
+        weight = entry.get("weight", 1)
+        if not isinstance(weight, int) or weight < 1:
+            raise ValueError(f"The weight of endpoint {entry['api_url']} in {path} must be a positive integer")
+        endpoints.append(
+            LLMEndpoint(
+                api_url=str(entry["api_url"]),
+                api_key=str(api_key) if api_key else None,
+                api_version=str(api_version) if api_version else None,
+                provider=OpenAIProviderType(entry.get("provider", OpenAIProviderType.OPENAI.value)),
+                weight=weight,
+                model=str(model) if model else None,
+            )
+        )
+    return tuple(endpoints)
 
 
 def create_llm_config_from_env() -> LLMConfig:
@@ -36,6 +181,29 @@ def create_llm_config_from_env() -> LLMConfig:
     api_version = os.environ.get("OPENAI_API_VERSION")
     api_url = os.environ.get("OPENAI_API_URL")
     api_model = os.environ.get("OPENAI_API_MODEL", "gpt-4o")
+    cascade_models = parse_model_list(os.environ.get("OPENAI_CASCADE_MODELS"))
+    requests_per_minute = os.environ.get("OPENAI_REQUESTS_PER_MINUTE")
+    tokens_per_minute = os.environ.get("OPENAI_TOKENS_PER_MINUTE")
+    adaptive_concurrency = os.environ.get("OPENAI_ADAPTIVE_CONCURRENCY", "").lower() in ("1", "true", "yes")
+    hedge_percentile = os.environ.get("OPENAI_HEDGE_PERCENTILE")
+    endpoints_file = os.environ.get("OPENAI_ENDPOINTS_FILE")
+    routing_policy = RoutingPolicy(os.environ.get("OPENAI_ROUTING_POLICY", RoutingPolicy.LEAST_OUTSTANDING.value))
+    connect_timeout = os.environ.get("OPENAI_CONNECT_TIMEOUT")
+    read_timeout = os.environ.get("OPENAI_REQUEST_TIMEOUT")
+    sdk_max_retries = os.environ.get("OPENAI_MAX_RETRIES")
+    page_deadline_seconds = os.environ.get("SURVAIZE_PAGE_DEADLINE")
+    fallback_api_url = os.environ.get("OPENAI_FALLBACK_API_URL")
+    fallback = (
+        LLMEndpoint(
+            api_url=fallback_api_url,
+            api_key=os.environ.get("OPENAI_FALLBACK_API_KEY"),
+            api_version=os.environ.get("OPENAI_FALLBACK_API_VERSION"),
+            provider=OpenAIProviderType(os.environ.get("OPENAI_FALLBACK_PROVIDER", "openai")),
+            model=os.environ.get("OPENAI_FALLBACK_MODEL"),
+        )
+        if fallback_api_url
+        else None
+    )
 
     provider = OpenAIProviderType.AZURE if api_provider == "azure" else OpenAIProviderType.OPENAI
 
@@ -43,7 +211,7 @@ def create_llm_config_from_env() -> LLMConfig:
         if not api_url:
             raise ValueError("OPENAI_API_URL environment variable is required for Azure provider")
         if not api_version:
-            api_version = "2024-05-01-preview"
+            api_version = DEFAULT_AZURE_API_VERSION
 
     return LLMConfig(
         api_key=api_key,
@@ -51,4 +219,16 @@ def create_llm_config_from_env() -> LLMConfig:
         api_url=api_url,
         model=api_model,
         provider=provider,
+        cascade_models=cascade_models,
+        requests_per_minute=int(requests_per_minute) if requests_per_minute else None,
+        tokens_per_minute=int(tokens_per_minute) if tokens_per_minute else None,
+        adaptive_concurrency=adaptive_concurrency,
+        hedge_percentile=float(hedge_percentile) if hedge_percentile else None,
+        endpoints=load_endpoints(Path(endpoints_file)) if endpoints_file else (),
+        routing_policy=routing_policy,
+        fallback=fallback,
+        connect_timeout=float(connect_timeout) if connect_timeout else LLMConfig.connect_timeout,
+        read_timeout=float(read_timeout) if read_timeout else LLMConfig.read_timeout,
+        sdk_max_retries=int(sdk_max_retries) if sdk_max_retries else LLMConfig.sdk_max_retries,
+        page_deadline_seconds=float(page_deadline_seconds) if page_deadline_seconds else None,
     )
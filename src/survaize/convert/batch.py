@@ -0,0 +1,235 @@
+"""Module for converting many questionnaires concurrently."""
+
+import glob
+import json
+import logging
+import time
+from collections.abc import Callable, Iterable
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Literal
+
+from survaize.convert.converter import QuestionnaireConverter
+from survaize.interpreter.deadline import PageDeadlineExceededError
+from survaize.interpreter.usage import LLMUsage, track_usage
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class BatchItemResult:
+    """Outcome of converting a single file in a batch."""
+
+    input_file: Path
+    output_file: Path
+    status: Literal["succeeded", "failed"]
+    duration_seconds: float
+    usage: LLMUsage
+    error: str | None = None
+    # Structured description of the error, e.g. which page exceeded its deadline
+    error_details: dict[str, object] | None = None
+
+    def to_dict(self) -> dict[str, object]:
+        return {
+            "input_file": str(self.input_file),
+            "output_file": str(self.output_file),
+            "status": self.status,
+            "duration_seconds": round(self.duration_seconds, 3),
+            "usage": _usage_to_dict(self.usage),
+            "error": self.error,
+            "error_details": self.error_details,
+        }
+
+
+@dataclass
+class BatchSummary:
+    """Outcome of converting a batch of files."""
+
+    output_format: str
+    started_at: datetime
+    duration_seconds: float = 0.0
+    results: list[BatchItemResult] = field(default_factory=list)
+
+    @property
+    def succeeded(self) -> int:
+        return sum(1 for result in self.results if result.status == "succeeded")
+
+    @property
+    def failed(self) -> int:
+        return sum(1 for result in self.results if result.status == "failed")
+
+    @property
+    def usage(self) -> LLMUsage:
+        usage = LLMUsage()
+        for result in self.results:
+            usage.merge(result.usage)
+        return usage
+
+    def to_dict(self) -> dict[str, object]:
+        return {
+            "output_format": self.output_format,
+            "started_at": self.started_at.isoformat(),
+            "duration_seconds": round(self.duration_seconds, 3),
+            "succeeded": self.succeeded,
+            "failed": self.failed,
+            "usage": _usage_to_dict(self.usage),
+            "files": [result.to_dict() for result in self.results],
+        }
+
+    def save(self, path: Path) -> None:
+        """Save the summary as JSON.
+
+        Args:
+            path: Path of the JSON file to write
+        """
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(self.to_dict(), indent=2), encoding="utf-8")
+
+
+def _usage_to_dict(usage: LLMUsage) -> dict[str, object]:
+    return {
+        "prompt_tokens": usage.prompt_tokens,
+        "completion_tokens": usage.completion_tokens,
+        "total_tokens": usage.total_tokens,
+        "cached_tokens": usage.cached_tokens,
+        "pages_by_model": usage.pages_by_model,
+        "requests": usage.requests,
+        "hedged_requests": usage.hedged_requests,
+        "hedge_overhead_tokens": usage.hedge_overhead_tokens,
+        "image_bytes": usage.image_bytes,
+    }
+
+
+def find_input_files(source: str, input_formats: Iterable[str]) -> list[Path]:
+    """Find the questionnaires to convert.
+
+    Args:
+        source: A directory, in which case all files in it with a supported extension are
+            used, or a glob pattern such as ``surveys/**/*.pdf``
+        input_formats: Supported input formats, used as file extensions
+
+    Returns:
+        Sorted list of input files
+    """
+    suffixes = {f".{input_format.lower()}" for input_format in input_formats}
+    source_path = Path(source)
+    if source_path.is_dir():
+        candidates = source_path.iterdir()
+    else:
+        candidates = (Path(match) for match in glob.glob(source, recursive=True))
+    return sorted(path for path in candidates if path.is_file() and path.suffix.lower() in suffixes)
+
+
+class BatchConverter:
+    """Converts many questionnaires concurrently, continuing past failed files."""
+
+    def __init__(self, converter: QuestionnaireConverter, max_workers: int = 4):
+        """Initialize the batch converter.
+
+        Args:
+            converter: Converter used for each file, shared by all workers
+            max_workers: Maximum number of files converted at the same time
+        """
+        self.converter: QuestionnaireConverter = converter
+        self.max_workers: int = max_workers
+
+    def convert(
+        self,
+        input_files: list[Path],
+        output_dir: Path,
+        output_format: str,
+        progress_callback: Callable[[Path, int, str], None] | None = None,
+        result_callback: Callable[[BatchItemResult], None] | None = None,
+    ) -> BatchSummary:
+        """Convert questionnaires to the specified format.
+
+        Args:
+            input_files: Files to convert
+            output_dir: Directory to write the converted questionnaires to
+            output_format: Output format
+            progress_callback: Optional callback reporting the progress percentage and
+                a status message for an input file
+            result_callback: Optional callback called as each file is finished
+
+        Returns:
+            Summary with the result of each file, in the order of ``input_files``
+        """
+        summary = BatchSummary(output_format=output_format, started_at=datetime.now(UTC))
+        start = time.perf_counter()
+        output_files = self._output_files(input_files, output_dir, output_format)
+
+        results: dict[Path, BatchItemResult] = {}
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="survaize-batch") as executor:
+            futures = [
+                executor.submit(
+                    self._convert_one, input_file, output_files[input_file], output_format, progress_callback
+                )
+                for input_file in input_files
+            ]
+            for future in as_completed(futures):
+                result = future.result()
+                results[result.input_file] = result
+                if result_callback:
+                    result_callback(result)
+
+        summary.results = [results[input_file] for input_file in input_files]
+        summary.duration_seconds = time.perf_counter() - start
+        logger.info(
+            "Batch finished in %.1fs - succeeded: %s, failed: %s, total tokens: %s",
+            summary.duration_seconds,
+            summary.succeeded,
+            summary.failed,
+            summary.usage.total_tokens,
+        )
+        return summary
+
+    def _convert_one(
+        self,
+        input_file: Path,
+        output_file: Path,
+        output_format: str,
+        progress_callback: Callable[[Path, int, str], None] | None,
+    ) -> BatchItemResult:
+        def progress(percent: int, message: str) -> None:
+            if progress_callback:
+                progress_callback(input_file, percent, message)
+
+        start = time.perf_counter()
+        with track_usage() as usage:
+            try:
+                self.converter.convert(input_file, output_file, output_format, progress)
+            except Exception as e:
+                logger.exception(f"Failed to convert {input_file}")
+                return BatchItemResult(
+                    input_file=input_file,
+                    output_file=output_file,
+                    status="failed",
+                    duration_seconds=time.perf_counter() - start,
+                    usage=usage,
+                    error=str(e),
+                    error_details=e.to_dict() if isinstance(e, PageDeadlineExceededError) else None,
+                )
+        return BatchItemResult(
+            input_file=input_file,
+            output_file=output_file,
+            status="succeeded",
+            duration_seconds=time.perf_counter() - start,
+            usage=usage,
+        )
+
+    def _output_files(self, input_files: list[Path], output_dir: Path, output_format: str) -> dict[Path, Path]:
+        """Choose an output path for each input, making names unique when input stems collide."""
+        output_files: dict[Path, Path] = {}
+        used_names: set[str] = set()
+        for input_file in input_files:
+            name = input_file.stem
+            counter = 1
+            while name.lower() in used_names:
+                counter += 1
+                name = f"{input_file.stem}_{counter}"
+            used_names.add(name.lower())
+            # CSPro output is a directory of files, JSON a single file
+            output_files[input_file] = output_dir / (f"{name}.json" if output_format == "json" else name)
+        return output_files
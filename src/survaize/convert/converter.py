@@ -1,10 +1,14 @@
 """Module for orchestrating the questionnaire conversion process."""
 
 import logging
+from collections.abc import Callable
 from pathlib import Path
 
+from survaize.config.interpreter_config import InterpreterConfig
 from survaize.config.llm_config import LLMConfig
 from survaize.reader.reader_factory import ReaderFactory
+from survaize.telemetry.profiler import profile_stage
+from survaize.writer.output_sink import DirectorySink
 from survaize.writer.writer_factory import WriterFactory
 
 logger = logging.getLogger(__name__)
@@ -13,36 +17,61 @@ logger = logging.getLogger(__name__)
 class QuestionnaireConverter:
     """Orchestrates the conversion of questionnaires."""
 
-    def __init__(self, llm_config: LLMConfig):
+    def __init__(self, llm_config: LLMConfig | None = None, interpreter_config: InterpreterConfig | None = None):
         """Initialize the converter.
         Args:
-            llm_config: Configuration for the LLM (API key, version, URL, deployment)
+            llm_config: Configuration for the LLM (API key, version, URL, deployment), only
+                needed to convert formats that are interpreted with an LLM such as PDF
+            interpreter_config: Options for interpreting scanned questionnaires, such as
+                where to save checkpoints and whether to resume from them
         """
 
-        self.reader_factory: ReaderFactory = ReaderFactory(llm_config)
+        self.reader_factory: ReaderFactory = ReaderFactory(llm_config, interpreter_config)
         self.writer_factory: WriterFactory = WriterFactory()
 
-    def convert(self, input_file: Path, output_file: Path, output_format: str):
+    def input_format(self, input_file: Path) -> str:
+        """Get the input format of a file from its extension."""
+        return input_file.suffix.lower().replace(".", "")
+
+    def requires_llm(self, input_file: Path) -> bool:
+        """Check whether converting a file requires an LLM configuration."""
+        return self.reader_factory.requires_llm(self.input_format(input_file))
+
+    def convert(
+        self,
+        input_file: Path,
+        output_file: Path,
+        output_format: str,
+        progress_callback: Callable[[int, str], None] | None = None,
+    ):
         """Convert a questionnaire to the specified format.
 
         Args:
             input_file: Path to the input file
             output_file: Path to file to write the output to
             output_format: Output format
+            progress_callback: Optional callback reporting progress percentage
+                and a status message while the input file is read
 
         Returns:
             Path to the generated output file
         """
+        # Imported here as logfire is slow to import and not needed to start the CLI
+        import logfire
+
         output_file.parent.mkdir(parents=True, exist_ok=True)
 
-        input_format_str = input_file.suffix.lower().replace(".", "")
+        input_format_str = self.input_format(input_file)
         reader = self.reader_factory.get(input_format_str)
 
-        logger.info(f"Reading questionnaire: {input_file}")
-        with open(input_file, "rb") as f:
-            questionnaire = reader.read(f)
+        # Reading and writing a file are traced together as one job
+        with logfire.span("Convert {input_file}", input_file=str(input_file), output_format=output_format):
+            logger.info(f"Reading questionnaire: {input_file}")
+            with open(input_file, "rb") as f, profile_stage("read", input_format=input_format_str):
+                questionnaire = reader.read(f, progress_callback)
 
-        writer = self.writer_factory.get(output_format)
+            writer = self.writer_factory.get(output_format)
 
-        logger.info(f"Writing converted questionnaire: {output_file}")
-        writer.write(questionnaire, output_file)
+            logger.info(f"Writing converted questionnaire: {output_file}")
+            with profile_stage("write", output_format=output_format):
+                writer.write(questionnaire, DirectorySink(output_file.parent), output_file.name)
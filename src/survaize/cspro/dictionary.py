@@ -1,8 +1,9 @@
-from pathlib import Path
 from typing import Literal
 
 from pydantic import BaseModel
 
+from survaize.writer.output_sink import OutputSink
+
 
 class DictionaryLabel(BaseModel):
     """Represents a label in CSPro dictionary."""
@@ -93,11 +94,11 @@ class CSProDictionary(BaseModel):
     relativePositions: bool = True
     levels: list[DictionaryLevel]
 
-    def save(self, file_path: Path) -> None:
+    def save(self, sink: OutputSink, name: str) -> None:
         """Save the dictionary to a file.
 
         Args:
-            file_path: The path to save the dictionary file to.
+            sink: The output sink to write the dictionary file to.
+            name: The name of the dictionary file within the sink.
         """
-        with open(file=file_path, mode="w") as f:
-            f.write(self.model_dump_json(indent=2, exclude_none=True))
+        sink.write_text(name, self.model_dump_json(indent=2, exclude_none=True))
@@ -1,9 +1,11 @@
 from enum import Enum
-from pathlib import Path
+from io import StringIO
 from typing import TextIO
 
 from pydantic import BaseModel, Field
 
+from survaize.writer.output_sink import OutputSink
+
 
 class FormItemType(Enum):
     GROUP = 1
@@ -99,20 +101,25 @@ class FormFile(BaseModel):
     forms: list[Form] = Field(default_factory=list, description="Forms in the form file")
     levels: list[FormLevel] = Field(default_factory=list, description="Levels in the form file")
 
-    def save(self, output_path: Path) -> None:
-        """Save the CSPro form file to disk in INI-like format.
+    def save(self, sink: OutputSink, name: str) -> None:
+        """Save the CSPro form file in INI-like format.
 
-        This method writes the FormFile object to disk in the INI-like format expected
+        This method writes the FormFile object in the INI-like format expected
         by CSPro. It includes all form components: forms, groups, fields, texts, and rosters.
+
+        Args:
+            sink: The output sink to write the form file to.
+            name: The name of the form file within the sink.
         """
-        with open(output_path, "w", encoding="utf-8") as f:
-            f.write("\ufeff")  # UTF-8 BOM
-            self._write_formfile_section(f)
-            self._write_dictionaries_section(f)
-            self._write_forms_section(f)
-            self._write_levels_section(
-                f,
-            )
+        f = StringIO()
+        f.write("\ufeff")  # UTF-8 BOM
+        self._write_formfile_section(f)
+        self._write_dictionaries_section(f)
+        self._write_forms_section(f)
+        self._write_levels_section(
+            f,
+        )
+        sink.write_text(name, f.getvalue())
 
     def _write_formfile_section(self, f: TextIO):
         f.write("[FormFile]\r\n")
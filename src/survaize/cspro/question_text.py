@@ -1,8 +1,10 @@
-from pathlib import Path
+from io import StringIO
 
 import yaml
 from pydantic import BaseModel
 
+from survaize.writer.output_sink import OutputSink
+
 
 class QsfLanguage(BaseModel):
     """Represents a language in the QSF file."""
@@ -48,16 +50,21 @@ class QsfFile(BaseModel):
     styles: list[QsfStyle]
     questions: list[QsfQuestion]
 
-    def save(self, path: Path):
-        """Convert the QSF file to YAML format."""
-        # Write the YAML file
-        with open(path, "w", encoding="utf-8") as f:
-            f.write("---\n")  # Add document start marker
-            yaml.dump(
-                self.model_dump(mode="json"),
-                f,
-                default_flow_style=False,
-                sort_keys=False,
-                allow_unicode=True,
-            )
-            f.write("...")  # Add document end marker
+    def save(self, sink: OutputSink, name: str):
+        """Convert the QSF file to YAML format.
+
+        Args:
+            sink: The output sink to write the QSF file to.
+            name: The name of the QSF file within the sink.
+        """
+        f = StringIO()
+        f.write("---\n")  # Add document start marker
+        yaml.dump(
+            self.model_dump(mode="json"),
+            f,
+            default_flow_style=False,
+            sort_keys=False,
+            allow_unicode=True,
+        )
+        f.write("...")  # Add document end marker
+        sink.write_text(name, f.getvalue())
@@ -1,28 +1,55 @@
 """Module for interpreting questionnaire documents using LLMs."""
 
 import base64
+import functools
 import json
 import logging
-from collections.abc import Callable, Iterable
+import threading
+from collections.abc import Callable, Generator, Iterable
+from concurrent.futures import Future
+from contextlib import contextmanager, nullcontext
 from dataclasses import dataclass
 from io import BytesIO
 from typing import TypeVar
 
 import logfire
-from openai import AzureOpenAI, OpenAI
+from openai import NOT_GIVEN, AzureOpenAI, OpenAI, RateLimitError
 from openai.types.chat import (
+    ChatCompletion,
     ChatCompletionContentPartParam,
     ChatCompletionMessageParam,
 )
 from PIL import Image
 from pydantic import BaseModel
 
+from survaize.config.interpreter_config import InterpreterConfig
 from survaize.config.llm_config import LLMConfig
+from survaize.interpreter.checkpoint import CheckpointStore, InterpretationCheckpoint, checkpoint_key
+from survaize.interpreter.circuit_breaker import shared_circuit_breaker
+from survaize.interpreter.concurrency import AdaptiveConcurrencyLimiter, shared_concurrency_limiter
+from survaize.interpreter.deadline import page_deadline, request_timeout, start_attempt
+from survaize.interpreter.endpoint_pool import EndpointPool, PoolMember
+from survaize.interpreter.hedging import HedgedResult, shared_request_hedger
 from survaize.interpreter.openai_recorder import (
     RecordingClient,
     create_openai_client,
 )
+from survaize.interpreter.page_cache import PageResultCache
+from survaize.interpreter.rate_limiter import (
+    RateLimiter,
+    RateLimitReservation,
+    estimate_request_tokens,
+    retry_after_seconds,
+    shared_rate_limiter,
+)
 from survaize.interpreter.scanned_questionnaire import ScannedQuestionnaire
+from survaize.interpreter.usage import (
+    LLMUsage,
+    record_hedge_overhead,
+    record_page_model,
+    record_request,
+    record_usage,
+)
 from survaize.model.questionnaire import (
     PartialQuestionnaire,
     Questionnaire,
@@ -31,41 +58,147 @@ from survaize.model.questionnaire import (
     TrailingSectionRef,
     merge_questionnaires,
 )
+from survaize.telemetry.metrics import (
+    LLM_REQUESTS,
+    LLM_RETRIES,
+    LLM_TOKENS,
+    LLM_VALIDATION_FAILURES,
+    STAGE_DURATION,
+)
+from survaize.telemetry.profiler import profile_stage
 
 # Configure logger
 logger = logging.getLogger(__name__)
 
 STRUCTURED_RESPONSE_TYPE = TypeVar("STRUCTURED_RESPONSE_TYPE", bound="BaseModel")
+PAGE_RESPONSE_TYPE = TypeVar("PAGE_RESPONSE_TYPE", Questionnaire, PartialQuestionnaire)
+
+# Highest concurrency the adaptive limiter grows to when max_concurrent_requests is not set
+_MAX_ADAPTIVE_CONCURRENCY = 32
+
+# Number of times a request rejected with a 429 is retried after pausing for its retry-after delay
+_MAX_RATE_LIMIT_RETRIES = 5
+
+# A page with at least this much OCR text is expected to contain questions, a model of the
+# cascade that finds none is assumed to have missed them
+_MIN_OCR_CHARACTERS_FOR_QUESTIONS = 200
 
 
 @dataclass
-class LLMUsage:
-    """Token usage information."""
+class _Deployment:
+    """Client and request limits of one deployment of the models."""
 
-    prompt_tokens: int = 0
-    completion_tokens: int = 0
+    # Identifies the deployment, e.g. its URL
+    endpoint: str
+    client: AzureOpenAI | OpenAI | RecordingClient
+    # Model used for all requests instead of the requested one, e.g. for a fallback of another provider
+    model: str | None
+    concurrency_limiter: AdaptiveConcurrencyLimiter | None
+    rate_limiter: RateLimiter | None
 
-    def add(self, prompt: int, completion: int) -> None:
-        self.prompt_tokens += prompt
-        self.completion_tokens += completion
 
-    @property
-    def total_tokens(self) -> int:
-        return self.prompt_tokens + self.completion_tokens
+def _looks_incomplete(response: Questionnaire | PartialQuestionnaire, ocr_texts: list[str]) -> bool:
+    """Heuristic check for a result that missed the content of its pages."""
+    question_count = sum(len(section.questions) for section in response.sections)
+    ocr_characters = sum(len("".join(text.split())) for text in ocr_texts)
+    return question_count == 0 and ocr_characters >= _MIN_OCR_CHARACTERS_FOR_QUESTIONS
+
+
+def _record_hedge_overhead(usage: LLMUsage, request: "Future[ChatCompletion]") -> None:
+    """Count the tokens of a discarded duplicate request once it completes.
+
+    It may complete after the usage of the document was reported, its tokens are then missing from it.
+    """
+    if request.cancelled() or request.exception() is not None:
+        return
+    total_tokens = getattr(getattr(request.result(), "usage", None), "total_tokens", None)
+    if isinstance(total_tokens, int):
+        usage.add_hedge_overhead(total_tokens)
+        record_hedge_overhead(total_tokens)
 
 
 class AIQuestionnaireInterpreter:
     """Interprets questionnaire documents using LLM vision models."""
 
-    def __init__(self, llm_config: LLMConfig, max_retries: int = 10):
+    def __init__(
+        self,
+        llm_config: LLMConfig,
+        max_retries: int = 10,
+        interpreter_config: InterpreterConfig | None = None,
+    ):
         """Initialize the interpreter.
 
         Args:
             llm_config: Configuration/keys for the OpenAI API
+            max_retries: Maximum number of attempts to get a valid response for a page
+            interpreter_config: Options for checkpointing etc., defaults are used if None
         """
         self.llm_config: LLMConfig = llm_config
-        self.client: AzureOpenAI | OpenAI | RecordingClient = create_openai_client(llm_config)
         self.max_retries: int = max_retries
+        self.interpreter_config: InterpreterConfig = interpreter_config or InterpreterConfig()
+        self._checkpoint_store: CheckpointStore | None = (
+            CheckpointStore(self.interpreter_config.checkpoint_dir) if self.interpreter_config.checkpoint_dir else None
+        )
+        self._page_cache: PageResultCache | None = (
+            PageResultCache(self.interpreter_config.page_cache_dir) if self.interpreter_config.page_cache_dir else None
+        )
+        # Limits the number of requests in flight when the interpreter is shared by concurrent conversions
+        self._request_slots: threading.BoundedSemaphore | None = (
+            threading.BoundedSemaphore(llm_config.max_concurrent_requests)
+            if llm_config.max_concurrent_requests and not llm_config.adaptive_concurrency
+            else None
+        )
+        # Requests are balanced across the deployments and fail over to another one on errors,
+        # deployments that keep failing are skipped until their circuit breaker closes again
+        members = [self._create_pool_member(llm_config.endpoint_config(None))]
+        members += [
+            self._create_pool_member(llm_config.endpoint_config(endpoint), endpoint.weight, model=endpoint.model)
+            for endpoint in llm_config.endpoints
+        ]
+        self._deployments: EndpointPool[_Deployment] = EndpointPool(
+            members,
+            policy=llm_config.routing_policy,
+            # A single deployment waits for its rate limits in _create_deployment_completion
+            rate_limit_waits=_MAX_RATE_LIMIT_RETRIES if len(members) > 1 else 0,
+            # The pool retries failed requests instead of the clients, so that the circuit
+            # breakers see every failed attempt and retries stop at the page deadline
+            retries=llm_config.sdk_max_retries,
+            fallback=(
+                self._create_pool_member(
+                    llm_config.endpoint_config(llm_config.fallback), model=llm_config.fallback.model
+                )
+                if llm_config.fallback
+                else None
+            ),
+        )
+        self.client: AzureOpenAI | OpenAI | RecordingClient = self._deployments.members[0].value.client
+
+    @staticmethod
+    def _create_pool_member(config: LLMConfig, weight: int = 1, model: str | None = None) -> PoolMember["_Deployment"]:
+        # Identifies the deployment, a fallback model on the same URL has its own limits and breaker
+        endpoint = config.api_url or config.provider.value
+        if model:
+            endpoint = f"{endpoint} ({model})"
+        deployment = _Deployment(
+            endpoint=endpoint,
+            client=create_openai_client(config, max_retries=0),
+            model=model,
+            # Adjusts the number of requests in flight to what the deployment can handle, shared across interpreters
+            concurrency_limiter=(
+                shared_concurrency_limiter(endpoint, config.max_concurrent_requests or _MAX_ADAPTIVE_CONCURRENCY)
+                if config.adaptive_concurrency
+                else None
+            ),
+            # Keeps requests within the deployment's rate limits across all interpreters in the process
+            rate_limiter=(
+                shared_rate_limiter(endpoint, config.requests_per_minute, config.tokens_per_minute)
+                if config.requests_per_minute or config.tokens_per_minute
+                else None
+            ),
+        )
+        # Stops sending requests to the deployment while it keeps failing, shared across interpreters
+        breaker = shared_circuit_breaker(endpoint, config.circuit_open_seconds, config.slow_request_seconds)
+        return PoolMember(endpoint, deployment, weight, breaker=breaker)
 
     @logfire.instrument(extract_args=False)
     def interpret(
@@ -89,36 +222,108 @@ class AIQuestionnaireInterpreter:
         total_usage = LLMUsage()
 
         context: list[SectionFragment] = []
-        for i, (page, text) in enumerate(
-            zip(scanned_document.pages, scanned_document.extracted_text, strict=False),
-            1,
-        ):
+        start_page = 1
+
+        pages_per_request = self.interpreter_config.pages_per_request
+        checkpoint_id = (
+            checkpoint_key(scanned_document, self.llm_config.models, pages_per_request)
+            if self._checkpoint_store
+            else None
+        )
+        if self._checkpoint_store and checkpoint_id and self.interpreter_config.resume:
+            checkpoint = self._checkpoint_store.load(checkpoint_id)
+            if checkpoint:
+                logger.info(f"Resuming from checkpoint after page {checkpoint.completed_pages}/{total_pages}")
+                current_state = checkpoint.questionnaire
+                context = checkpoint.context
+                total_usage = checkpoint.usage
+                start_page = checkpoint.completed_pages + 1
+                if progress_callback:
+                    percent = int(100 * checkpoint.completed_pages / total_pages)
+                    progress_callback(percent, f"Resuming from page {start_page}/{total_pages}")
+
+        pages = list(zip(scanned_document.pages, scanned_document.extracted_text, strict=False))
+        i = start_page
+        while i <= len(pages):
+            # The first page is always sent on its own as it produces the questionnaire header,
+            # subsequent pages are sent in groups of pages_per_request
+            last = i if i == 1 else min(i + pages_per_request - 1, len(pages))
+            page_label = f"page {i}" if last == i else f"pages {i}-{last}"
+
             if progress_callback:
                 percent = int(100 * (i - 1) / total_pages)
-                progress_callback(percent, f"Examining page {i}/{total_pages}")
-
-            logger.info(f"Examining page {i}/{total_pages}")
-            if i == 1:
-                questionnaire, usage = self._process_first_page(page, text)
-                context = self._build_context(questionnaire.trailing_sections, questionnaire.sections)
-                current_state = questionnaire
-            else:
-                assert current_state is not None
-                partial, usage = self._process_subsequent_page(page, text, i, context)
-                context = self._build_context(partial.trailing_sections, partial.sections)
-                current_state = merge_questionnaires(current_state, partial)
-            total_usage.add(usage.prompt_tokens, usage.completion_tokens)
+                progress_callback(percent, f"Examining {page_label}/{total_pages}")
+
+            logger.info(f"Examining {page_label}/{total_pages}")
+            with (
+                profile_stage("interpret_page", page=i, page_count=last - i + 1),
+                logfire.span(
+                    "Interpret {page_label}", page_label=page_label, page=i, page_count=last - i + 1
+                ) as page_span,
+            ):
+                if i == 1:
+                    page, text = pages[0]
+                    questionnaire, usage = self._process_first_page(page, text)
+                    context = self._build_context(questionnaire.trailing_sections, questionnaire.sections)
+                    current_state = questionnaire
+                else:
+                    assert current_state is not None
+                    partial, usage = self._process_subsequent_pages(pages[i - 1 : last], i, context)
+                    context = self._build_context(partial.trailing_sections, partial.sections)
+                    with profile_stage("merge"), STAGE_DURATION.time(stage="merge"):
+                        current_state = merge_questionnaires(current_state, partial)
+                page_span.set_attributes(
+                    {
+                        "prompt_tokens": usage.prompt_tokens,
+                        "completion_tokens": usage.completion_tokens,
+                        "cached_tokens": usage.cached_tokens,
+                        "image_bytes": usage.image_bytes,
+                        "requests": usage.requests,
+                        # Requests after the first, to fix validation errors or escalate to another model
+                        "retries": max(0, usage.requests - 1),
+                    }
+                )
+            total_usage.merge(usage)
+
+            if self._checkpoint_store and checkpoint_id:
+                self._checkpoint_store.save(
+                    InterpretationCheckpoint(
+                        key=checkpoint_id,
+                        total_pages=total_pages,
+                        completed_pages=last,
+                        questionnaire=current_state,
+                        context=context,
+                        usage=total_usage,
+                    )
+                )
+            i = last + 1
 
         if current_state is None:
             raise ValueError("No valid questionnaire found in the document")
+        if self._checkpoint_store and checkpoint_id:
+            # The interpretation is complete so there is nothing left to resume
+            self._checkpoint_store.delete(checkpoint_id)
         if progress_callback:
             progress_callback(100, "Completed")
         logger.info(
-            "Token usage - prompt: %s, completion: %s, total: %s",
+            "Token usage - prompt: %s, completion: %s, total: %s, cached prompt: %s (%.0f%%)",
             total_usage.prompt_tokens,
             total_usage.completion_tokens,
             total_usage.total_tokens,
+            total_usage.cached_tokens,
+            100 * total_usage.cache_hit_rate,
         )
+        if len(self.llm_config.models) > 1:
+            logger.info("Pages interpreted by model: %s", total_usage.pages_by_model)
+        if self.llm_config.hedge_percentile is not None:
+            logger.info(
+                "Hedged requests: %s of %s (%.0f%%), overhead: %s tokens (%.0f%%)",
+                total_usage.hedged_requests,
+                total_usage.requests,
+                100 * total_usage.hedge_rate,
+                total_usage.hedge_overhead_tokens,
+                100 * total_usage.hedge_overhead,
+            )
         return current_state
 
     def _process_first_page(self, image: Image.Image, ocr_text: str) -> tuple[Questionnaire, LLMUsage]:
@@ -134,73 +339,183 @@ class AIQuestionnaireInterpreter:
         Raises:
             ValueError: If unable to interpret the questionnaire after max retry attempts
         """
+        system_prompt = self._create_system_prompt(first_page=True)
+        cache_key = self._page_cache_key([(image, ocr_text)], [], system_prompt)
+        cached = self._page_cache.get(cache_key, Questionnaire) if self._page_cache and cache_key else None
+        if cached:
+            logger.info("Reusing cached interpretation of page 1")
+            return cached, LLMUsage()
+
         # Encode image for API
         base64_image = self._encode_image(image)
 
         # Initialize conversation history
-        prompt = self._create_vision_prompt(1)
         message: Iterable[ChatCompletionContentPartParam] = [
-            {"type": "text", "text": prompt},
             {
                 "type": "image_url",
                 "image_url": {"url": f"data:image/png;base64,{base64_image}"},
             },
             {"type": "text", "text": f"OCR Text:\n{ocr_text}"},
         ]
-        return self._get_structured_llm_response(message, Questionnaire)
+        questionnaire, usage = self._get_page_response(system_prompt, message, Questionnaire, [ocr_text], "page 1")
+        usage.add_image(len(base64_image))
+        if self._page_cache and cache_key:
+            self._page_cache.put(cache_key, questionnaire)
+        return questionnaire, usage
 
-    def _process_subsequent_page(
+    def _process_subsequent_pages(
         self,
-        image: Image.Image,
-        ocr_text: str,
-        page_number: int,
+        pages: list[tuple[Image.Image, str]],
+        first_page_number: int,
         previous_context: list[SectionFragment],
     ) -> tuple[PartialQuestionnaire, LLMUsage]:
-        """Process a single page of the questionnaire.
-        This method is called for all pages after the first one.
+        """Process one or more consecutive pages of the questionnaire in a single request.
+        This method is called for all pages after the first one. Sending several pages at once
+        amortizes the instructions and example that are repeated in every request.
 
         Args:
-            image: PIL Image of the page
-            ocr_text: OCR extracted text from the page
-            page_number: Current page number
-            previous_context: Trailing sections from the previous page
+            pages: Consecutive pages as tuples of PIL Image and OCR extracted text
+            first_page_number: Page number of the first of the pages
+            previous_context: Trailing sections from the page before the first of the pages
 
         Returns:
-            Tuple with the partial questionnaire from this page and token usage
+            Tuple with the partial questionnaire covering all of the pages and token usage
 
         Raises:
-            ValueError: If unable to interpret the page after max retry attempts
+            ValueError: If unable to interpret the pages after max retry attempts
         """
-        # Encode image for API
-        base64_image = self._encode_image(image)
-
-        # Initialize conversation
-        prompt = self._create_vision_prompt(page_number)
+        last_page_number = first_page_number + len(pages) - 1
+        page_label = f"page {first_page_number}" if len(pages) == 1 else f"pages {first_page_number}-{last_page_number}"
+
+        # The page numbers are not part of the key so inserting or removing pages doesn't
+        # invalidate the pages after them
+        system_prompt = self._create_system_prompt(first_page=False)
+        cache_key = self._page_cache_key(pages, previous_context, system_prompt)
+        cached = self._page_cache.get(cache_key, PartialQuestionnaire) if self._page_cache and cache_key else None
+        if cached:
+            logger.info(f"Reusing cached interpretation of {page_label}")
+            return cached, LLMUsage()
+
+        # Initialize conversation, the page specific content follows the static system prompt
         context_json = json.dumps(
             [section.model_dump(exclude_none=True) for section in previous_context],
             indent=2,
         )
-        message: Iterable[ChatCompletionContentPartParam] = [
-            {"type": "text", "text": prompt},
-            {
-                "type": "image_url",
-                "image_url": {"url": f"data:image/png;base64,{base64_image}"},
-            },
-            {"type": "text", "text": f"OCR Text:\n{ocr_text}"},
+        pages_text = (
+            f"Page {first_page_number} of the questionnaire"
+            if len(pages) == 1
+            else f"Pages {first_page_number} to {last_page_number} of the questionnaire"
+        )
+        message: list[ChatCompletionContentPartParam] = [{"type": "text", "text": pages_text}]
+        image_bytes = 0
+        for page_number, (image, ocr_text) in enumerate(pages, first_page_number):
+            # Encode image for API
+            base64_image = self._encode_image(image)
+            image_bytes += len(base64_image)
+            ocr_label = "OCR Text" if len(pages) == 1 else f"OCR Text of page {page_number}"
+            message.extend(
+                [
+                    {
+                        "type": "image_url",
+                        "image_url": {"url": f"data:image/png;base64,{base64_image}"},
+                    },
+                    {"type": "text", "text": f"{ocr_label}:\n{ocr_text}"},
+                ]
+            )
+        message.append(
             {
                 "type": "text",
                 "text": f"previous_page_context:\n{context_json}",
-            },
-        ]
-        return self._get_structured_llm_response(message, PartialQuestionnaire)
+            }
+        )
+        partial, usage = self._get_page_response(
+            system_prompt, message, PartialQuestionnaire, [ocr_text for _, ocr_text in pages], page_label
+        )
+        usage.add_image(image_bytes)
+        if self._page_cache and cache_key:
+            self._page_cache.put(cache_key, partial)
+        return partial, usage
+
+    def _page_cache_key(
+        self, pages: list[tuple[Image.Image, str]], context: list[SectionFragment], prompt: str
+    ) -> str | None:
+        """Compute the page cache key of one or more pages, None if the page cache is disabled."""
+        if not self._page_cache:
+            return None
+        with profile_stage("page_cache_key"):
+            return self._page_cache.key(pages, context, ",".join(self.llm_config.models), prompt)
+
+    def _get_page_response(
+        self,
+        system_prompt: str,
+        message: Iterable[ChatCompletionContentPartParam],
+        response_type: type[PAGE_RESPONSE_TYPE],
+        ocr_texts: list[str],
+        page_label: str,
+    ) -> tuple[PAGE_RESPONSE_TYPE, LLMUsage]:
+        """Interpret pages with the model cascade.
+
+        The models of the cascade are tried in order. A page is escalated to the next model when
+        a model refuses, fails validation or produces a result that looks incomplete. The last
+        model is given all retries and its result is always accepted.
+
+        Args:
+            system_prompt: Static instructions sent as the system message
+            message: Page specific message to send to the LLM
+            response_type: Type of the expected structured response
+            ocr_texts: OCR text of the pages, used to check the result looks complete
+            page_label: Description of the pages for logging, e.g. "page 3"
+
+        Returns:
+            Tuple of the structured response and token usage of all models tried
+
+        Raises:
+            PageDeadlineExceededError: If the pages take longer than the configured page deadline
+        """
+        models = self.llm_config.models
+        usage = LLMUsage()
+        deadline = self.llm_config.page_deadline_seconds
+        with page_deadline(deadline * len(ocr_texts) if deadline else None, page_label):
+            for model in models:
+                final = model == models[-1]
+                try:
+                    # Cheaper models get a single attempt, invalid responses are escalated rather than fixed
+                    response, _ = self._get_structured_llm_response(
+                        system_prompt, message, response_type, model, None if final else 1, usage
+                    )
+                except ValueError as e:
+                    if final:
+                        raise
+                    logger.info(f"Escalating {page_label} from {model}: {e}")
+                    continue
+                if not final and _looks_incomplete(response, ocr_texts):
+                    logger.info(f"Escalating {page_label} from {model}: no questions found despite OCR text")
+                    continue
+
+                logger.info(f"Interpreted {page_label} with {model}")
+                usage.add_page(model, len(ocr_texts))
+                record_page_model(model, len(ocr_texts))
+                return response, usage
+        raise AssertionError("The model cascade always includes at least one model")
 
     def _get_structured_llm_response(
-        self, message: Iterable[ChatCompletionContentPartParam], response_type: type[STRUCTURED_RESPONSE_TYPE]
+        self,
+        system_prompt: str,
+        message: Iterable[ChatCompletionContentPartParam],
+        response_type: type[STRUCTURED_RESPONSE_TYPE],
+        model: str | None = None,
+        max_retries: int | None = None,
+        usage: LLMUsage | None = None,
     ) -> tuple[STRUCTURED_RESPONSE_TYPE, LLMUsage]:
         """Get structured response from LLM by asking LLM to fix validation errors in a loop.
         Args:
-            message: Message to send to the LLM
+            system_prompt: Static instructions sent as the system message. Keeping them identical
+                across requests lets the provider cache the prompt prefix
+            message: Page specific message to send to the LLM
             response_type: Type of the expected structured response
+            model: Model to use, defaults to the configured model
+            max_retries: Maximum number of attempts, defaults to the interpreter's max_retries
+            usage: Usage to add the token usage to, a new one is created if None
         Returns:
             Tuple of the structured response and token usage
         Raises:
@@ -208,26 +523,46 @@ class AIQuestionnaireInterpreter:
         """
 
         # Track conversation to maintain context during retries
-        messages: list[ChatCompletionMessageParam] = [{"role": "user", "content": message}]
+        messages: list[ChatCompletionMessageParam] = [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": message},
+        ]
 
-        usage = LLMUsage()
+        model = model or self.llm_config.model
+        max_retries = max_retries or self.max_retries
+        usage = usage if usage is not None else LLMUsage()
         attempt = 0
 
         while True:
             attempt += 1
 
             # Make API call
-            response = self.client.chat.completions.create(
-                model=self.llm_config.model,
-                messages=messages,
-                response_format={"type": "json_object"},
-            )
+            try:
+                with profile_stage("llm_request", attempt=attempt, model=model), STAGE_DURATION.time(stage="llm"):
+                    result = self._create_completion(model, messages)
+            except Exception:
+                LLM_REQUESTS.inc(model=model, outcome="error")
+                raise
+            LLM_REQUESTS.inc(model=model, outcome="success")
+            response = result.value
+            usage.add_request(result.hedged)
+            record_request(result.hedged)
+            if result.abandoned is not None:
+                # The discarded request is billed too, its tokens are counted once it completes
+                result.abandoned.add_done_callback(functools.partial(_record_hedge_overhead, usage))
 
             if getattr(response, "usage", None):
-                usage.add(
-                    getattr(response.usage, "prompt_tokens", 0) or 0,
-                    getattr(response.usage, "completion_tokens", 0) or 0,
-                )
+                prompt_tokens = getattr(response.usage, "prompt_tokens", 0) or 0
+                completion_tokens = getattr(response.usage, "completion_tokens", 0) or 0
+                prompt_details = getattr(response.usage, "prompt_tokens_details", None)
+                cached_tokens = (getattr(prompt_details, "cached_tokens", 0) or 0) if prompt_details else 0
+                usage.add(prompt_tokens, completion_tokens, cached_tokens)
+                record_usage(prompt_tokens, completion_tokens, cached_tokens)
+                token_counts = {"prompt": prompt_tokens, "completion": completion_tokens, "cached": cached_tokens}
+                for token_type, tokens in token_counts.items():
+                    # Usage reported by OpenAI compatible servers isn't always complete
+                    if isinstance(tokens, int):
+                        LLM_TOKENS.inc(tokens, model=model, type=token_type)
 
             # Extract content
             response_str = response.choices[0].message.content
@@ -239,14 +574,16 @@ class AIQuestionnaireInterpreter:
 
             try:
                 # Try to validate the response
-                validated_response = response_type.model_validate(json.loads(response_str))
+                with profile_stage("validate", attempt=attempt):
+                    validated_response = response_type.model_validate(json.loads(response_str))
                 return validated_response, usage
 
             except Exception as e:
-                if attempt >= self.max_retries:
-                    logger.error(f"Max retries ({self.max_retries}) reached. Last error: {e}")
+                LLM_VALIDATION_FAILURES.inc(model=model)
+                if attempt >= max_retries:
+                    logger.error(f"Max retries ({max_retries}) reached. Last error: {e}")
                     logger.error(f"Raw response: {response}")
-                    raise ValueError(f"Unable to validate response after {self.max_retries} attempts: {e}") from e
+                    raise ValueError(f"Unable to validate response after {max_retries} attempts: {e}") from e
 
                 # Prepare error feedback for the model
                 error_prompt = f"""
@@ -262,6 +599,136 @@ class AIQuestionnaireInterpreter:
                 messages.append({"role": "user", "content": error_prompt})
 
                 logger.info(f"Validation failed, attempt {attempt}: {e}. Retrying...")
+                LLM_RETRIES.inc(model=model, reason="validation")
+
+    def _create_completion(
+        self, model: str, messages: list[ChatCompletionMessageParam]
+    ) -> HedgedResult[ChatCompletion]:
+        """Send a chat completion request to one of the deployments.
+
+        Args:
+            model: Model to use
+            messages: Messages of the conversation
+
+        Returns:
+            The chat completion and whether it was hedged
+        """
+        # With a single deployment rate limited requests wait for it, otherwise they fail over and
+        # the pool waits for the first deployment to recover when all of them are rate limited
+        wait_for_rate_limits = len(self._deployments.members) == 1
+        return self._deployments.call(
+            lambda deployment: self._create_deployment_completion(deployment, model, messages, wait_for_rate_limits)
+        )
+
+    def _create_deployment_completion(
+        self,
+        deployment: "_Deployment",
+        model: str,
+        messages: list[ChatCompletionMessageParam],
+        wait_for_rate_limits: bool,
+    ) -> HedgedResult[ChatCompletion]:
+        """Send a chat completion request to a deployment within its rate and concurrency limits.
+
+        Requests rejected with a 429 once the client's own retries are exhausted pause all
+        requests sharing the rate limiter for the time given by the server, then are retried
+        if wait_for_rate_limits is set.
+
+        Args:
+            deployment: Deployment to send the request to
+            model: Model to use
+            messages: Messages of the conversation
+            wait_for_rate_limits: Retry requests rejected with a 429 instead of raising the error
+
+        Returns:
+            The chat completion and whether it was hedged
+        """
+        rate_limiter = deployment.rate_limiter
+        rate_limit_retries = 0
+        while True:
+            start_attempt()
+            try:
+                return self._send_hedged_chat_completion(deployment, model, messages)
+            except RateLimitError as e:
+                if not rate_limiter:
+                    raise
+                rate_limit_retries += 1
+                delay = retry_after_seconds(e.response.headers, default=2.0**rate_limit_retries)
+                logger.warning(f"Rate limited by the API, pausing requests for {delay:.1f}s")
+                rate_limiter.pause(delay)
+                if not wait_for_rate_limits or rate_limit_retries > _MAX_RATE_LIMIT_RETRIES:
+                    raise
+                LLM_RETRIES.inc(model=model, reason="rate_limit")
+
+    def _send_hedged_chat_completion(
+        self, deployment: "_Deployment", model: str, messages: list[ChatCompletionMessageParam]
+    ) -> HedgedResult[ChatCompletion]:
+        """Send a chat completion request, with a duplicate if it is slow and hedging is enabled.
+
+        Each request waits for its own rate limit reservation and concurrency slot and holds the
+        slot until it completes, so that a duplicate is only sent once capacity allows it. The
+        synchronous client can't abort the losing request, so it is left to complete in the background.
+
+        Args:
+            deployment: Deployment to send the request to
+            model: Model to use
+            messages: Messages of the conversation
+
+        Returns:
+            The first chat completion received and whether a duplicate was sent
+        """
+        if self.llm_config.hedge_percentile is None:
+            with self._request_capacity(deployment, messages) as reservation:
+                response = self._send_reserved_chat_completion(deployment, model, messages, reservation)
+            return HedgedResult(response, hedged=False)
+        hedger = shared_request_hedger(deployment.endpoint, model, self.llm_config.hedge_percentile)
+        # The conversation grows with retries, the requests must not see those changes
+        request = list(messages)
+        return hedger.run(
+            lambda reservation: self._send_reserved_chat_completion(deployment, model, request, reservation),
+            lambda: self._request_capacity(deployment, request),
+        )
+
+    @contextmanager
+    def _request_capacity(
+        self, deployment: "_Deployment", messages: list[ChatCompletionMessageParam]
+    ) -> Generator[RateLimitReservation | None]:
+        """Wait until a request fits within the rate limits and a concurrency slot is free, and hold the slot."""
+        rate_limiter = deployment.rate_limiter
+        with rate_limiter.acquire(estimate_request_tokens(messages)) if rate_limiter else nullcontext() as reservation:
+            if deployment.concurrency_limiter is None:
+                with self._request_slots or nullcontext():
+                    yield reservation
+            else:
+                # 429s, timeouts, connection and server errors make the limiter back off
+                with deployment.concurrency_limiter.acquire():
+                    yield reservation
+
+    def _send_reserved_chat_completion(
+        self,
+        deployment: "_Deployment",
+        model: str,
+        messages: list[ChatCompletionMessageParam],
+        reservation: RateLimitReservation | None,
+    ) -> ChatCompletion:
+        """Send a chat completion request and correct its rate limit reservation with the actual usage."""
+        response = self._send_chat_completion(deployment, model, messages)
+        if deployment.rate_limiter and reservation:
+            total_tokens = getattr(getattr(response, "usage", None), "total_tokens", None)
+            if isinstance(total_tokens, int):
+                deployment.rate_limiter.record_usage(reservation, total_tokens)
+        return response
+
+    def _send_chat_completion(
+        self, deployment: "_Deployment", model: str, messages: list[ChatCompletionMessageParam]
+    ) -> ChatCompletion:
+        # Don't let the request outlive the page deadline
+        timeout = request_timeout(self.llm_config.read_timeout)
+        return deployment.client.chat.completions.create(
+            model=deployment.model or model,
+            messages=messages,
+            response_format={"type": "json_object"},
+            timeout=NOT_GIVEN if timeout is None else timeout,
+        )
 
     def _build_context(
         self,
@@ -297,15 +764,19 @@ class AIQuestionnaireInterpreter:
         Returns:
             Base64 encoded image string
         """
-        buffered = BytesIO()
-        image.save(buffered, format="PNG")
-        return base64.b64encode(buffered.getvalue()).decode("utf-8")
+        with profile_stage("encode_image"):
+            buffered = BytesIO()
+            image.save(buffered, format="PNG")
+            return base64.b64encode(buffered.getvalue()).decode("utf-8")
+
+    def _create_system_prompt(self, first_page: bool) -> str:
+        """Create the system prompt for GPT-4 Vision.
 
-    def _create_vision_prompt(self, page_number: int) -> str:
-        """Create the prompt for GPT-4 Vision.
+        The prompt does not depend on the page so that it is identical for every request of its
+        kind and the provider can reuse the cached prompt prefix.
 
         Args:
-            page_number: Current page number
+            first_page: Whether the prompt is for the first page, which produces the questionnaire header
 
         Returns:
             Prompt string
@@ -417,7 +888,7 @@ class AIQuestionnaireInterpreter:
             }
         """
 
-        if page_number == 1:
+        if first_page:
             return f"""You are an expert in implementing CAPI survey instruments for surveys. Your job is to read a
             paper questionnaire and convert it to a structured format that can be used for further processing.
                     
@@ -482,10 +953,11 @@ class AIQuestionnaireInterpreter:
             return f"""You are an expert in implementing CAPI survey instruments for surveys. Your job is to read a
             paper questionnaire and convert it to a structured format that can be used for further processing.
 
-            Given page {page_number} of a questionnaire as an image, along with the OCR text from the page, produce a
-            JSON representation of just the sections and questions found on this page that follows the example. 
-            Include all sections and questions found on this page in normal reading order. If the order is unclear 
-            visually, use the section and question numbers to determine the order.
+            Given one or more consecutive pages of a questionnaire as images, in order, each followed by the OCR text
+            from that page, produce a JSON representation of just the sections and questions found on these pages
+            that follows the example. The user message starts with the numbers of the pages. Include all sections and
+            questions found on these pages in normal reading order. If the order is unclear visually, use the section
+            and question numbers to determine the order.
                         
             Also include a `trailing_sections` field listing the ids of any sections/questions that may continue on
             the next page. These are sections with questions that appear incomplete, are part of a sequence or have
@@ -493,7 +965,7 @@ class AIQuestionnaireInterpreter:
 
             Proceed as follows:
 
-            1. Identify any new sections that begin on this page and extract the following information:
+            1. Identify any new sections that begin on these pages and extract the following information:
                 - Section ID - derived from the title, lowercase with underscores (required)
                 - Section number (required, number with sequential capital letters if missing, however if previous 
                   sections are numbered and this one is not, it is probably part of a previous section)
@@ -507,7 +979,7 @@ class AIQuestionnaireInterpreter:
                   **Always include this field with an integer value, even if it must be estimated.**
             2. For questions that belong to a section from a previous page, include that section with its ID but only
                the new questions. The `previous_page_context` contains the last sections and questions from the 
-               previous page that may continue on this page.
+               page before these pages that may continue on them.
 
             3. Identify the individual questions and extract the following information:
                 - Question number (required, number sequentially if missing)
@@ -0,0 +1,123 @@
+"""Page-level checkpoints allowing long interpretations to be resumed."""
+
+import hashlib
+import logging
+import os
+import threading
+from collections.abc import Sequence
+from pathlib import Path
+
+from pydantic import BaseModel
+
+from survaize.interpreter.page_cache import page_hash
+from survaize.interpreter.scanned_questionnaire import ScannedQuestionnaire
+from survaize.interpreter.usage import LLMUsage
+from survaize.model.questionnaire import Questionnaire, SectionFragment
+
+logger = logging.getLogger(__name__)
+
+
+class InterpretationCheckpoint(BaseModel):
+    """State of an interpretation after its last completed page."""
+
+    # See checkpoint_key
+    key: str
+    total_pages: int
+    completed_pages: int
+    questionnaire: Questionnaire
+    context: list[SectionFragment]
+    usage: LLMUsage
+
+
+def document_hash(scanned_document: ScannedQuestionnaire) -> str:
+    """Compute a hash identifying a scanned document by its page images and OCR text.
+
+    Args:
+        scanned_document: The scanned document
+
+    Returns:
+        Hex encoded SHA-256 digest
+    """
+    digest = hashlib.sha256()
+    for page, text in zip(scanned_document.pages, scanned_document.extracted_text, strict=False):
+        digest.update(page_hash(page, text).encode())
+    return digest.hexdigest()
+
+
+def checkpoint_key(scanned_document: ScannedQuestionnaire, models: Sequence[str], pages_per_request: int) -> str:
+    """Compute the key identifying the checkpoint of an interpretation.
+
+    Besides the content of the document, the key covers its path, so that concurrent
+    conversions of copies of a document don't share a checkpoint, and the settings the
+    results depend on, so that resuming doesn't mix pages interpreted with other settings.
+
+    Args:
+        scanned_document: The scanned document
+        models: Models tried for each page, see LLMConfig.models
+        pages_per_request: Number of pages sent in each request after the first
+
+    Returns:
+        Hex encoded SHA-256 digest
+    """
+    digest = hashlib.sha256(document_hash(scanned_document).encode())
+    for part in (str(scanned_document.source_path.absolute()), ",".join(models), str(pages_per_request)):
+        digest.update(b"\0")
+        digest.update(part.encode())
+    return digest.hexdigest()
+
+
+class CheckpointStore:
+    """Saves interpretation checkpoints as JSON files named by their key."""
+
+    def __init__(self, directory: Path) -> None:
+        """Initialize the store.
+
+        Args:
+            directory: Directory containing the checkpoint files
+        """
+        self.directory: Path = directory
+
+    def load(self, key: str) -> InterpretationCheckpoint | None:
+        """Load the checkpoint of an interpretation.
+
+        Args:
+            key: Key of the checkpoint, see :func:`checkpoint_key`
+
+        Returns:
+            The checkpoint or None if there is no valid checkpoint with the key
+        """
+        path = self._path(key)
+        if not path.exists():
+            return None
+        try:
+            return InterpretationCheckpoint.model_validate_json(path.read_bytes())
+        except ValueError as e:
+            logger.warning(f"Ignoring invalid checkpoint {path}: {e}")
+            return None
+
+    def save(self, checkpoint: InterpretationCheckpoint) -> None:
+        """Save a checkpoint, replacing any previous checkpoint with the same key.
+
+        The file is replaced atomically so a crash while saving leaves the previous
+        checkpoint intact.
+
+        Args:
+            checkpoint: The checkpoint to save
+        """
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self._path(checkpoint.key)
+        # Give each writer its own temporary file, like the page cache
+        temp_path = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        temp_path.write_text(checkpoint.model_dump_json(exclude_none=True), encoding="utf-8")
+        os.replace(temp_path, path)
+
+    def delete(self, key: str) -> None:
+        """Delete a checkpoint, if any.
+
+        Args:
+            key: Key of the checkpoint
+        """
+        self._path(key).unlink(missing_ok=True)
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{key}.json"
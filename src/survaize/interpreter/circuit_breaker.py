@@ -0,0 +1,186 @@
+"""Circuit breaker that stops sending requests to a failing LLM deployment."""
+
+import logging
+import threading
+import time
+from collections import deque
+from collections.abc import Callable
+from enum import Enum
+
+import logfire
+
+from survaize.telemetry.metrics import LLM_CIRCUIT_STATE
+
+logger = logging.getLogger(__name__)
+
+_circuit_state_gauge = logfire.metric_gauge(
+    "survaize.llm.circuit_state",
+    unit="1",
+    description="State of the circuit breaker of each LLM deployment: 0 closed, 1 half open, 2 open",
+)
+
+
+class CircuitState(Enum):
+    CLOSED = 0
+    HALF_OPEN = 1
+    OPEN = 2
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised when no deployment accepts requests because their circuit breakers are open."""
+
+
+class CircuitBreaker:
+    """Tracks the outcome of recent requests to a deployment and opens when too many fail.
+
+    The breaker opens when at least ``failure_rate`` of the last ``window`` requests failed or
+    were slower than ``slow_request_seconds``. While open, requests are rejected so callers fail
+    fast or use another deployment. After ``open_seconds`` the breaker is half open and lets a
+    single probe request through: it closes if the probe succeeds and opens again otherwise.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        failure_rate: float = 0.5,
+        window: int = 10,
+        min_requests: int = 4,
+        open_seconds: float = 30.0,
+        slow_request_seconds: float | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """Initialize a closed breaker.
+
+        Args:
+            name: Name of the deployment used in logs and metrics
+            failure_rate: Fraction of failed requests in the window that opens the breaker
+            window: Number of most recent requests considered
+            min_requests: Number of requests needed in the window before the breaker can open
+            open_seconds: Seconds the breaker stays open before probing the deployment
+            slow_request_seconds: Successful requests slower than this count as failures, latency
+                is ignored if None
+            clock: Monotonic clock returning seconds
+        """
+        self.name: str = name
+        self.failure_rate: float = failure_rate
+        self.min_requests: int = min_requests
+        self.open_seconds: float = open_seconds
+        self.slow_request_seconds: float | None = slow_request_seconds
+        self._clock: Callable[[], float] = clock
+        # True for each failed request in the window
+        self._outcomes: deque[bool] = deque(maxlen=window)
+        self._state: CircuitState = CircuitState.CLOSED
+        self._opened_at: float = 0.0
+        self._probe_in_flight: bool = False
+        self._lock: threading.Lock = threading.Lock()
+        _circuit_state_gauge.set(self._state.value, {"endpoint": name})
+        LLM_CIRCUIT_STATE.set(self._state.value, endpoint=name)
+
+    @property
+    def state(self) -> CircuitState:
+        with self._lock:
+            self._update_state()
+            return self._state
+
+    def available(self) -> bool:
+        """Whether a request would currently be let through."""
+        with self._lock:
+            self._update_state()
+            return self._state is CircuitState.CLOSED or (
+                self._state is CircuitState.HALF_OPEN and not self._probe_in_flight
+            )
+
+    def acquire(self) -> bool:
+        """Let a request through if the breaker allows it.
+
+        Returns:
+            Whether the request may be sent. The outcome of an allowed request must be reported
+            with :meth:`record_success`, :meth:`record_failure` or :meth:`release`
+        """
+        with self._lock:
+            self._update_state()
+            if self._state is CircuitState.CLOSED:
+                return True
+            if self._state is CircuitState.HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return True
+            return False
+
+    def record_success(self, latency: float) -> None:
+        """Report a request that completed.
+
+        Args:
+            latency: Duration of the request in seconds
+        """
+        if self.slow_request_seconds is not None and latency > self.slow_request_seconds:
+            self._record(failed=True)
+        else:
+            self._record(failed=False)
+
+    def record_failure(self) -> None:
+        """Report a request that failed with a timeout, connection or server error."""
+        self._record(failed=True)
+
+    def release(self) -> None:
+        """Report a request whose outcome says nothing about the health of the deployment."""
+        with self._lock:
+            self._probe_in_flight = False
+
+    def _record(self, failed: bool) -> None:
+        with self._lock:
+            if self._state is CircuitState.HALF_OPEN:
+                self._probe_in_flight = False
+                if failed:
+                    self._open()
+                else:
+                    self._outcomes.clear()
+                    self._transition(CircuitState.CLOSED)
+                return
+            self._outcomes.append(failed)
+            if (
+                self._state is CircuitState.CLOSED
+                and len(self._outcomes) >= self.min_requests
+                and sum(self._outcomes) >= self.failure_rate * len(self._outcomes)
+            ):
+                self._open()
+
+    def _open(self) -> None:
+        self._opened_at = self._clock()
+        self._transition(CircuitState.OPEN)
+
+    def _update_state(self) -> None:
+        if self._state is CircuitState.OPEN and self._clock() - self._opened_at >= self.open_seconds:
+            self._transition(CircuitState.HALF_OPEN)
+
+    def _transition(self, state: CircuitState) -> None:
+        if state is self._state:
+            return
+        log = logger.warning if state is CircuitState.OPEN else logger.info
+        log(f"Circuit breaker of LLM endpoint {self.name} changed from {self._state.name} to {state.name}")
+        self._state = state
+        _circuit_state_gauge.set(state.value, {"endpoint": self.name})
+        LLM_CIRCUIT_STATE.set(state.value, endpoint=self.name)
+
+
+_shared_breakers: dict[tuple[str, float, float | None], CircuitBreaker] = {}
+_shared_breakers_lock = threading.Lock()
+
+
+def shared_circuit_breaker(endpoint: str, open_seconds: float, slow_request_seconds: float | None) -> CircuitBreaker:
+    """Get the circuit breaker shared by all interpreters using an endpoint in this process.
+
+    Args:
+        endpoint: Identifies the deployment, e.g. its URL
+        open_seconds: Seconds the breaker stays open before probing the deployment
+        slow_request_seconds: Successful requests slower than this count as failures
+
+    Returns:
+        The shared circuit breaker
+    """
+    key = (endpoint, open_seconds, slow_request_seconds)
+    with _shared_breakers_lock:
+        breaker = _shared_breakers.get(key)
+        if breaker is None:
+            breaker = CircuitBreaker(endpoint, open_seconds=open_seconds, slow_request_seconds=slow_request_seconds)
+            _shared_breakers[key] = breaker
+        return breaker
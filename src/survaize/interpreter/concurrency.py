@@ -0,0 +1,158 @@
+"""Adaptive limit on the number of concurrent LLM requests."""
+
+import logging
+import threading
+import time
+from collections.abc import Callable, Generator
+from contextlib import contextmanager
+
+import logfire
+from openai import APIConnectionError, APITimeoutError, InternalServerError, RateLimitError
+
+from survaize.interpreter.deadline import check_wait, remaining_seconds
+from survaize.telemetry.metrics import LLM_CONCURRENCY_LIMIT
+
+logger = logging.getLogger(__name__)
+
+_concurrency_limit_gauge = logfire.metric_gauge(
+    "survaize.llm.concurrency_limit",
+    unit="{request}",
+    description="Current limit on concurrent LLM requests to each endpoint set by the adaptive concurrency limiter",
+)
+
+
+# Errors signalling that the API is overloaded. Other errors, e.g. bad requests or page
+# deadlines, say nothing about the capacity of the API and leave the limit unchanged
+OVERLOAD_ERRORS = (RateLimitError, APITimeoutError, APIConnectionError, InternalServerError)
+
+
+class AdaptiveConcurrencyLimiter:
+    """Limits concurrent requests with an additive increase, multiplicative decrease (AIMD) policy.
+
+    The limit grows by one request once a full window of requests (as many as the current
+    limit) completes successfully and with a latency close to the typical latency. Any
+    request that fails with one of ``OVERLOAD_ERRORS`` (429, timeout, connection or server
+    error) multiplies the limit by ``backoff_factor``, at most once per window so that a
+    burst of failures from the same window only backs off once. Requests failing with other
+    errors release their slot without changing the limit.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        min_limit: int = 1,
+        max_limit: int = 64,
+        initial_limit: int = 4,
+        backoff_factor: float = 0.5,
+        latency_tolerance: float = 2.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """Initialize the limiter.
+
+        Args:
+            name: Name of the deployment used in logs and metrics
+            min_limit: Lowest limit the limiter backs off to
+            max_limit: Highest limit the limiter grows to
+            initial_limit: Limit to start with
+            backoff_factor: Factor the limit is multiplied by when requests are overloaded
+            latency_tolerance: Requests slower than this multiple of the smoothed latency don't
+                count towards increasing the limit
+            clock: Monotonic clock returning seconds
+        """
+        self.name: str = name
+        self.min_limit: int = min_limit
+        self.max_limit: int = max_limit
+        self.backoff_factor: float = backoff_factor
+        self.latency_tolerance: float = latency_tolerance
+        self._clock: Callable[[], float] = clock
+        self._limit: float = float(max(min_limit, min(initial_limit, max_limit)))
+        self._in_flight: int = 0
+        self._successes: int = 0
+        self._latency: float | None = None
+        # Requests started before the last back off don't trigger another one
+        self._generation: int = 0
+        self._condition: threading.Condition = threading.Condition()
+        _concurrency_limit_gauge.set(self.limit, {"endpoint": name})
+        LLM_CONCURRENCY_LIMIT.set(self.limit, endpoint=name)
+
+    @property
+    def limit(self) -> int:
+        """Current number of requests allowed in flight."""
+        return int(self._limit)
+
+    @property
+    def in_flight(self) -> int:
+        """Number of requests currently in flight."""
+        return self._in_flight
+
+    @contextmanager
+    def acquire(self) -> Generator[None]:
+        """Wait for a free slot and hold it while the request runs.
+
+        Raises:
+            PageDeadlineExceededError: If the active page deadline passes before a slot is free
+        """
+        with self._condition:
+            while self._in_flight >= self.limit:
+                check_wait(0.0)
+                self._condition.wait(remaining_seconds())
+            self._in_flight += 1
+            generation = self._generation
+        start = self._clock()
+        try:
+            yield
+        except OVERLOAD_ERRORS:
+            self._release(generation, self._clock() - start, overloaded=True)
+            raise
+        except BaseException:
+            self._release(generation, None, overloaded=False)
+            raise
+        self._release(generation, self._clock() - start, overloaded=False)
+
+    def _release(self, generation: int, latency: float | None, overloaded: bool) -> None:
+        """Free a slot and adjust the limit, latency is None for requests failing without overload."""
+        with self._condition:
+            self._in_flight -= 1
+            previous_limit = self.limit
+            if overloaded:
+                if generation == self._generation:
+                    self._limit = max(float(self.min_limit), self._limit * self.backoff_factor)
+                    self._generation += 1
+                    self._successes = 0
+            elif latency is not None:
+                stable = self._latency is None or latency <= self._latency * self.latency_tolerance
+                # Exponentially weighted moving average of the latency of successful requests
+                self._latency = latency if self._latency is None else 0.8 * self._latency + 0.2 * latency
+                if stable:
+                    self._successes += 1
+                    if self._successes >= self.limit:
+                        self._limit = min(float(self.max_limit), self._limit + 1)
+                        self._successes = 0
+            if self.limit != previous_limit:
+                logger.info(f"LLM concurrency limit of {self.name} changed from {previous_limit} to {self.limit}")
+                _concurrency_limit_gauge.set(self.limit, {"endpoint": self.name})
+                LLM_CONCURRENCY_LIMIT.set(self.limit, endpoint=self.name)
+            self._condition.notify_all()
+
+
+_shared_limiters: dict[tuple[str, int], AdaptiveConcurrencyLimiter] = {}
+_shared_limiters_lock = threading.Lock()
+
+
+def shared_concurrency_limiter(endpoint: str, max_limit: int) -> AdaptiveConcurrencyLimiter:
+    """Get the adaptive concurrency limiter shared by all interpreters using an endpoint in this process.
+
+    Args:
+        endpoint: Identifies the deployment, e.g. its URL
+        max_limit: Highest number of concurrent requests allowed
+
+    Returns:
+        The shared limiter
+    """
+    key = (endpoint, max_limit)
+    with _shared_limiters_lock:
+        limiter = _shared_limiters.get(key)
+        if limiter is None:
+            limiter = AdaptiveConcurrencyLimiter(endpoint, max_limit=max_limit)
+            _shared_limiters[key] = limiter
+        return limiter
@@ -0,0 +1,142 @@
+"""Time budget for interpreting a page, shared by all LLM requests made for it."""
+
+import time
+from collections.abc import Generator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+
+
+class PageDeadlineExceededError(TimeoutError):
+    """Raised when interpreting a page takes longer than its deadline."""
+
+    def __init__(self, pages: str, deadline_seconds: float, elapsed_seconds: float, attempts: int) -> None:
+        """Initialize the error.
+
+        Args:
+            pages: Description of the pages, e.g. "page 3"
+            deadline_seconds: Time allowed for the pages
+            elapsed_seconds: Time spent on the pages
+            attempts: Number of LLM requests started for the pages
+        """
+        super().__init__(
+            f"Interpreting {pages} exceeded its deadline of {deadline_seconds:.0f}s "
+            + f"after {elapsed_seconds:.0f}s and {attempts} LLM request(s)"
+        )
+        self.pages: str = pages
+        self.deadline_seconds: float = deadline_seconds
+        self.elapsed_seconds: float = elapsed_seconds
+        self.attempts: int = attempts
+
+    def to_dict(self) -> dict[str, object]:
+        return {
+            "type": "page_deadline_exceeded",
+            "pages": self.pages,
+            "deadline_seconds": self.deadline_seconds,
+            "elapsed_seconds": round(self.elapsed_seconds, 3),
+            "attempts": self.attempts,
+        }
+
+
+@dataclass
+class _PageDeadline:
+    pages: str
+    seconds: float
+    start: float
+    attempts: int = 0
+
+    def remaining(self) -> float:
+        return self.seconds - (time.monotonic() - self.start)
+
+    def error(self) -> PageDeadlineExceededError:
+        return PageDeadlineExceededError(self.pages, self.seconds, time.monotonic() - self.start, self.attempts)
+
+
+_current_deadline: ContextVar[_PageDeadline | None] = ContextVar("survaize_page_deadline", default=None)
+
+
+@contextmanager
+def page_deadline(seconds: float | None, pages: str) -> Generator[None]:
+    """Limit the time spent on LLM requests for pages in the current context.
+
+    Requests made in the context are given at most the remaining time as timeout, see
+    :func:`request_timeout`, and timeouts or connection errors raised once the deadline has
+    passed are turned into :class:`PageDeadlineExceededError`. Waits for rate limits,
+    concurrency slots and retries raise it as soon as they would outlast the deadline, see
+    :func:`check_wait`.
+
+    Args:
+        seconds: Time allowed, unlimited if None
+        pages: Description of the pages for the error, e.g. "page 3"
+    """
+    if seconds is None:
+        yield
+        return
+    # Imported here so that the error can be handled without loading the PDF dependencies
+    from openai import APIConnectionError
+
+    deadline = _PageDeadline(pages, seconds, time.monotonic())
+    token = _current_deadline.set(deadline)
+    try:
+        yield
+    except APIConnectionError as e:
+        if deadline.remaining() <= 0:
+            raise deadline.error() from e
+        raise
+    finally:
+        _current_deadline.reset(token)
+
+
+def start_attempt() -> None:
+    """Count an LLM request for the active deadline.
+
+    Raises:
+        PageDeadlineExceededError: If the deadline has already passed
+    """
+    deadline = _current_deadline.get()
+    if deadline is None:
+        return
+    if deadline.remaining() <= 0:
+        raise deadline.error()
+    deadline.attempts += 1
+
+
+def request_timeout(read_timeout: float) -> float | None:
+    """Timeout for an LLM request so that it doesn't outlive the active deadline.
+
+    Args:
+        read_timeout: Timeout the client is configured with
+
+    Returns:
+        The smaller of read_timeout and the time left before the deadline, None without a deadline
+        so that the client's timeouts are used
+    """
+    deadline = _current_deadline.get()
+    if deadline is None:
+        return None
+    return max(0.001, min(read_timeout, deadline.remaining()))
+
+
+def remaining_seconds() -> float | None:
+    """Time left before the active deadline.
+
+    Returns:
+        Seconds left, negative once the deadline has passed, None without a deadline
+    """
+    deadline = _current_deadline.get()
+    return None if deadline is None else deadline.remaining()
+
+
+def check_wait(seconds: float, cause: BaseException | None = None) -> None:
+    """Make sure that waiting, e.g. for a rate limit or before a retry, ends before the active deadline.
+
+    Args:
+        seconds: Time about to be spent waiting
+        cause: Error that caused the wait, chained to the deadline error
+
+    Raises:
+        PageDeadlineExceededError: If the deadline would pass before the wait is over
+    """
+    deadline = _current_deadline.get()
+    if deadline is not None and deadline.remaining() < seconds:
+        raise deadline.error() from cause
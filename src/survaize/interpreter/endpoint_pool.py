@@ -0,0 +1,243 @@
+"""Routing of LLM requests across several deployments with failover."""
+
+import logging
+import threading
+import time
+from collections.abc import Callable, Sequence
+from dataclasses import dataclass
+from typing import Generic, TypeVar
+
+from openai import APIConnectionError, InternalServerError, RateLimitError
+
+from survaize.config.llm_config import RoutingPolicy
+from survaize.interpreter.circuit_breaker import CircuitBreaker, CircuitOpenError
+from survaize.interpreter.deadline import check_wait
+from survaize.interpreter.rate_limiter import retry_after_seconds
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+# Errors after which the request is sent to another endpoint. APIConnectionError includes timeouts.
+FAILOVER_ERRORS = (RateLimitError, APIConnectionError, InternalServerError)
+
+
+@dataclass
+class PoolMember(Generic[T]):
+    """An endpoint of the pool and its routing state."""
+
+    name: str
+    value: T
+    weight: int = 1
+    # Requests currently sent to the endpoint
+    outstanding: int = 0
+    # Running weight of the smooth weighted round robin
+    current_weight: int = 0
+    # The endpoint is skipped while it is rate limited or failing, until this time
+    unavailable_until: float = 0.0
+    # Stops sending requests to the endpoint while it is unhealthy, the endpoint is always used if None
+    breaker: CircuitBreaker | None = None
+
+
+class EndpointPool(Generic[T]):
+    """Distributes requests across endpoints and fails over to another endpoint on errors.
+
+    With the least outstanding requests policy each request goes to the endpoint with the fewest
+    requests in flight relative to its weight. With the weighted round robin policy endpoints
+    take turns in proportion to their weights. An endpoint that fails with a rate limit, timeout,
+    connection or server error is skipped for a cool down period (the retry-after delay of 429s)
+    and the request is retried on the other endpoints.
+
+    When every endpoint was rate limited, the request is retried on the endpoint whose retry-after
+    delay ends first, up to ``rate_limit_waits`` times, so that 429s of busy deployments don't fail
+    requests that a single deployment would have waited for.
+
+    A request that failed on every endpoint is then retried up to ``retries`` times, after an
+    exponential backoff or once the first rate limited endpoint recovers. These retries replace
+    those of the OpenAI client, so that every failed attempt counts towards the circuit breaker.
+
+    Endpoints whose circuit breaker is open are not used. When no other endpoint is left, the
+    request goes to the fallback endpoint if there is one, otherwise :class:`CircuitOpenError`
+    is raised straight away.
+    """
+
+    def __init__(
+        self,
+        members: Sequence[PoolMember[T]],
+        policy: RoutingPolicy = RoutingPolicy.LEAST_OUTSTANDING,
+        cooldown: float = 5.0,
+        clock: Callable[[], float] = time.monotonic,
+        fallback: PoolMember[T] | None = None,
+        rate_limit_waits: int = 0,
+        sleep: Callable[[float], None] = time.sleep,
+        retries: int = 0,
+        retry_backoff: float = 0.5,
+        max_retry_backoff: float = 8.0,
+    ) -> None:
+        """Initialize the pool.
+
+        Args:
+            members: Endpoints to route requests to
+            policy: How endpoints are chosen for each request
+            cooldown: Seconds a failing endpoint is skipped for
+            clock: Monotonic clock returning seconds
+            fallback: Endpoint used only when none of the members can take the request
+            rate_limit_waits: Number of times a request rate limited by every endpoint waits for
+                the first one to recover instead of raising the error
+            sleep: Function to sleep for a number of seconds
+            retries: Number of times a request that failed on every endpoint is retried
+            retry_backoff: Seconds before the first retry, doubled for each further retry
+            max_retry_backoff: Longest backoff between retries
+        """
+        if not members:
+            raise ValueError("An endpoint pool needs at least one endpoint")
+        self.members: list[PoolMember[T]] = list(members)
+        self.fallback: PoolMember[T] | None = fallback
+        self.policy: RoutingPolicy = policy
+        self.cooldown: float = cooldown
+        self.rate_limit_waits: int = rate_limit_waits
+        self.retries: int = retries
+        self.retry_backoff: float = retry_backoff
+        self.max_retry_backoff: float = max_retry_backoff
+        self._clock: Callable[[], float] = clock
+        self._sleep: Callable[[float], None] = sleep
+        self._lock: threading.Lock = threading.Lock()
+
+    def call(self, request: Callable[[T], R]) -> R:
+        """Send a request to an endpoint, failing over to the other endpoints on errors.
+
+        Args:
+            request: Sends the request to the given endpoint
+
+        Returns:
+            The result of the first endpoint to succeed
+
+        Raises:
+            Exception: The error of the last endpoint tried if all endpoints failed
+        """
+        tried: set[int] = set()
+        # Whether every endpoint tried since the last wait was rate limited
+        only_rate_limited = True
+        waits = 0
+        retries = 0
+        while True:
+            member = self._acquire(tried)
+            tried.add(id(member))
+            start = self._clock()
+            try:
+                result = request(member.value)
+            except FAILOVER_ERRORS as e:
+                if isinstance(e, RateLimitError):
+                    # Rate limits say nothing about the health of the endpoint
+                    delay = retry_after_seconds(e.response.headers, default=self.cooldown)
+                    if member.breaker:
+                        member.breaker.release()
+                else:
+                    delay = self.cooldown
+                    only_rate_limited = False
+                    if member.breaker:
+                        member.breaker.record_failure()
+                with self._lock:
+                    member.outstanding -= 1
+                    member.unavailable_until = max(member.unavailable_until, self._clock() + delay)
+                if not self._has_untried(tried):
+                    if only_rate_limited and waits < self.rate_limit_waits:
+                        waits += 1
+                        self._wait_for_first_recovery(e)
+                    elif retries < self.retries:
+                        if only_rate_limited:
+                            self._wait_for_first_recovery(e)
+                        else:
+                            self._back_off(retries, e)
+                        retries += 1
+                    else:
+                        raise
+                    tried.clear()
+                    only_rate_limited = True
+                    continue
+                logger.warning(f"LLM endpoint {member.name} failed ({type(e).__name__}), failing over")
+                continue
+            except BaseException:
+                if member.breaker:
+                    member.breaker.release()
+                with self._lock:
+                    member.outstanding -= 1
+                raise
+            if member.breaker:
+                member.breaker.record_success(self._clock() - start)
+            with self._lock:
+                member.outstanding -= 1
+            return result
+
+    def _wait_for_first_recovery(self, error: Exception) -> None:
+        with self._lock:
+            recoveries = [
+                member.unavailable_until
+                for member in self.members
+                if member.breaker is None or member.breaker.available()
+            ]
+        wait = max(0.0, min(recoveries, default=0.0) - self._clock())
+        check_wait(wait, cause=error)
+        logger.warning(f"All LLM endpoints are rate limited, waiting {wait:.1f}s for the first to recover")
+        self._sleep(wait)
+
+    def _back_off(self, retries: int, error: Exception) -> None:
+        backoff = min(self.retry_backoff * 2**retries, self.max_retry_backoff)
+        check_wait(backoff, cause=error)
+        logger.warning(f"All LLM endpoints failed ({type(error).__name__}), retrying in {backoff:.1f}s")
+        self._sleep(backoff)
+
+    def _has_untried(self, tried: set[int]) -> bool:
+        with self._lock:
+            return any(
+                id(member) not in tried and (member.breaker is None or member.breaker.available())
+                for member in self.members
+            ) or (self.fallback is not None and id(self.fallback) not in tried)
+
+    def _acquire(self, tried: set[int]) -> PoolMember[T]:
+        with self._lock:
+            candidates = [
+                member
+                for member in self.members
+                if id(member) not in tried and (member.breaker is None or member.breaker.available())
+            ]
+            while candidates:
+                member = self._select(candidates)
+                # Breakers are shared by the pools of all interpreters, so another request may have
+                # taken the half open breaker's probe since available() was checked
+                if member.breaker is None or member.breaker.acquire():
+                    member.outstanding += 1
+                    return member
+                candidates.remove(member)
+            fallback = self.fallback
+            if fallback is None or id(fallback) in tried:
+                raise CircuitOpenError("All LLM endpoints are unavailable, their circuit breakers are open")
+            if fallback.breaker is not None and not fallback.breaker.acquire():
+                raise CircuitOpenError(
+                    "All LLM endpoints are unavailable, the circuit breakers of the deployments and of the "
+                    + f"fallback {fallback.name} are open"
+                )
+            logger.info(f"Sending request to fallback LLM endpoint {fallback.name}")
+            fallback.outstanding += 1
+            return fallback
+
+    def _select(self, candidates: list[PoolMember[T]]) -> PoolMember[T]:
+        now = self._clock()
+        available = [member for member in candidates if member.unavailable_until <= now]
+        # When every endpoint is cooling down, use the one that recovers first
+        if not available:
+            available = [min(candidates, key=lambda member: member.unavailable_until)]
+        if self.policy is RoutingPolicy.WEIGHTED_ROUND_ROBIN:
+            return self._next_round_robin(available)
+        return min(available, key=lambda member: member.outstanding / member.weight)
+
+    @staticmethod
+    def _next_round_robin(members: list[PoolMember[T]]) -> PoolMember[T]:
+        # Smooth weighted round robin: interleaves endpoints instead of sending bursts to each
+        total = sum(member.weight for member in members)
+        for member in members:
+            member.current_weight += member.weight
+        selected = max(members, key=lambda member: member.current_weight)
+        selected.current_weight -= total
+        return selected
@@ -0,0 +1,202 @@
+"""Hedged requests: send a duplicate of a slow request and use whichever response arrives first."""
+
+import contextvars
+import logging
+import threading
+import time
+from collections import deque
+from collections.abc import Callable, Generator
+from concurrent.futures import FIRST_COMPLETED, Future, wait
+from contextlib import AbstractContextManager, ExitStack, contextmanager
+from dataclasses import dataclass
+from typing import Generic, TypeVar
+
+from survaize.interpreter.deadline import check_wait, remaining_seconds
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+class LatencyTracker:
+    """Rolling window of request latencies."""
+
+    def __init__(self, window: int = 200) -> None:
+        """Initialize the tracker.
+
+        Args:
+            window: Number of most recent latencies to keep
+        """
+        self._latencies: deque[float] = deque(maxlen=window)
+        self._lock: threading.Lock = threading.Lock()
+
+    def record(self, latency: float) -> None:
+        with self._lock:
+            self._latencies.append(latency)
+
+    def percentile(self, percentile: float, min_samples: int) -> float | None:
+        """Get a percentile of the recorded latencies.
+
+        Args:
+            percentile: Percentile between 0 and 1, e.g. 0.95
+            min_samples: Minimum number of latencies needed for a meaningful percentile
+
+        Returns:
+            The latency in seconds or None if fewer than min_samples latencies were recorded
+        """
+        with self._lock:
+            if len(self._latencies) < min_samples:
+                return None
+            latencies = sorted(self._latencies)
+        return latencies[min(len(latencies) - 1, int(percentile * len(latencies)))]
+
+
+@dataclass
+class HedgedResult(Generic[T]):
+    """Result of a possibly hedged call."""
+
+    value: T
+    # Whether a duplicate request was sent
+    hedged: bool
+    # The other request of a hedged call when it is still running or succeeded. Its response is
+    # discarded but billed, the future gives its actual usage once it completes
+    abandoned: "Future[T] | None" = None
+
+
+class RequestHedger:
+    """Runs calls with a hedge: if a call hasn't completed by the given latency percentile of
+    previous calls, a duplicate is started and the first successful result is used.
+
+    Each request holds its own capacity, e.g. a rate limit reservation and a concurrency slot,
+    until it completes. Calls are blocking so the losing request can't be interrupted, it is
+    abandoned and left to complete in its thread, still holding its capacity. Each request runs
+    in a thread of its own rather than in a bounded pool so that hedging doesn't limit the number
+    of calls in flight. Only the request itself is timed: time spent waiting for capacity would be
+    mistaken for slow requests and hedged, adding load when the service is already saturated.
+    """
+
+    def __init__(self, percentile: float = 0.95, min_samples: int = 5) -> None:
+        """Initialize the hedger.
+
+        Args:
+            percentile: Latency percentile of previous calls after which a duplicate is sent
+            min_samples: Number of calls to observe before hedging
+        """
+        self.percentile: float = percentile
+        self.min_samples: int = min_samples
+        self.latencies: LatencyTracker = LatencyTracker()
+
+    def hedge_delay(self) -> float | None:
+        """Delay after which a duplicate is sent, None until enough calls were observed."""
+        return self.latencies.percentile(self.percentile, self.min_samples)
+
+    def run(self, call: Callable[[R], T], reserve: Callable[[], AbstractContextManager[R]]) -> HedgedResult[T]:
+        """Run a call, hedging it if it is slow.
+
+        Args:
+            call: Sends a request with the capacity reserved for it, it may be called twice concurrently
+            reserve: Waits for the capacity of a request, which is held until the request completes
+
+        Returns:
+            The result of the first call to succeed
+
+        Raises:
+            Exception: The error of the last call to fail if both calls fail
+            PageDeadlineExceededError: If the active page deadline passes before either call completes
+        """
+        delay = self.hedge_delay()
+        if delay is None:
+            # Nothing to hedge against yet, run the call on the caller's thread
+            with reserve() as reservation:
+                return HedgedResult(self._timed(call, reservation), hedged=False)
+
+        # The capacity of the first request is acquired before the hedge delay starts and handed
+        # over to the request's thread, the duplicate waits for its own in its thread
+        with ExitStack() as stack:
+            reservation = stack.enter_context(reserve())
+            capacity = stack.pop_all()
+        primary = self._start(call, lambda: _held(capacity, reservation))
+        done, _ = wait([primary], timeout=delay)
+        if done:
+            return HedgedResult(primary.result(), hedged=False)
+
+        logger.info(f"Request slower than {delay:.1f}s, sending a hedged request")
+        hedge = self._start(call, reserve)
+        pending: set[Future[T]] = {primary, hedge}
+        error: BaseException | None = None
+        try:
+            while pending:
+                check_wait(0.0)
+                done, pending = wait(pending, timeout=remaining_seconds(), return_when=FIRST_COMPLETED)
+                for future in done:
+                    error = future.exception()
+                    if error is None:
+                        loser = hedge if future is primary else primary
+                        # A duplicate still waiting for capacity is never sent
+                        failed = loser.cancel() or (loser.done() and loser.exception() is not None)
+                        return HedgedResult(future.result(), hedged=True, abandoned=None if failed else loser)
+        finally:
+            hedge.cancel()
+        assert error is not None
+        raise error
+
+    def _start(self, call: Callable[[R], T], reserve: Callable[[], AbstractContextManager[R]]) -> "Future[T]":
+        """Run a request in a thread of its own, in the caller's context so it sees its deadline and trace."""
+        future: Future[T] = Future()
+
+        def run() -> None:
+            try:
+                with reserve() as reservation:
+                    if not future.set_running_or_notify_cancel():
+                        # The call completed while the duplicate waited for capacity
+                        return
+                    # Completed before the capacity is released, so that the caller can cancel a
+                    # duplicate waiting for it
+                    future.set_result(self._timed(call, reservation))
+            except BaseException as e:
+                if not future.done():
+                    future.set_exception(e)
+
+        context = contextvars.copy_context()
+        threading.Thread(target=context.run, args=(run,), name="survaize-hedge", daemon=True).start()
+        return future
+
+    def _timed(self, call: Callable[[R], T], reservation: R) -> T:
+        start = time.monotonic()
+        result = call(reservation)
+        self.latencies.record(time.monotonic() - start)
+        return result
+
+
+@contextmanager
+def _held(capacity: ExitStack, reservation: R) -> Generator[R]:
+    """Hold capacity acquired on another thread until the request using it completes."""
+    with capacity:
+        yield reservation
+
+
+_shared_hedgers: dict[tuple[str, str, float], RequestHedger] = {}
+_shared_hedgers_lock = threading.Lock()
+
+
+def shared_request_hedger(endpoint: str, model: str, percentile: float) -> RequestHedger:
+    """Get the hedger shared by all interpreters using a model of an endpoint in this process.
+
+    Latencies are tracked per model as they differ widely between models.
+
+    Args:
+        endpoint: Identifies the deployment, e.g. its URL
+        model: Name of the model
+        percentile: Latency percentile after which a duplicate request is sent
+
+    Returns:
+        The shared hedger
+    """
+    key = (endpoint, model, percentile)
+    with _shared_hedgers_lock:
+        hedger = _shared_hedgers.get(key)
+        if hedger is None:
+            hedger = RequestHedger(percentile=percentile)
+            _shared_hedgers[key] = hedger
+        return hedger
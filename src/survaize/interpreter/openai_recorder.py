@@ -1,10 +1,20 @@
+import base64
+import gzip
+import hashlib
 import json
 import os
+import random
+import re
+import threading
+import time
+from collections.abc import Callable
 from datetime import UTC, datetime
 from enum import Enum
 from pathlib import Path
+from typing import Any, cast
 
-from openai import AzureOpenAI, OpenAI
+import logfire
+from openai import AzureOpenAI, OpenAI, Timeout
 from openai.types.chat import ChatCompletion
 
 from survaize.config.llm_config import LLMConfig, OpenAIProviderType
@@ -18,42 +28,241 @@ class RecordingMode(Enum):
     REPLAY = "replay"
 
 
+# Request arguments that identify a request, others such as the timeout don't change the response
+_HASHED_REQUEST_ARGS = ("model", "messages", "response_format")
+_INDEX_FILE = "index.json"
+_BLOB_DIRECTORY = "blobs"
+_DATA_URL_PATTERN = re.compile(r"^data:(?P<mime>[\w/+.-]+);base64,(?P<data>.*)$", re.DOTALL)
+
+
+def request_hash(kwargs: dict[str, object]) -> str:
+    """Stable hash of a chat completion request.
+
+    Args:
+        kwargs: Keyword arguments of ``chat.completions.create``
+
+    Returns:
+        Hex digest of the model, messages and response format of the request
+    """
+    key = {name: kwargs.get(name) for name in _HASHED_REQUEST_ARGS}
+    encoded = json.dumps(key, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+class RecordingNotFoundError(LookupError):
+    """Raised in replay mode when no recording matches a request."""
+
+
+class RecordingStore:
+    """Recordings of chat completions keyed by the hash of their request.
+
+    Each response is saved to its own gzip compressed file and ``index.json`` maps request hashes
+    to the files of their responses, in the order they were recorded. Identical requests made
+    several times, e.g. a retry, replay their responses in order, then repeat the last one.
+    Requests can therefore be replayed in any order and from any thread.
+
+    Images sent as base64 data URLs are stored once in ``blobs/``, named after the hash of their
+    content, and referenced from the recorded request by a ``blob:<mime type>:<hash>`` URL since
+    the same page image is sent with every retry and escalation.
+
+    The latency and token usage of each response are recorded with it. When replaying with a
+    ``latency_scale``, each response is delayed by its recorded latency multiplied by the scale
+    and by a random factor within ``1 ± latency_jitter``, so that the pipeline can be
+    benchmarked offline with realistic timing.
+    """
+
+    def __init__(
+        self,
+        directory: Path,
+        latency_scale: float | None = None,
+        latency_jitter: float = 0.0,
+        sleep: Callable[[float], None] = time.sleep,
+        rng: random.Random | None = None,
+    ) -> None:
+        """Initialize the store.
+
+        Args:
+            directory: Directory of the recordings
+            latency_scale: Factor applied to the recorded latency of replayed responses, responses
+                are returned immediately if None
+            latency_jitter: Maximum relative random deviation from the scaled latency, e.g. 0.2
+            sleep: Function to sleep for a number of seconds
+            rng: Random number generator for the jitter
+        """
+        self.directory: Path = directory
+        self.latency_scale: float | None = latency_scale
+        self.latency_jitter: float = latency_jitter
+        self._sleep: Callable[[float], None] = sleep
+        self._rng: random.Random = rng or random.Random()
+        self._index: dict[str, list[str]] = {}
+        # Number of responses already replayed for each request hash
+        self._replayed: dict[str, int] = {}
+        self._lock: threading.Lock = threading.Lock()
+        if (directory / _INDEX_FILE).exists():
+            self._index = json.loads((directory / _INDEX_FILE).read_text(encoding="utf-8"))["recordings"]
+        elif directory.is_dir():
+            self._index = self._index_sequential_recordings()
+
+    def record(self, kwargs: dict[str, object], response: ChatCompletion, latency_seconds: float) -> None:
+        """Save the response to a request and update the index.
+
+        Args:
+            kwargs: Keyword arguments of the request
+            response: Response to the request
+            latency_seconds: Wall clock time the request took
+        """
+        key = request_hash(kwargs)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        data = {
+            "request": {"kwargs": self._extract_blobs(kwargs)},
+            "response": response.model_dump(),
+            "latency_seconds": latency_seconds,
+            "usage": response.usage.model_dump() if response.usage else None,
+        }
+        with self._lock:
+            files = self._index.setdefault(key, [])
+            file_name = f"{key}.json.gz" if not files else f"{key}-{len(files)}.json.gz"
+            files.append(file_name)
+            with gzip.open(self.directory / file_name, "wt", encoding="utf-8") as f:
+                json.dump(data, f, default=str, separators=(",", ":"))
+            self._write_index()
+
+    def replay(self, kwargs: dict[str, object]) -> ChatCompletion:
+        """Get the recorded response to a request.
+
+        Raises:
+            RecordingNotFoundError: If the request was not recorded
+        """
+        key = request_hash(kwargs)
+        with self._lock:
+            files = self._index.get(key)
+            if not files:
+                raise RecordingNotFoundError(
+                    f"No recording in {self.directory} for request {key} to model {kwargs.get('model')}"
+                )
+            occurrence = self._replayed.get(key, 0)
+            self._replayed[key] = occurrence + 1
+        data = self._read_recording(self.directory / files[min(occurrence, len(files) - 1)])
+        latency = data.get("latency_seconds")
+        if self.latency_scale is not None and isinstance(latency, int | float):
+            jitter = self._rng.uniform(-self.latency_jitter, self.latency_jitter)
+            self._sleep(max(0.0, latency * self.latency_scale * (1 + jitter)))
+        return ChatCompletion.model_validate(data["response"])
+
+    def load_request(self, file_name: str) -> dict[str, object]:
+        """Get the request of a recording with its images restored as data URLs.
+
+        Args:
+            file_name: Name of the recording file, as listed in the index
+
+        Returns:
+            Keyword arguments of the recorded request
+        """
+        data = self._read_recording(self.directory / file_name)
+        return cast(dict[str, object], self._restore_blobs(data["request"]["kwargs"]))
+
+    @staticmethod
+    def _read_recording(path: Path) -> dict[str, Any]:  # pyright: ignore[reportExplicitAny]
+        if path.suffix == ".gz":
+            with gzip.open(path, "rt", encoding="utf-8") as f:
+                return json.load(f)
+        return json.loads(path.read_text(encoding="utf-8"))
+
+    def _extract_blobs(self, value: object) -> object:
+        """Copy of a request with the images of data URLs moved to the blob store."""
+        if isinstance(value, dict):
+            return {k: self._extract_blobs(v) for k, v in cast(dict[str, object], value).items()}
+        if isinstance(value, list | tuple):
+            return [self._extract_blobs(v) for v in cast(list[object], value)]
+        if isinstance(value, str) and (match := _DATA_URL_PATTERN.match(value)):
+            content = base64.b64decode(match["data"])
+            digest = hashlib.sha256(content).hexdigest()
+            path = self.directory / _BLOB_DIRECTORY / digest
+            if not path.exists():
+                path.parent.mkdir(parents=True, exist_ok=True)
+                temporary = path.with_name(f"{digest}.{os.getpid()}.{threading.get_ident()}.tmp")
+                temporary.write_bytes(content)
+                os.replace(temporary, path)
+            return f"blob:{match['mime']}:{digest}"
+        return value
+
+    def _restore_blobs(self, value: object) -> object:
+        if isinstance(value, dict):
+            return {k: self._restore_blobs(v) for k, v in cast(dict[str, object], value).items()}
+        if isinstance(value, list):
+            return [self._restore_blobs(v) for v in cast(list[object], value)]
+        if isinstance(value, str) and value.startswith("blob:"):
+            _, mime, digest = value.split(":", 2)
+            content = (self.directory / _BLOB_DIRECTORY / digest).read_bytes()
+            return f"data:{mime};base64,{base64.b64encode(content).decode('ascii')}"
+        return value
+
+    def _write_index(self) -> None:
+        # Replace the index atomically so that a concurrent reader never sees a partial file
+        temporary = self.directory / f"{_INDEX_FILE}.{os.getpid()}.{threading.get_ident()}.tmp"
+        temporary.write_text(json.dumps({"version": 1, "recordings": self._index}, indent=2), encoding="utf-8")
+        os.replace(temporary, self.directory / _INDEX_FILE)
+
+    def _index_sequential_recordings(self) -> dict[str, list[str]]:
+        # Recordings made before the index existed are named 001.json, 002.json, ...
+        index: dict[str, list[str]] = {}
+        for path in sorted(self.directory.glob("[0-9][0-9][0-9]*.json")):
+            data = self._read_recording(path)
+            index.setdefault(request_hash(data["request"]["kwargs"]), []).append(path.name)
+        return index
+
+
+_recording_sessions: dict[Path, RecordingStore] = {}
+_recording_sessions_lock = threading.Lock()
+
+
+def shared_recording_session(directory: Path) -> RecordingStore:
+    """Get the store recording all the responses of this process to a directory.
+
+    The recordings are saved to a subdirectory named after the time of the first request.
+    Clients created at the same time, e.g. for the deployments of a pool or concurrent web
+    jobs, share the session so that they don't overwrite each other's index.
+
+    Args:
+        directory: Directory of the recording sessions
+
+    Returns:
+        The shared store
+    """
+    key = directory.absolute()
+    with _recording_sessions_lock:
+        store = _recording_sessions.get(key)
+        if store is None:
+            store = RecordingStore(directory / datetime.now(UTC).strftime("%Y%m%dT%H%M%S"))
+            _recording_sessions[key] = store
+        return store
+
+
 class _RecordingCompletions:
     _client: AzureOpenAI | OpenAI
     _mode: RecordingMode
-    _directory: Path
-    _counter: list[int]
+    _store: RecordingStore
 
-    def __init__(self, client: AzureOpenAI | OpenAI, mode: RecordingMode, directory: Path, counter: list[int]) -> None:
+    def __init__(self, client: AzureOpenAI | OpenAI, mode: RecordingMode, store: RecordingStore) -> None:
         self._client = client
         self._mode = mode
-        self._directory = directory
-        self._counter = counter
+        self._store = store
 
     def create(self, *args: object, **kwargs: object) -> ChatCompletion:
-        self._counter[0] += 1
-        file_path = self._directory / f"{self._counter[0]:03d}.json"
         if self._mode is RecordingMode.REPLAY:
-            with open(file_path) as f:
-                data = json.load(f)
-            return ChatCompletion.model_validate(data["response"])
+            return self._store.replay(kwargs)
+        start = time.perf_counter()
         response = self._client.chat.completions.create(*args, **kwargs)
         if self._mode is RecordingMode.RECORD:
-            self._directory.mkdir(parents=True, exist_ok=True)
-            with open(file_path, "w") as f:
-                json.dump(
-                    {"request": {"args": args, "kwargs": kwargs}, "response": response.model_dump()},
-                    f,
-                    indent=2,
-                )
+            self._store.record(kwargs, response, time.perf_counter() - start)
         return response
 
 
 class _RecordingChat:
     completions: _RecordingCompletions
 
-    def __init__(self, client: AzureOpenAI | OpenAI, mode: RecordingMode, directory: Path, counter: list[int]) -> None:
-        self.completions = _RecordingCompletions(client, mode, directory, counter)
+    def __init__(self, client: AzureOpenAI | OpenAI, mode: RecordingMode, store: RecordingStore) -> None:
+        self.completions = _RecordingCompletions(client, mode, store)
 
 
 class RecordingClient:
@@ -63,35 +272,60 @@ class RecordingClient:
     _mode: RecordingMode
     _base_directory: Path
     _directory: Path
-    _counter: list[int]
+    _store: RecordingStore
     chat: _RecordingChat
 
-    def __init__(self, client: AzureOpenAI | OpenAI, mode: RecordingMode, directory: Path) -> None:
+    def __init__(
+        self,
+        client: AzureOpenAI | OpenAI,
+        mode: RecordingMode,
+        directory: Path,
+        latency_scale: float | None = None,
+        latency_jitter: float = 0.0,
+    ) -> None:
         self._client = client
         self._mode = mode
         self._base_directory = directory
         if mode is RecordingMode.RECORD:
-            self._directory = directory / datetime.now(UTC).strftime("%Y%m%dT%H%M%S")
+            self._store = shared_recording_session(directory)
         else:
-            self._directory = directory
-        self._counter = [0]
-        self.chat = _RecordingChat(client, mode, self._directory, self._counter)
+            self._store = RecordingStore(directory, latency_scale, latency_jitter)
+        self._directory = self._store.directory
+        self.chat = _RecordingChat(client, mode, self._store)
 
     def __getattr__(self, item: str) -> object:  # pragma: no cover - passthrough
         return getattr(self._client, item)
 
 
-def create_openai_client(llm_config: LLMConfig) -> AzureOpenAI | OpenAI | RecordingClient:
-    """Create an OpenAI client optionally wrapped for recording or replay."""
+def create_openai_client(
+    llm_config: LLMConfig, max_retries: int | None = None
+) -> AzureOpenAI | OpenAI | RecordingClient:
+    """Create an OpenAI client optionally wrapped for recording or replay.
+
+    Args:
+        llm_config: Configuration of the deployment
+        max_retries: Number of times the client retries failed requests, the configured SDK
+            retries if None. Callers that retry requests themselves pass 0
+    """
+    timeout = Timeout(llm_config.read_timeout, connect=llm_config.connect_timeout)
+    max_retries = llm_config.sdk_max_retries if max_retries is None else max_retries
     if llm_config.provider == OpenAIProviderType.AZURE:
         assert llm_config.api_url is not None
         client: AzureOpenAI | OpenAI = AzureOpenAI(
             api_key=llm_config.api_key,
             api_version=llm_config.api_version,
             azure_endpoint=llm_config.api_url,
+            timeout=timeout,
+            max_retries=max_retries,
         )
     else:
-        client = OpenAI(api_key=llm_config.api_key, base_url=llm_config.api_url)
+        client = OpenAI(
+            api_key=llm_config.api_key,
+            base_url=llm_config.api_url,
+            timeout=timeout,
+            max_retries=max_retries,
+        )
+    logfire.instrument_openai(client)
 
     mode_str = os.environ.get("OPENAI_RECORDING_MODE", "off").lower()
     try:
@@ -99,6 +333,15 @@ def create_openai_client(llm_config: LLMConfig) -> AzureOpenAI | OpenAI | Record
     except ValueError:  # pragma: no cover - invalid mode falls back to off
         mode = RecordingMode.OFF
     directory = Path(os.environ.get("OPENAI_RECORDING_DIR", "openai_records"))
+    # Replay responses after their recorded latency times this scale, e.g. 1 for realistic timing
+    latency_scale = os.environ.get("OPENAI_REPLAY_LATENCY_SCALE")
+    latency_jitter = os.environ.get("OPENAI_REPLAY_LATENCY_JITTER")
     if mode is not RecordingMode.OFF:
-        return RecordingClient(client, mode, directory)
+        return RecordingClient(
+            client,
+            mode,
+            directory,
+            latency_scale=float(latency_scale) if latency_scale else None,
+            latency_jitter=float(latency_jitter) if latency_jitter else 0.0,
+        )
     return client
@@ -0,0 +1,118 @@
+"""Cache of interpreted pages so revised documents only re-interpret the pages that changed."""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+from collections.abc import Sequence
+from pathlib import Path
+from typing import TypeVar
+
+from PIL import Image
+from pydantic import BaseModel
+
+from survaize.model.questionnaire import SectionFragment
+
+logger = logging.getLogger(__name__)
+
+PAGE_RESULT_TYPE = TypeVar("PAGE_RESULT_TYPE", bound=BaseModel)
+
+
+def page_hash(image: Image.Image, ocr_text: str) -> str:
+    """Compute a hash identifying a page by its rasterized image and OCR text.
+
+    Args:
+        image: PIL Image of the page
+        ocr_text: OCR extracted text from the page
+
+    Returns:
+        Hex encoded SHA-256 digest
+    """
+    digest = hashlib.sha256()
+    digest.update(f"{image.mode}:{image.width}x{image.height}".encode())
+    digest.update(image.tobytes())
+    digest.update(ocr_text.encode("utf-8"))
+    return digest.hexdigest()
+
+
+class PageResultCache:
+    """Stores the interpretation of each page as a JSON file keyed by everything the result depends on.
+
+    The key combines the page content, the context carried over from the previous page, the
+    model and the prompt. An unchanged page is therefore reused as long as the pages before it
+    produced the same trailing context, while a changed page invalidates the pages after it
+    whose context it changes.
+    """
+
+    def __init__(self, directory: Path) -> None:
+        """Initialize the cache.
+
+        Args:
+            directory: Directory containing the cached page results
+        """
+        self.directory: Path = directory
+
+    def key(
+        self,
+        pages: Sequence[tuple[Image.Image, str]],
+        context: list[SectionFragment],
+        model: str,
+        prompt: str,
+    ) -> str:
+        """Compute the cache key of a page.
+
+        Args:
+            pages: Pages interpreted together in one request, as tuples of PIL Image and OCR text
+            context: Trailing sections from the previous page sent along with the pages
+            model: Name of the model interpreting the page
+            prompt: Instructions sent with the page, excluding anything specific to its position
+                in the document so that pages inserted or removed before it don't invalidate it
+
+        Returns:
+            Hex encoded SHA-256 digest
+        """
+        context_json = json.dumps([section.model_dump(mode="json", exclude_none=True) for section in context])
+        digest = hashlib.sha256()
+        page_hashes = [page_hash(image, ocr_text) for image, ocr_text in pages]
+        for part in (*page_hashes, context_json, model, prompt):
+            digest.update(part.encode("utf-8"))
+            digest.update(b"\0")
+        return digest.hexdigest()
+
+    def get(self, key: str, result_type: type[PAGE_RESULT_TYPE]) -> PAGE_RESULT_TYPE | None:
+        """Get the cached result of a page.
+
+        Args:
+            key: Cache key of the page, see :meth:`key`
+            result_type: Type of the cached result
+
+        Returns:
+            The cached result or None if the page is not cached
+        """
+        path = self._path(key)
+        if not path.exists():
+            return None
+        try:
+            return result_type.model_validate_json(path.read_bytes())
+        except ValueError as e:
+            logger.warning(f"Ignoring invalid cached page {path}: {e}")
+            return None
+
+    def put(self, key: str, result: BaseModel) -> None:
+        """Cache the result of a page.
+
+        Args:
+            key: Cache key of the page
+            result: The interpreted page
+        """
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Concurrent conversions may cache the same page, give each writer its own temporary file
+        temp_path = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        temp_path.write_text(result.model_dump_json(exclude_none=True), encoding="utf-8")
+        os.replace(temp_path, path)
+
+    def _path(self, key: str) -> Path:
+        # Spread the files over subdirectories to keep directories small
+        return self.directory / key[:2] / f"{key}.json"
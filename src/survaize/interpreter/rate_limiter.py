@@ -0,0 +1,252 @@
+"""Client side enforcement of the requests and tokens per minute limits of an LLM deployment."""
+
+import logging
+import threading
+import time
+from collections.abc import Callable, Generator, Iterable
+from contextlib import contextmanager
+from dataclasses import dataclass
+
+from openai.types.chat import ChatCompletionMessageParam
+
+from survaize.interpreter.deadline import check_wait
+
+logger = logging.getLogger(__name__)
+
+# Rough number of characters per token of English text
+_CHARACTERS_PER_TOKEN = 4
+# Approximate prompt tokens of a page image with high detail, e.g. 6 tiles of 170 tokens plus 85
+# for a scanned letter size page. Estimates are corrected with the actual usage of each response.
+_IMAGE_TOKENS = 1105
+# Completion tokens reserved for each request until the actual usage is known
+_EXPECTED_COMPLETION_TOKENS = 2000
+
+
+def estimate_request_tokens(messages: Iterable[ChatCompletionMessageParam]) -> int:
+    """Estimate the tokens a chat completion request counts against the tokens per minute limit.
+
+    Args:
+        messages: Messages of the request
+
+    Returns:
+        Estimated prompt tokens plus the completion tokens expected for the response
+    """
+    characters = 0
+    images = 0
+    for message in messages:
+        content = message.get("content")
+        if isinstance(content, str):
+            characters += len(content)
+            continue
+        for part in content or []:
+            if part.get("type") == "image_url":
+                images += 1
+            else:
+                characters += len(str(part.get("text", "")))
+    return characters // _CHARACTERS_PER_TOKEN + images * _IMAGE_TOKENS + _EXPECTED_COMPLETION_TOKENS
+
+
+class TokenBucket:
+    """Token bucket that lets callers reserve capacity ahead of time.
+
+    Reservations are taken immediately, even if that leaves the bucket in debt, and the caller
+    is told how long to wait for the bucket to refill. Requests are therefore served in the
+    order they arrive and large requests are not starved by small ones.
+    """
+
+    def __init__(self, capacity: float, refill_per_second: float, clock: Callable[[], float] = time.monotonic) -> None:
+        """Initialize a full bucket.
+
+        Args:
+            capacity: Maximum number of tokens the bucket holds
+            refill_per_second: Number of tokens added to the bucket per second
+            clock: Monotonic clock returning seconds
+        """
+        self.capacity: float = capacity
+        self.refill_per_second: float = refill_per_second
+        self._clock: Callable[[], float] = clock
+        self._tokens: float = capacity
+        self._updated: float = clock()
+
+    def reserve(self, amount: float) -> float:
+        """Take tokens from the bucket.
+
+        Args:
+            amount: Number of tokens to take
+
+        Returns:
+            Number of seconds to wait before the reservation is covered by the refill
+        """
+        self._refill()
+        self._tokens -= amount
+        return max(0.0, -self._tokens / self.refill_per_second)
+
+    def refund(self, amount: float) -> None:
+        """Return tokens to the bucket, or take more if amount is negative.
+
+        Args:
+            amount: Number of tokens to return
+        """
+        self._refill()
+        self._tokens = min(self.capacity, self._tokens + amount)
+
+    def drain(self) -> None:
+        """Empty the bucket, e.g. when the server reports that the limit has been reached."""
+        self._refill()
+        self._tokens = min(self._tokens, 0.0)
+
+    def _refill(self) -> None:
+        now = self._clock()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.refill_per_second)
+        self._updated = now
+
+
+@dataclass
+class RateLimitReservation:
+    """Capacity reserved for a single request."""
+
+    estimated_tokens: int
+
+
+class RateLimiter:
+    """Schedules LLM requests so they stay within requests and tokens per minute limits.
+
+    A single limiter is shared by all interpreters using the same deployment in the process
+    (see :func:`shared_rate_limiter`) so concurrent conversions share the budget. When the server
+    still rejects a request with a 429, :meth:`pause` holds back every request until the time
+    given by its ``retry-after`` header.
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: int | None,
+        tokens_per_minute: int | None,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        """Initialize the limiter.
+
+        Args:
+            requests_per_minute: Maximum number of requests per minute, unlimited if None
+            tokens_per_minute: Maximum number of prompt and completion tokens per minute, unlimited if None
+            clock: Monotonic clock returning seconds
+            sleep: Function to sleep for a number of seconds
+        """
+        self._requests: TokenBucket | None = (
+            TokenBucket(requests_per_minute, requests_per_minute / 60, clock) if requests_per_minute else None
+        )
+        self._tokens: TokenBucket | None = (
+            TokenBucket(tokens_per_minute, tokens_per_minute / 60, clock) if tokens_per_minute else None
+        )
+        self._clock: Callable[[], float] = clock
+        self._sleep: Callable[[float], None] = sleep
+        self._paused_until: float = 0.0
+        self._lock: threading.Lock = threading.Lock()
+
+    @contextmanager
+    def acquire(self, estimated_tokens: int) -> Generator[RateLimitReservation]:
+        """Wait until a request fits within the limits and reserve capacity for it.
+
+        Args:
+            estimated_tokens: Estimated tokens of the request, see :func:`estimate_request_tokens`
+
+        Yields:
+            The reservation, pass it to :meth:`record_usage` once the actual usage is known
+
+        Raises:
+            PageDeadlineExceededError: If the wait would outlast the active page deadline
+        """
+        with self._lock:
+            now = self._clock()
+            wait = max(0.0, self._paused_until - now)
+            if self._requests:
+                wait = max(wait, self._requests.reserve(1))
+            if self._tokens:
+                wait = max(wait, self._tokens.reserve(estimated_tokens))
+        if wait > 0:
+            try:
+                check_wait(wait)
+            except Exception:
+                # The request won't be sent, give its capacity back to the others
+                with self._lock:
+                    if self._requests:
+                        self._requests.refund(1)
+                    if self._tokens:
+                        self._tokens.refund(estimated_tokens)
+                raise
+            logger.debug(f"Waiting {wait:.2f}s for the LLM rate limit")
+            self._sleep(wait)
+        yield RateLimitReservation(estimated_tokens=estimated_tokens)
+
+    def record_usage(self, reservation: RateLimitReservation, total_tokens: int) -> None:
+        """Correct the tokens reserved for a request with its actual usage.
+
+        Args:
+            reservation: The reservation of the request
+            total_tokens: Actual prompt plus completion tokens of the request
+        """
+        if self._tokens:
+            with self._lock:
+                self._tokens.refund(reservation.estimated_tokens - total_tokens)
+
+    def pause(self, seconds: float) -> None:
+        """Hold back all requests, e.g. after a 429 response with a retry-after header.
+
+        Args:
+            seconds: Number of seconds to pause for
+        """
+        with self._lock:
+            self._paused_until = max(self._paused_until, self._clock() + seconds)
+            # The server's view of the budget wins over our estimate
+            if self._requests:
+                self._requests.drain()
+            if self._tokens:
+                self._tokens.drain()
+
+
+_shared_limiters: dict[tuple[str, int | None, int | None], RateLimiter] = {}
+_shared_limiters_lock = threading.Lock()
+
+
+def shared_rate_limiter(endpoint: str, requests_per_minute: int | None, tokens_per_minute: int | None) -> RateLimiter:
+    """Get the rate limiter shared by all interpreters using an endpoint in this process.
+
+    Args:
+        endpoint: Identifies the deployment the limits apply to, e.g. its URL
+        requests_per_minute: Maximum number of requests per minute, unlimited if None
+        tokens_per_minute: Maximum number of tokens per minute, unlimited if None
+
+    Returns:
+        The shared rate limiter
+    """
+    key = (endpoint, requests_per_minute, tokens_per_minute)
+    with _shared_limiters_lock:
+        limiter = _shared_limiters.get(key)
+        if limiter is None:
+            limiter = RateLimiter(requests_per_minute, tokens_per_minute)
+            _shared_limiters[key] = limiter
+        return limiter
+
+
+def retry_after_seconds(headers: object, default: float) -> float:
+    """Get the delay requested by a 429 response.
+
+    Args:
+        headers: Headers of the response (an httpx.Headers or mapping)
+        default: Delay to use when the response doesn't specify one
+
+    Returns:
+        Number of seconds to wait before retrying
+    """
+    get = getattr(headers, "get", None)
+    if get is None:
+        return default
+    for name, scale in (("retry-after-ms", 0.001), ("retry-after", 1.0)):
+        value = get(name)
+        if value is None:
+            continue
+        try:
+            return max(0.0, float(value) * scale)
+        except ValueError:
+            continue
+    return default
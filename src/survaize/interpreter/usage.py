@@ -0,0 +1,142 @@
+"""Token usage accounting for LLM requests."""
+
+from collections.abc import Generator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+
+
+@dataclass
+class LLMUsage:
+    """Token usage information."""
+
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    # Prompt tokens served from the provider's prompt cache, included in prompt_tokens
+    cached_tokens: int = 0
+    # Number of pages interpreted by each model
+    pages_by_model: dict[str, int] = field(default_factory=dict)
+    # Number of completions used and how many of them were hedged with a duplicate request
+    requests: int = 0
+    hedged_requests: int = 0
+    # Tokens of the duplicate requests whose responses were discarded, not included in total_tokens
+    hedge_overhead_tokens: int = 0
+    # Size of the base64 encoded page images sent to the LLM
+    image_bytes: int = 0
+
+    def add(self, prompt: int, completion: int, cached: int = 0) -> None:
+        self.prompt_tokens += prompt
+        self.completion_tokens += completion
+        self.cached_tokens += cached
+
+    def add_request(self, hedged: bool = False, requests: int = 1) -> None:
+        self.requests += requests
+        if hedged:
+            self.hedged_requests += requests
+
+    def add_hedge_overhead(self, tokens: int) -> None:
+        self.hedge_overhead_tokens += tokens
+
+    def add_image(self, size: int) -> None:
+        self.image_bytes += size
+
+    def add_page(self, model: str, pages: int = 1) -> None:
+        self.pages_by_model[model] = self.pages_by_model.get(model, 0) + pages
+
+    def merge(self, other: "LLMUsage") -> None:
+        """Add the usage of another LLMUsage to this one."""
+        self.add(other.prompt_tokens, other.completion_tokens, other.cached_tokens)
+        for model, pages in other.pages_by_model.items():
+            self.add_page(model, pages)
+        self.requests += other.requests
+        self.hedged_requests += other.hedged_requests
+        self.hedge_overhead_tokens += other.hedge_overhead_tokens
+        self.image_bytes += other.image_bytes
+
+    @property
+    def total_tokens(self) -> int:
+        return self.prompt_tokens + self.completion_tokens
+
+    @property
+    def cache_hit_rate(self) -> float:
+        """Fraction of prompt tokens that were served from the prompt cache."""
+        return self.cached_tokens / self.prompt_tokens if self.prompt_tokens else 0.0
+
+    @property
+    def hedge_rate(self) -> float:
+        """Fraction of requests for which a duplicate request was sent."""
+        return self.hedged_requests / self.requests if self.requests else 0.0
+
+    @property
+    def hedge_overhead(self) -> float:
+        """Tokens spent on discarded duplicate requests relative to the tokens of the responses used."""
+        return self.hedge_overhead_tokens / self.total_tokens if self.total_tokens else 0.0
+
+
+_current_usage: ContextVar[LLMUsage | None] = ContextVar("survaize_llm_usage", default=None)
+
+
+@contextmanager
+def track_usage() -> Generator[LLMUsage]:
+    """Collect the token usage of all LLM requests made in the current context.
+
+    The interpreter reports the usage of every response to the innermost active
+    tracker, so callers can attribute token usage to a unit of work (e.g. one file
+    of a batch) even when several are processed concurrently in different threads.
+
+    Yields:
+        The usage accumulated while the context is active
+    """
+    usage = LLMUsage()
+    token = _current_usage.set(usage)
+    try:
+        yield usage
+    finally:
+        _current_usage.reset(token)
+
+
+def record_usage(prompt: int, completion: int, cached: int = 0) -> None:
+    """Add token usage to the active tracker, if any.
+
+    Args:
+        prompt: Number of prompt tokens used
+        completion: Number of completion tokens used
+        cached: Number of the prompt tokens served from the prompt cache
+    """
+    usage = _current_usage.get()
+    if usage is not None:
+        usage.add(prompt, completion, cached)
+
+
+def record_page_model(model: str, pages: int = 1) -> None:
+    """Record the model that interpreted pages with the active tracker, if any.
+
+    Args:
+        model: Name of the model
+        pages: Number of pages interpreted
+    """
+    usage = _current_usage.get()
+    if usage is not None:
+        usage.add_page(model, pages)
+
+
+def record_request(hedged: bool = False) -> None:
+    """Count a completion used by the interpreter with the active tracker, if any.
+
+    Args:
+        hedged: Whether a duplicate request was sent for the completion
+    """
+    usage = _current_usage.get()
+    if usage is not None:
+        usage.add_request(hedged)
+
+
+def record_hedge_overhead(tokens: int) -> None:
+    """Add the tokens of a discarded duplicate request to the active tracker, if any.
+
+    Args:
+        tokens: Prompt plus completion tokens of the discarded request
+    """
+    usage = _current_usage.get()
+    if usage is not None:
+        usage.add_hedge_overhead(tokens)
@@ -0,0 +1 @@
+"""Tools for load testing Survaize without calling a real LLM API."""
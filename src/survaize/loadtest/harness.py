@@ -0,0 +1,301 @@
+"""Load test of the web API: uploads questionnaires, follows their progress and saves them.
+
+Jobs are started at a fixed rate, independently of how fast the server answers, so that the
+report shows how throughput, latency and memory degrade once the server can't keep up. Run
+the server with a stub (see :mod:`survaize.loadtest.stub_llm`) or replayed LLM backend so
+that the results measure Survaize rather than the LLM API.
+"""
+
+import asyncio
+import json
+import math
+import time
+from dataclasses import dataclass, field
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Literal, cast
+
+import httpx
+from websockets.asyncio.client import connect
+
+# Stages of a job, errors are counted by the stage they happened in
+_STAGES = ("upload", "progress", "save")
+_PERCENTILES = {"p50": 0.5, "p95": 0.95, "p99": 0.99}
+
+
+@dataclass(frozen=True)
+class LoadTestConfig:
+    """Options of a load test."""
+
+    # Base URL of the Survaize web server, e.g. http://127.0.0.1:8000
+    base_url: str
+    # Questionnaire uploaded by every job
+    input_file: Path
+    input_format: Literal["json", "pdf"]
+    # Format the interpreted questionnaire is saved in, not saved if None
+    save_format: Literal["json", "cspro"] | None = "json"
+    # Total number of jobs to start
+    jobs: int = 10
+    # Jobs started per second
+    rate: float = 1.0
+    # Maximum number of jobs in progress, jobs due to start wait for a slot. Unlimited if None
+    max_concurrency: int | None = None
+    # Process id of the server to sample the resident memory of, not sampled if None
+    server_pid: int | None = None
+    # Seconds a single job may take before it is counted as failed
+    job_timeout: float = 600.0
+    # Seconds between samples of the server's resident memory
+    rss_interval: float = 0.5
+
+
+@dataclass
+class JobResult:
+    """Timings of a single job, in seconds.
+
+    The upload, first progress and completion times are measured from the time the job was
+    scheduled to start. They include any wait for a concurrency slot, so that a slow server
+    delaying the start of later jobs doesn't hide its slowness from the report.
+    """
+
+    upload_seconds: float | None = None
+    first_progress_seconds: float | None = None
+    completed_seconds: float | None = None
+    # Duration of the save request alone, which starts once the job has completed
+    save_seconds: float | None = None
+    # Time between consecutive progress messages
+    progress_intervals: list[float] = field(default_factory=list)
+    error_stage: str | None = None
+    error: str | None = None
+
+    def fail(self, stage: str, error: str) -> "JobResult":
+        self.error_stage = stage
+        self.error = error
+        return self
+
+
+@dataclass(frozen=True)
+class LatencySummary:
+    """Percentiles of a latency in seconds."""
+
+    count: int
+    p50: float
+    p95: float
+    p99: float
+    max: float
+
+    @classmethod
+    def from_samples(cls, samples: list[float]) -> "LatencySummary | None":
+        if not samples:
+            return None
+        ordered = sorted(samples)
+        # Nearest rank, the smallest sample that at least p of the samples don't exceed
+        values = {name: ordered[max(0, math.ceil(p * len(ordered)) - 1)] for name, p in _PERCENTILES.items()}
+        return cls(len(ordered), values["p50"], values["p95"], values["p99"], ordered[-1])
+
+    def to_dict(self) -> dict[str, object]:
+        return {
+            "count": self.count,
+            "p50": round(self.p50, 4),
+            "p95": round(self.p95, 4),
+            "p99": round(self.p99, 4),
+            "max": round(self.max, 4),
+        }
+
+
+@dataclass
+class LoadTestReport:
+    """Outcome of a load test."""
+
+    started_at: datetime
+    duration_seconds: float = 0.0
+    results: list[JobResult] = field(default_factory=list)
+    # Resident memory of the server sampled during the test, in bytes
+    rss_samples: list[int] = field(default_factory=list)
+
+    @property
+    def completed(self) -> int:
+        return sum(1 for result in self.results if result.error_stage is None)
+
+    @property
+    def failed(self) -> int:
+        return len(self.results) - self.completed
+
+    @property
+    def throughput(self) -> float:
+        """Completed jobs per second."""
+        return self.completed / self.duration_seconds if self.duration_seconds else 0.0
+
+    @property
+    def error_rate(self) -> float:
+        return self.failed / len(self.results) if self.results else 0.0
+
+    @property
+    def errors_by_stage(self) -> dict[str, int]:
+        return {stage: sum(1 for result in self.results if result.error_stage == stage) for stage in _STAGES}
+
+    @property
+    def latencies(self) -> dict[str, LatencySummary | None]:
+        """Latency percentiles of each stage of the successful steps of all jobs."""
+        return {
+            "upload": LatencySummary.from_samples(_samples(self.results, "upload_seconds")),
+            "first_progress": LatencySummary.from_samples(_samples(self.results, "first_progress_seconds")),
+            "progress_interval": LatencySummary.from_samples(
+                [interval for result in self.results for interval in result.progress_intervals]
+            ),
+            "completed": LatencySummary.from_samples(_samples(self.results, "completed_seconds")),
+            "save": LatencySummary.from_samples(_samples(self.results, "save_seconds")),
+        }
+
+    def to_dict(self) -> dict[str, object]:
+        errors = [{"stage": result.error_stage, "error": result.error} for result in self.results if result.error_stage]
+        return {
+            "started_at": self.started_at.isoformat(),
+            "duration_seconds": round(self.duration_seconds, 3),
+            "jobs": len(self.results),
+            "completed": self.completed,
+            "failed": self.failed,
+            "throughput_jobs_per_second": round(self.throughput, 4),
+            "error_rate": round(self.error_rate, 4),
+            "errors_by_stage": self.errors_by_stage,
+            "latency_seconds": {
+                name: summary.to_dict() if summary else None for name, summary in self.latencies.items()
+            },
+            "server_rss_bytes": {
+                "start": self.rss_samples[0],
+                "peak": max(self.rss_samples),
+                "end": self.rss_samples[-1],
+            }
+            if self.rss_samples
+            else None,
+            "errors": errors,
+        }
+
+    def save(self, path: Path) -> None:
+        """Save the report as JSON.
+
+        Args:
+            path: Path of the JSON file to write
+        """
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(self.to_dict(), indent=2), encoding="utf-8")
+
+
+def process_rss_bytes(pid: int) -> int | None:
+    """Resident memory of a process, None if it can't be read (only supported on Linux).
+
+    Args:
+        pid: Process id
+    """
+    try:
+        status = Path(f"/proc/{pid}/status").read_text(encoding="utf-8")
+    except OSError:
+        return None
+    for line in status.splitlines():
+        if line.startswith("VmRSS:"):
+            return int(line.split()[1]) * 1024
+    return None
+
+
+async def run_load_test(config: LoadTestConfig) -> LoadTestReport:
+    """Run a load test against a running server.
+
+    Args:
+        config: Options of the load test
+
+    Returns:
+        Report of the throughput, latencies, errors and server memory
+    """
+    contents = config.input_file.read_bytes()
+    report = LoadTestReport(started_at=datetime.now(UTC))
+    slots = asyncio.Semaphore(config.max_concurrency) if config.max_concurrency else None
+    start = time.perf_counter()
+
+    async def sample_rss(pid: int) -> None:
+        while True:
+            rss = process_rss_bytes(pid)
+            if rss is not None:
+                report.rss_samples.append(rss)
+            await asyncio.sleep(config.rss_interval)
+
+    async def scheduled_job(client: httpx.AsyncClient, index: int) -> JobResult:
+        # Start at a fixed rate, whether or not earlier jobs have finished
+        scheduled_start = start + index / config.rate
+        await asyncio.sleep(max(0.0, scheduled_start - time.perf_counter()))
+        if slots is None:
+            return await _run_job(client, config, contents, scheduled_start)
+        async with slots:
+            return await _run_job(client, config, contents, scheduled_start)
+
+    sampler = asyncio.create_task(sample_rss(config.server_pid)) if config.server_pid else None
+    try:
+        async with httpx.AsyncClient(base_url=config.base_url, timeout=config.job_timeout) as client:
+            report.results = list(await asyncio.gather(*(scheduled_job(client, index) for index in range(config.jobs))))
+    finally:
+        report.duration_seconds = time.perf_counter() - start
+        if sampler:
+            sampler.cancel()
+    if config.server_pid and (rss := process_rss_bytes(config.server_pid)) is not None:
+        report.rss_samples.append(rss)
+    return report
+
+
+async def _run_job(client: httpx.AsyncClient, config: LoadTestConfig, contents: bytes, start: float) -> JobResult:
+    result = JobResult()
+    try:
+        response = await client.post(
+            "/api/questionnaire/read",
+            files={"file": (config.input_file.name, contents)},
+            data={"format": config.input_format},
+        )
+        if response.status_code != 200:
+            return result.fail("upload", f"HTTP {response.status_code}: {response.text}")
+        result.upload_seconds = time.perf_counter() - start
+        job_id = cast(str, response.json()["job_id"])
+    except (httpx.HTTPError, OSError) as e:
+        return result.fail("upload", repr(e))
+
+    questionnaire: object = None
+    try:
+        async with asyncio.timeout(config.job_timeout):
+            questionnaire = await _follow_progress(config, job_id, start, result)
+    except Exception as e:  # noqa: BLE001
+        return result.fail("progress", repr(e))
+    if result.error_stage or config.save_format is None:
+        return result
+
+    save_start = time.perf_counter()
+    try:
+        response = await client.post(f"/api/questionnaire/save/{config.save_format}", json=questionnaire)
+        if response.status_code != 200:
+            return result.fail("save", f"HTTP {response.status_code}: {response.text}")
+        result.save_seconds = time.perf_counter() - save_start
+    except (httpx.HTTPError, OSError) as e:
+        return result.fail("save", repr(e))
+    return result
+
+
+async def _follow_progress(config: LoadTestConfig, job_id: str, start: float, result: JobResult) -> object:
+    """Read the progress messages of a job until it ends and return the questionnaire."""
+    url = config.base_url.replace("http", "ws", 1).rstrip("/") + f"/api/questionnaire/read/{job_id}"
+    last_message: float | None = None
+    async with connect(url, max_size=None) as websocket:
+        async for raw in websocket:
+            now = time.perf_counter()
+            if last_message is None:
+                result.first_progress_seconds = now - start
+            else:
+                result.progress_intervals.append(now - last_message)
+            last_message = now
+            message = cast(dict[str, object], json.loads(raw))
+            if "error" in message:
+                result.fail("progress", str(message["error"]))
+                return None
+            if "questionnaire" in message:
+                result.completed_seconds = now - start
+                return message["questionnaire"]
+    result.fail("progress", "Progress websocket closed before the job finished")
+    return None
+
+
+def _samples(results: list[JobResult], name: str) -> list[float]:
+    return [value for result in results if (value := cast(float | None, getattr(result, name))) is not None]
@@ -0,0 +1,228 @@
+"""OpenAI compatible chat completions server that answers without calling a real LLM.
+
+The stub serves recorded responses when a recording matches the request and otherwise
+synthesizes a valid questionnaire for the requested pages, so the whole stack (web API,
+interpreter, rate limiting, retries) can be load tested offline. Latency, rate limits,
+server errors and invalid JSON are simulated to exercise the interpreter's error handling.
+"""
+
+import asyncio
+import contextlib
+import json
+import logging
+import math
+import random
+import re
+import time
+import uuid
+from dataclasses import dataclass
+from pathlib import Path
+from typing import cast
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+from openai.types.chat import ChatCompletionMessageParam
+
+from survaize.interpreter.openai_recorder import RecordingNotFoundError, RecordingStore
+from survaize.interpreter.rate_limiter import TokenBucket, estimate_request_tokens
+
+logger = logging.getLogger(__name__)
+
+# First text of the message sent for the pages after the first one, see AIQuestionnaireInterpreter
+_PAGES_PATTERN = re.compile(r"^Pages? (?P<first>\d+)(?: to (?P<last>\d+))? of the questionnaire")
+_CHARACTERS_PER_TOKEN = 4
+
+
+@dataclass(frozen=True)
+class StubLLMConfig:
+    """Behaviour of the stub LLM server."""
+
+    # Median latency of a response in seconds, latencies are log-normally distributed
+    latency_median: float = 1.0
+    # Standard deviation of the logarithm of the latency, 0 for a constant latency
+    latency_sigma: float = 0.5
+    # Requests per minute before 429 responses are returned, unlimited if None
+    requests_per_minute: int | None = None
+    # Estimated tokens per minute before 429 responses are returned, unlimited if None
+    tokens_per_minute: int | None = None
+    # Fraction of requests that fail with a 500 error
+    error_rate: float = 0.0
+    # Fraction of responses whose content is truncated so that it is not valid JSON
+    invalid_json_rate: float = 0.0
+    # Number of questions in each synthesized page
+    questions_per_page: int = 3
+    # Directory of recorded responses (see RecordingStore) served for requests that match them
+    recordings_dir: Path | None = None
+    # Seed of the random number generator, for reproducible runs
+    seed: int | None = None
+
+
+def create_stub_app(config: StubLLMConfig) -> FastAPI:
+    """Create the stub LLM application.
+
+    Both the OpenAI (``/v1/chat/completions``) and Azure
+    (``/openai/deployments/{deployment}/chat/completions``) routes are served, so the stub can
+    be used as ``api_url`` with either provider.
+
+    Args:
+        config: Behaviour of the stub
+
+    Returns:
+        FastAPI application
+    """
+    app = FastAPI(title="Survaize stub LLM")
+    rng = random.Random(config.seed)
+    store = RecordingStore(config.recordings_dir) if config.recordings_dir else None
+    request_bucket = (
+        TokenBucket(config.requests_per_minute, config.requests_per_minute / 60) if config.requests_per_minute else None
+    )
+    token_bucket = (
+        TokenBucket(config.tokens_per_minute, config.tokens_per_minute / 60) if config.tokens_per_minute else None
+    )
+
+    async def chat_completions(body: dict[str, object], model: str) -> JSONResponse:
+        messages = cast(list[ChatCompletionMessageParam], body.get("messages", []))
+        estimated_tokens = estimate_request_tokens(messages)
+
+        # Requests handled on the event loop thread so the buckets need no lock
+        waits: list[float] = []
+        if request_bucket:
+            waits.append(request_bucket.reserve(1))
+        if token_bucket:
+            waits.append(token_bucket.reserve(estimated_tokens))
+        if any(wait > 0 for wait in waits):
+            if request_bucket:
+                request_bucket.refund(1)
+            if token_bucket:
+                token_bucket.refund(estimated_tokens)
+            retry_after = max(waits)
+            return _error_response(
+                429,
+                "rate_limit_exceeded",
+                f"Rate limit reached, retry after {retry_after:.1f} seconds",
+                {"retry-after-ms": str(math.ceil(retry_after * 1000)), "retry-after": str(math.ceil(retry_after))},
+            )
+
+        await asyncio.sleep(_latency(config, rng))
+        if rng.random() < config.error_rate:
+            return _error_response(500, "server_error", "The stub server had an error while processing the request")
+
+        content: str | None = None
+        if store:
+            with contextlib.suppress(RecordingNotFoundError):
+                content = store.replay(body).choices[0].message.content
+        if content is None:
+            content = json.dumps(_synthesize_response(messages, config.questions_per_page))
+        if rng.random() < config.invalid_json_rate:
+            content = content[: len(content) // 2]
+
+        completion_tokens = len(content) // _CHARACTERS_PER_TOKEN
+        return JSONResponse(
+            {
+                "id": f"chatcmpl-{uuid.uuid4().hex}",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": model,
+                "choices": [
+                    {
+                        "index": 0,
+                        "finish_reason": "stop",
+                        "message": {"role": "assistant", "content": content},
+                    }
+                ],
+                "usage": {
+                    "prompt_tokens": estimated_tokens,
+                    "completion_tokens": completion_tokens,
+                    "total_tokens": estimated_tokens + completion_tokens,
+                },
+            }
+        )
+
+    @app.post("/v1/chat/completions")
+    @app.post("/chat/completions")
+    async def openai_chat_completions(request: Request) -> JSONResponse:
+        body = cast(dict[str, object], await request.json())
+        return await chat_completions(body, str(body.get("model", "stub")))
+
+    @app.post("/openai/deployments/{deployment}/chat/completions")
+    async def azure_chat_completions(deployment: str, request: Request) -> JSONResponse:
+        return await chat_completions(cast(dict[str, object], await request.json()), deployment)
+
+    return app
+
+
+def run_stub_server(config: StubLLMConfig, host: str = "127.0.0.1", port: int = 8100) -> None:
+    """Run the stub LLM server until it is interrupted.
+
+    Args:
+        config: Behaviour of the stub
+        host: The host to bind to
+        port: The port to bind to
+    """
+    logger.info(f"Starting stub LLM server at http://{host}:{port}/v1")
+    uvicorn.run(create_stub_app(config), host=host, port=port, log_level="warning")
+
+
+def _latency(config: StubLLMConfig, rng: random.Random) -> float:
+    if config.latency_median <= 0:
+        return 0.0
+    return rng.lognormvariate(math.log(config.latency_median), config.latency_sigma)
+
+
+def _error_response(status_code: int, code: str, message: str, headers: dict[str, str] | None = None) -> JSONResponse:
+    return JSONResponse(
+        {"error": {"message": message, "type": code, "param": None, "code": code}},
+        status_code=status_code,
+        headers=headers,
+    )
+
+
+def _synthesize_response(messages: list[ChatCompletionMessageParam], questions_per_page: int) -> dict[str, object]:
+    """Questionnaire for the first page or partial questionnaire for the pages of a request."""
+    pages = _requested_pages(messages)
+    if pages is None:
+        section = _section(1, questions_per_page)
+        return {
+            "title": "Stub questionnaire",
+            "id_fields": [_question_id(1, 1)],
+            "sections": [section],
+            "trailing_sections": [],
+        }
+    return {"sections": [_section(page, questions_per_page) for page in pages], "trailing_sections": []}
+
+
+def _requested_pages(messages: list[ChatCompletionMessageParam]) -> range | None:
+    """Pages requested after the first one, None for the first page."""
+    for message in messages:
+        content = message.get("content")
+        if message["role"] != "user" or not isinstance(content, list):
+            continue
+        for part in content:
+            text = part.get("text")
+            if isinstance(text, str) and (match := _PAGES_PATTERN.match(text)):
+                first = int(match["first"])
+                return range(first, int(match["last"] or first) + 1)
+    return None
+
+
+def _section(page: int, questions: int) -> dict[str, object]:
+    return {
+        "id": f"S{page}",
+        "number": str(page),
+        "title": f"Section of page {page}",
+        "occurrences": 1,
+        "questions": [
+            {
+                "number": f"{page}.{number}",
+                "id": _question_id(page, number),
+                "text": f"Question {number} of page {page}?",
+                "type": "text",
+            }
+            for number in range(1, questions + 1)
+        ],
+    }
+
+
+def _question_id(page: int, number: int) -> str:
+    return f"P{page}_Q{number}"
@@ -1,20 +1,37 @@
 """Command-line interface for Survaize."""
 
+import functools
 import logging
 import os
 import threading
 import webbrowser
+from collections.abc import Callable
+from contextlib import nullcontext
+from dataclasses import dataclass, fields
 from pathlib import Path
-from typing import Literal
+from typing import TYPE_CHECKING, Any, Literal, TypeVar
 
 import click
-import logfire
 from dotenv import load_dotenv
 from rich.console import Console
+from rich.progress import BarColumn, Progress, SpinnerColumn, TaskProgressColumn, TextColumn, TimeElapsedColumn
 
-from survaize.config.llm_config import LLMConfig, OpenAIProviderType
+from survaize.config.interpreter_config import InterpreterConfig
+from survaize.config.llm_config import (
+    DEFAULT_AZURE_API_VERSION,
+    LLMConfig,
+    LLMEndpoint,
+    OpenAIProviderType,
+    RoutingPolicy,
+    load_endpoints,
+    parse_model_list,
+)
+from survaize.convert.batch import BatchConverter, BatchItemResult, find_input_files
 from survaize.convert.converter import QuestionnaireConverter
-from survaize.web.backend.server import run_server
+from survaize.telemetry.profiler import Profiler, profiling
+
+if TYPE_CHECKING:
+    import logfire
 
 # Load environment variables from .env file if present
 load_dotenv()
@@ -28,11 +45,354 @@ console = Console()
 OutputFormat = Literal["json", "cspro"]
 
 
-def configure_logfire():
+def configure_logfire() -> "logfire.Logfire":
+    # Imported here rather than at module level as logfire is slow to import and is
+    # not needed for --help.
+    import logfire
+
+    from survaize.telemetry.trace_export import local_span_processor_from_env
+
     # Token is read from LOGFIRE_TOKEN environment variable by default
-    # and is disabled if not present.
-    logfire.configure(send_to_logfire="if-token-present")
-    logfire.instrument_openai()
+    # and is disabled if not present. Spans are also written to local files if
+    # SURVAIZE_TRACE_DIR is set, e.g. on machines that can't reach logfire.
+    # OpenAI clients are instrumented individually when created, see create_openai_client
+    local_processor = local_span_processor_from_env()
+    return logfire.configure(
+        send_to_logfire="if-token-present",
+        additional_span_processors=[local_processor] if local_processor else None,
+    )
+
+
+_MISSING_API_KEY_MESSAGE = (
+    "An OpenAI API key is required to read PDF questionnaires. "
+    + "Please provide it via the --api-key argument or the OPENAI_API_KEY environment variable."
+)
+
+
+@dataclass(frozen=True)
+class LLMOptions:
+    """Values of the LLM API options shared by the commands, see llm_api_options."""
+
+    api_key: str | None
+    api_provider: str
+    api_version: str | None
+    api_url: str | None
+    api_model: str
+    cascade_models: str | None
+    requests_per_minute: int | None
+    tokens_per_minute: int | None
+    hedge_percentile: float | None
+    endpoints_file: Path | None
+    routing_policy: str
+    fallback_api_url: str | None
+    fallback_api_key: str | None
+    fallback_provider: str
+    fallback_model: str | None
+    connect_timeout: float
+    request_timeout: float
+    sdk_max_retries: int
+    page_deadline: float | None
+
+
+def create_llm_config(
+    options: LLMOptions,
+    max_concurrent_requests: int | None = None,
+    adaptive_concurrency: bool = False,
+) -> LLMConfig | None:
+    """Create the LLM configuration from command line options.
+
+    Returns:
+        The LLM configuration or None if no API key was provided, in which case only
+        formats that don't need an LLM can be read
+    """
+    if not options.api_key:
+        return None
+
+    # The options are strings, which never compare equal to the members of the enum
+    provider = OpenAIProviderType(options.api_provider)
+    fallback_provider = OpenAIProviderType(options.fallback_provider)
+    api_version = options.api_version
+    if provider == OpenAIProviderType.AZURE:
+        if not options.api_url:
+            raise click.UsageError(
+                "Azure requires a url for the API endpoint "
+                + "Please provide it via the --api-url argument or the OPENAI_API_URL environment variable."
+            )
+        api_version = api_version or DEFAULT_AZURE_API_VERSION
+
+    return LLMConfig(
+        api_key=options.api_key,
+        api_version=api_version,
+        api_url=options.api_url,
+        model=options.api_model,
+        provider=provider,
+        max_concurrent_requests=max_concurrent_requests,
+        adaptive_concurrency=adaptive_concurrency,
+        cascade_models=parse_model_list(options.cascade_models),
+        requests_per_minute=options.requests_per_minute,
+        tokens_per_minute=options.tokens_per_minute,
+        hedge_percentile=options.hedge_percentile,
+        endpoints=load_endpoints(options.endpoints_file) if options.endpoints_file else (),
+        routing_policy=RoutingPolicy(options.routing_policy),
+        fallback=(
+            LLMEndpoint(
+                api_url=options.fallback_api_url,
+                api_key=options.fallback_api_key,
+                provider=fallback_provider,
+                model=options.fallback_model,
+            )
+            if options.fallback_api_url
+            else None
+        ),
+        connect_timeout=options.connect_timeout,
+        read_timeout=options.request_timeout,
+        sdk_max_retries=options.sdk_max_retries,
+        page_deadline_seconds=options.page_deadline,
+    )
+
+
+_LLM_OPTIONS = [
+    click.option(
+        "--api-key",
+        envvar="OPENAI_API_KEY",
+        help="OpenAI API key (can also be set via OPENAI_API_KEY env var), required to read PDF questionnaires",
+    ),
+    click.option(
+        "--api-provider",
+        type=click.Choice(["openai", "azure"]),
+        default="openai",
+        envvar="OPENAI_PROVIDER",
+        help="OpenAI API provider type, can also be set via OPENAI_PROVIDER environment variable",
+    ),
+    click.option(
+        "--api-version",
+        envvar="OPENAI_API_VERSION",
+        help="OpenAI API version for Azure only (can also be set via OPENAI_API_VERSION env var)",
+    ),
+    click.option(
+        "--api-url",
+        envvar="OPENAI_API_URL",
+        help="OpenAI API URL required for Azure (can also be set via OPENAI_API_URL env var)",
+    ),
+    click.option(
+        "--api-model",
+        envvar="OPENAI_API_MODEL",
+        default="gpt-4.1",
+        help="OpenAI API model name (can also be set via OPENAI_API_MODEL env var). Defaults to gpt-4.1",
+    ),
+    click.option(
+        "--cascade-models",
+        envvar="OPENAI_CASCADE_MODELS",
+        help="Comma separated list of cheaper models to try before --api-model, e.g. gpt-4.1-mini. Pages are "
+        + "escalated to the next model when a model fails (can also be set via OPENAI_CASCADE_MODELS env var)",
+    ),
+    click.option(
+        "--requests-per-minute",
+        type=click.IntRange(min=1),
+        envvar="OPENAI_REQUESTS_PER_MINUTE",
+        help="Requests per minute limit of the API deployment, requests are scheduled to stay within it "
+        + "(can also be set via OPENAI_REQUESTS_PER_MINUTE env var)",
+    ),
+    click.option(
+        "--tokens-per-minute",
+        type=click.IntRange(min=1),
+        envvar="OPENAI_TOKENS_PER_MINUTE",
+        help="Tokens per minute limit of the API deployment, requests are scheduled to stay within it "
+        + "(can also be set via OPENAI_TOKENS_PER_MINUTE env var)",
+    ),
+    click.option(
+        "--hedge-percentile",
+        type=click.FloatRange(min=0.5, max=0.999),
+        envvar="OPENAI_HEDGE_PERCENTILE",
+        help="Send a duplicate of LLM requests slower than this percentile of recent requests, e.g. 0.95, and use "
+        + "the first response. Cuts tail latency at the cost of extra tokens (can also be set via "
+        + "OPENAI_HEDGE_PERCENTILE)",
+    ),
+    click.option(
+        "--endpoints-file",
+        type=click.Path(exists=True, dir_okay=False, path_type=Path),
+        envvar="OPENAI_ENDPOINTS_FILE",
+        help="JSON file listing additional deployments, e.g. in other Azure regions, to balance requests across "
+        + "with failover. See the README for the format (can also be set via OPENAI_ENDPOINTS_FILE env var)",
+    ),
+    click.option(
+        "--routing-policy",
+        type=click.Choice([policy.value for policy in RoutingPolicy]),
+        envvar="OPENAI_ROUTING_POLICY",
+        default=RoutingPolicy.LEAST_OUTSTANDING.value,
+        show_default=True,
+        help="How requests are distributed across the deployments of --endpoints-file",
+    ),
+    click.option(
+        "--fallback-api-url",
+        envvar="OPENAI_FALLBACK_API_URL",
+        help="URL of a deployment, possibly of another provider, used while the main deployments keep failing "
+        + "(can also be set via OPENAI_FALLBACK_API_URL env var)",
+    ),
+    click.option(
+        "--fallback-api-key",
+        envvar="OPENAI_FALLBACK_API_KEY",
+        help="API key of the fallback deployment, defaults to --api-key (can also be set via "
+        + "OPENAI_FALLBACK_API_KEY)",
+    ),
+    click.option(
+        "--fallback-provider",
+        type=click.Choice(["openai", "azure"]),
+        default="openai",
+        envvar="OPENAI_FALLBACK_PROVIDER",
+        help="Provider type of the fallback deployment (can also be set via OPENAI_FALLBACK_PROVIDER env var)",
+    ),
+    click.option(
+        "--fallback-model",
+        envvar="OPENAI_FALLBACK_MODEL",
+        help="Model used on the fallback deployment, defaults to the requested model "
+        + "(can also be set via OPENAI_FALLBACK_MODEL env var)",
+    ),
+    click.option(
+        "--connect-timeout",
+        type=click.FloatRange(min=0, min_open=True),
+        envvar="OPENAI_CONNECT_TIMEOUT",
+        default=LLMConfig.connect_timeout,
+        show_default=True,
+        help="Seconds to wait for a connection to the LLM API (can also be set via OPENAI_CONNECT_TIMEOUT env var)",
+    ),
+    click.option(
+        "--request-timeout",
+        type=click.FloatRange(min=0, min_open=True),
+        envvar="OPENAI_REQUEST_TIMEOUT",
+        default=LLMConfig.read_timeout,
+        show_default=True,
+        help="Seconds to wait for the response to an LLM request (can also be set via OPENAI_REQUEST_TIMEOUT "
+        + "env var)",
+    ),
+    click.option(
+        "--max-retries",
+        "sdk_max_retries",
+        type=click.IntRange(min=0),
+        envvar="OPENAI_MAX_RETRIES",
+        default=LLMConfig.sdk_max_retries,
+        show_default=True,
+        help="Number of times LLM requests that failed on every deployment are retried (can also be set via "
+        + "OPENAI_MAX_RETRIES)",
+    ),
+    click.option(
+        "--page-deadline",
+        type=click.FloatRange(min=0, min_open=True),
+        envvar="SURVAIZE_PAGE_DEADLINE",
+        help="Seconds allowed for all the LLM requests of a page, including retries, after which the conversion "
+        + "fails with a deadline error instead of waiting (can also be set via SURVAIZE_PAGE_DEADLINE env var)",
+    ),
+]
+
+# Options of the page cache and batching, which the web server also supports
+_PAGE_OPTIONS = [
+    click.option(
+        "--page-cache-dir",
+        type=click.Path(file_okay=False, path_type=Path),
+        envvar="SURVAIZE_PAGE_CACHE_DIR",
+        default=Path(".survaize/pages"),
+        show_default=True,
+        help="Directory where the interpretation of each PDF page is cached so that revised questionnaires only "
+        + "re-interpret the pages that changed (can also be set via SURVAIZE_PAGE_CACHE_DIR env var)",
+    ),
+    click.option(
+        "--no-page-cache",
+        is_flag=True,
+        default=False,
+        help="Interpret every page with the LLM, ignoring and not updating the page cache",
+    ),
+    click.option(
+        "--pages-per-request",
+        type=click.IntRange(min=1),
+        envvar="SURVAIZE_PAGES_PER_REQUEST",
+        default=1,
+        show_default=True,
+        help="Number of consecutive PDF pages sent to the LLM in each request after the first page. Larger values "
+        + "repeat the instructions less often, using fewer tokens (can also be set via SURVAIZE_PAGES_PER_REQUEST)",
+    ),
+]
+
+_CHECKPOINT_OPTIONS = [
+    click.option(
+        "--checkpoint-dir",
+        type=click.Path(file_okay=False, path_type=Path),
+        envvar="SURVAIZE_CHECKPOINT_DIR",
+        default=Path(".survaize/checkpoints"),
+        show_default=True,
+        help="Directory where the progress of PDF interpretations is saved after each page "
+        + "(can also be set via SURVAIZE_CHECKPOINT_DIR env var)",
+    ),
+    click.option(
+        "--resume",
+        is_flag=True,
+        default=False,
+        help="Resume interrupted PDF interpretations from their last checkpoint instead of starting over",
+    ),
+]
+
+CommandFunction = TypeVar("CommandFunction", bound=Callable[..., None])
+
+
+def add_options(
+    options: list[Callable[[CommandFunction], CommandFunction]], command: CommandFunction
+) -> CommandFunction:
+    """Add click options to a command, in the order they are listed in the help."""
+    for option in reversed(options):
+        command = option(command)
+    return command
+
+
+def llm_api_options(command: Callable[..., None]) -> Callable[..., None]:
+    """Add the LLM API options to a command, which receives their values as its llm_options argument."""
+
+    @functools.wraps(command)
+    def wrapper(**kwargs: Any) -> None:  # pyright: ignore[reportExplicitAny]
+        values = {field.name: kwargs.pop(field.name) for field in fields(LLMOptions)}
+        command(llm_options=LLMOptions(**values), **kwargs)
+
+    return add_options(_LLM_OPTIONS, wrapper)
+
+
+def interpreter_options(command: Callable[..., None]) -> Callable[..., None]:
+    """Add the PDF interpretation options to a command, which receives them as its interpreter_config argument."""
+
+    @functools.wraps(command)
+    def wrapper(
+        checkpoint_dir: Path,
+        resume: bool,
+        page_cache_dir: Path,
+        no_page_cache: bool,
+        pages_per_request: int,
+        **kwargs: object,
+    ) -> None:
+        interpreter_config = InterpreterConfig(
+            checkpoint_dir=checkpoint_dir,
+            resume=resume,
+            page_cache_dir=None if no_page_cache else page_cache_dir,
+            pages_per_request=pages_per_request,
+        )
+        command(interpreter_config=interpreter_config, **kwargs)
+
+    return add_options(_CHECKPOINT_OPTIONS + _PAGE_OPTIONS, wrapper)
+
+
+def page_options(command: CommandFunction) -> CommandFunction:
+    """Add the page cache and batching options to a command."""
+    return add_options(_PAGE_OPTIONS, command)
+
+
+def export_llm_options(options: LLMOptions) -> None:
+    """Set the environment variable of each LLM API option that has a value.
+
+    The web server reads its LLM configuration from the environment, so this passes the
+    options of the ui command on to it, whether they were given on the command line or not.
+    """
+    names = {field.name for field in fields(LLMOptions)}
+    for param in click.get_current_context().command.params:
+        if isinstance(param, click.Option) and isinstance(param.envvar, str) and param.name in names:
+            value = getattr(options, param.name)
+            if value is not None:
+                os.environ[param.envvar] = str(value)
 
 
 @click.group()
@@ -51,71 +411,38 @@ def cli() -> None:
     default="json",
     help="Output format for the questionnaire",
 )
+@llm_api_options
+@interpreter_options
 @click.option(
-    "--api-key",
-    envvar="OPENAI_API_KEY",
-    help="OpenAI API key (can also be set via OPENAI_API_KEY env var)",
-    required=True,
-)
-@click.option(
-    "--api-provider",
-    type=click.Choice(["openai", "azure"]),
-    default="openai",
-    envvar="OPENAI_PROVIDER",
-    help="OpenAI API provider type, can also be set via OPENAI_PROVIDER environment variable",
-)
-@click.option(
-    "--api-version",
-    envvar="OPENAI_API_VERSION",
-    help="OpenAI API version for Azure only (can also be set via OPENAI_API_VERSION env var)",
-)
-@click.option(
-    "--api-url",
-    envvar="OPENAI_API_URL",
-    help="OpenAI API URL required for Azure (can also be set via OPENAI_API_URL env var)",
-)
-@click.option(
-    "--api-model",
-    envvar="OPENAI_API_MODEL",
-    default="gpt-4.1",
-    help="OpenAI API model name (can also be set via OPENAI_API_MODEL env var). Defaults to gpt-4.1",
+    "--profile",
+    is_flag=True,
+    default=False,
+    help="Record time and memory used by each conversion stage and page. Writes a JSON report "
+    + "(OUTPUT_FILE.profile.json) and a Chrome trace (OUTPUT_FILE.trace.json) next to the output",
 )
 def convert(
     input_file: Path,
     output_file: Path,
     output_format: OutputFormat,
-    api_key: str,
-    api_provider: OpenAIProviderType | None,
-    api_version: str | None,
-    api_url: str | None,
-    api_model: str,
+    llm_options: LLMOptions,
+    interpreter_config: InterpreterConfig,
+    profile: bool,
 ) -> None:
     """Convert a questionnaire to the specified format."""
 
-    configure_logfire()
+    logfire = configure_logfire()
     logfire.info("Start convert", input_file=input_file, output_file=output_file, output_format=output_format)
 
-    if api_provider == OpenAIProviderType.AZURE:
-        if not api_url:
-            raise click.UsageError(
-                "Azure requires a url for the API endpoint "
-                + "Please provide it via the --api-url argument or the OPENAI_API_URL environment variable."
-            )
-        api_version = api_version or "2025-04-01-preview"
+    llm_config = create_llm_config(llm_options)
+    converter = QuestionnaireConverter(llm_config=llm_config, interpreter_config=interpreter_config)
+    if llm_config is None and converter.requires_llm(input_file):
+        raise click.UsageError(_MISSING_API_KEY_MESSAGE)
 
+    profiler = Profiler() if profile else None
     try:
-        llm_config = LLMConfig(
-            api_key=api_key,
-            api_version=api_version,
-            api_url=api_url,
-            model=api_model,
-            provider=OpenAIProviderType(api_provider),
-        )
-
-        converter = QuestionnaireConverter(llm_config=llm_config)
-
         # Convert using the pipeline architecture
-        converter.convert(input_file=input_file, output_file=output_file, output_format=output_format)
+        with profiling(profiler) if profiler else nullcontext():
+            converter.convert(input_file=input_file, output_file=output_file, output_format=output_format)
 
         console.log(f"[green]Successfully converted {input_file} to {output_file}")
 
@@ -123,54 +450,141 @@ def convert(
         console.log(f"[red]Error during conversion: {e}")
         logger.exception("Conversion failed")
         raise
+    finally:
+        if profiler:
+            report_path = output_file.with_name(f"{output_file.name}.profile.json")
+            trace_path = output_file.with_name(f"{output_file.name}.trace.json")
+            profiler.save(report_path, trace_path)
+            console.log(f"Profile written to {report_path} and {trace_path}")
 
 
 @cli.command()
+@click.argument("input_source")
+@click.argument("output_dir", type=click.Path(file_okay=False, path_type=Path))
 @click.option(
-    "--host",
-    default="127.0.0.1",
-    help="Host to bind the web server to",
+    "--format",
+    "output_format",
+    type=click.Choice(["cspro", "json"]),
+    default="json",
+    help="Output format for the questionnaires",
 )
 @click.option(
-    "--port",
-    default=8000,
-    type=int,
-    help="Port to bind the web server to",
+    "--jobs",
+    default=4,
+    type=click.IntRange(min=1),
+    help="Number of files to convert concurrently",
 )
 @click.option(
-    "--reload/--no-reload",
-    default=False,
-    help="Reload the server when code changes",
+    "--llm-concurrency",
+    type=click.IntRange(min=1),
+    help="Maximum number of concurrent LLM requests across all files. Defaults to the number of jobs",
 )
 @click.option(
-    "--api-key",
-    envvar="OPENAI_API_KEY",
-    help="OpenAI API key (can also be set via OPENAI_API_KEY env var)",
-    required=True,
+    "--adaptive-concurrency",
+    is_flag=True,
+    default=False,
+    envvar="OPENAI_ADAPTIVE_CONCURRENCY",
+    help="Adjust the number of concurrent LLM requests, up to --llm-concurrency, raising it while requests "
+    + "succeed and backing off on rate limit errors and timeouts",
 )
 @click.option(
-    "--api-provider",
-    type=click.Choice(["openai", "azure"]),
-    default="openai",
-    envvar="OPENAI_PROVIDER",
-    help="OpenAI API provider type, can also be set via OPENAI_PROVIDER environment variable",
+    "--summary",
+    "summary_file",
+    type=click.Path(dir_okay=False, path_type=Path),
+    help="Path of the JSON summary of the batch. Defaults to batch_summary.json in the output directory",
 )
+@llm_api_options
+@interpreter_options
+def batch(
+    input_source: str,
+    output_dir: Path,
+    output_format: OutputFormat,
+    jobs: int,
+    llm_concurrency: int | None,
+    adaptive_concurrency: bool,
+    summary_file: Path | None,
+    llm_options: LLMOptions,
+    interpreter_config: InterpreterConfig,
+) -> None:
+    """Convert all questionnaires in a directory or matching a glob pattern.
+
+    INPUT_SOURCE is a directory or a glob pattern such as "surveys/**/*.pdf" (quote it
+    so the shell does not expand it). Files that fail to convert are reported in the
+    summary and do not stop the rest of the batch.
+    """
+
+    logfire = configure_logfire()
+    logfire.info("Start batch", input_source=input_source, output_dir=output_dir, output_format=output_format)
+
+    llm_config = create_llm_config(
+        llm_options, max_concurrent_requests=llm_concurrency or jobs, adaptive_concurrency=adaptive_concurrency
+    )
+    converter = QuestionnaireConverter(llm_config=llm_config, interpreter_config=interpreter_config)
+
+    input_files = find_input_files(input_source, converter.reader_factory.get_supported_formats())
+    if not input_files:
+        raise click.UsageError(f"No questionnaires found matching {input_source}")
+    if llm_config is None and any(converter.requires_llm(input_file) for input_file in input_files):
+        raise click.UsageError(_MISSING_API_KEY_MESSAGE)
+
+    with Progress(
+        SpinnerColumn(),
+        TextColumn("{task.description}"),
+        BarColumn(),
+        TaskProgressColumn(),
+        TimeElapsedColumn(),
+        console=console,
+    ) as progress:
+        overall_task = progress.add_task(f"Converting {len(input_files)} questionnaires", total=len(input_files))
+        file_tasks = {
+            input_file: progress.add_task(input_file.name, total=100, visible=False) for input_file in input_files
+        }
+
+        def on_progress(input_file: Path, percent: int, message: str) -> None:
+            progress.update(
+                file_tasks[input_file], completed=percent, description=f"{input_file.name}: {message}", visible=True
+            )
+
+        def on_result(result: BatchItemResult) -> None:
+            progress.update(file_tasks[result.input_file], visible=False)
+            progress.advance(overall_task)
+            if result.status == "succeeded":
+                console.log(f"[green]Converted {result.input_file} to {result.output_file}")
+            else:
+                console.log(f"[red]Failed to convert {result.input_file}: {result.error}")
+
+        batch_converter = BatchConverter(converter, max_workers=jobs)
+        summary = batch_converter.convert(input_files, output_dir, output_format, on_progress, on_result)
+
+    summary_file = summary_file or output_dir / "batch_summary.json"
+    summary.save(summary_file)
+    console.log(
+        f"Converted {summary.succeeded}/{len(summary.results)} questionnaires in {summary.duration_seconds:.1f}s "
+        + f"using {summary.usage.total_tokens} tokens. Summary written to {summary_file}"
+    )
+    if summary.failed:
+        raise click.exceptions.Exit(1)
+
+
+@cli.command()
 @click.option(
-    "--api-version",
-    envvar="OPENAI_API_VERSION",
-    help="OpenAI API version for Azure only (can also be set via OPENAI_API_VERSION env var)",
+    "--host",
+    default="127.0.0.1",
+    help="Host to bind the web server to",
 )
 @click.option(
-    "--api-url",
-    envvar="OPENAI_API_URL",
-    help="OpenAI API URL required for Azure (can also be set via OPENAI_API_URL env var)",
+    "--port",
+    default=8000,
+    type=int,
+    help="Port to bind the web server to",
 )
 @click.option(
-    "--api-model",
-    envvar="OPENAI_API_MODEL",
-    default="gpt-4.1",
-    help="OpenAI API model name (can also be set via OPENAI_API_MODEL env var). Defaults to gpt-4.1",
+    "--reload/--no-reload",
+    default=False,
+    help="Reload the server when code changes",
 )
+@llm_api_options
+@page_options
 @click.option(
     "--no-browser",
     is_flag=True,
@@ -181,38 +595,41 @@ def ui(
     host: str,
     port: int,
     reload: bool,
-    api_key: str,
-    api_provider: OpenAIProviderType | None,
-    api_version: str | None,
-    api_url: str | None,
-    api_model: str,
+    llm_options: LLMOptions,
+    page_cache_dir: Path,
+    no_page_cache: bool,
+    pages_per_request: int,
     no_browser: bool,
 ) -> None:
     """Start the Survaize web application server."""
     configure_logfire()
 
     try:
-        if api_provider == OpenAIProviderType.AZURE:
-            if not api_url:
-                raise click.UsageError(
-                    "Azure requires a url for the API endpoint "
-                    + "Please provide it via the --api-url argument or the OPENAI_API_URL environment variable."
-                )
-            api_version = api_version or "2025-04-01-preview"
-
-        os.environ["OPENAI_API_KEY"] = api_key
-        os.environ["OPENAI_PROVIDER"] = str(api_provider)
-        if api_version:
-            os.environ["OPENAI_API_VERSION"] = api_version
-        if api_url:
-            os.environ["OPENAI_API_URL"] = api_url
-        os.environ["OPENAI_API_MODEL"] = api_model
+        llm_config = create_llm_config(llm_options)
+        if llm_config is None:
+            raise click.UsageError(
+                "An OpenAI API key is required to start the web server. "
+                + "Please provide it via the --api-key argument or the OPENAI_API_KEY environment variable."
+            )
+
+        # The server reads its settings from the environment when it creates each reader
+        export_llm_options(llm_options)
+        if llm_config.api_version:
+            os.environ["OPENAI_API_VERSION"] = llm_config.api_version
+        if no_page_cache:
+            os.environ.pop("SURVAIZE_PAGE_CACHE_DIR", None)
+        else:
+            os.environ["SURVAIZE_PAGE_CACHE_DIR"] = str(page_cache_dir)
+        os.environ["SURVAIZE_PAGES_PER_REQUEST"] = str(pages_per_request)
 
         if not no_browser:
             url = f"http://{host}:{port}"
             console.log(f"[green]Opening {url} in your browser...[/green]")
             threading.Timer(1.0, webbrowser.open, args=(url,)).start()
 
+        # Imported here so that other commands don't pay for loading the web stack
+        from survaize.web.backend.server import run_server
+
         run_server(host=host, port=port, reload=reload)
     except Exception as e:
         console.log(f"[red]Error starting web server: {e}")
@@ -220,5 +637,195 @@ def ui(
         raise
 
 
+@cli.command("stub-llm")
+@click.option(
+    "--host",
+    default="127.0.0.1",
+    help="Host to bind the stub server to",
+)
+@click.option(
+    "--port",
+    default=8100,
+    type=int,
+    help="Port to bind the stub server to, use http://HOST:PORT/v1 as --api-url",
+)
+@click.option(
+    "--latency-median",
+    type=float,
+    default=1.0,
+    help="Median response latency in seconds. Defaults to 1",
+)
+@click.option(
+    "--latency-sigma",
+    type=float,
+    default=0.5,
+    help="Standard deviation of the log-normal latency distribution. Defaults to 0.5",
+)
+@click.option(
+    "--requests-per-minute",
+    type=int,
+    help="Requests per minute before 429 responses are returned, unlimited by default",
+)
+@click.option(
+    "--tokens-per-minute",
+    type=int,
+    help="Estimated tokens per minute before 429 responses are returned, unlimited by default",
+)
+@click.option(
+    "--error-rate",
+    type=float,
+    default=0.0,
+    help="Fraction of requests that fail with a 500 error",
+)
+@click.option(
+    "--invalid-json-rate",
+    type=float,
+    default=0.0,
+    help="Fraction of responses that are truncated to invalid JSON",
+)
+@click.option(
+    "--recordings-dir",
+    type=click.Path(exists=True, file_okay=False, path_type=Path),
+    help="Directory of recorded OpenAI responses to serve when they match a request",
+)
+@click.option(
+    "--seed",
+    type=int,
+    help="Seed of the random latencies and errors, for reproducible runs",
+)
+def stub_llm(
+    host: str,
+    port: int,
+    latency_median: float,
+    latency_sigma: float,
+    requests_per_minute: int | None,
+    tokens_per_minute: int | None,
+    error_rate: float,
+    invalid_json_rate: float,
+    recordings_dir: Path | None,
+    seed: int | None,
+) -> None:
+    """Start an OpenAI compatible stub LLM server for load testing."""
+    # Imported here so that other commands don't pay for loading the web stack
+    from survaize.loadtest.stub_llm import StubLLMConfig, run_stub_server
+
+    config = StubLLMConfig(
+        latency_median=latency_median,
+        latency_sigma=latency_sigma,
+        requests_per_minute=requests_per_minute,
+        tokens_per_minute=tokens_per_minute,
+        error_rate=error_rate,
+        invalid_json_rate=invalid_json_rate,
+        recordings_dir=recordings_dir,
+        seed=seed,
+    )
+    console.log(f"[green]Stub LLM server listening at http://{host}:{port}/v1[/green]")
+    run_stub_server(config, host=host, port=port)
+
+
+@cli.command("load-test")
+@click.argument("input_file", type=click.Path(exists=True, dir_okay=False, path_type=Path))
+@click.option(
+    "--url",
+    default="http://127.0.0.1:8000",
+    help="Base URL of the Survaize web server to load test",
+)
+@click.option(
+    "--jobs",
+    default=10,
+    type=int,
+    help="Number of questionnaire reads to start. Defaults to 10",
+)
+@click.option(
+    "--rate",
+    default=1.0,
+    type=float,
+    help="Reads started per second, whether or not earlier reads have finished. Defaults to 1",
+)
+@click.option(
+    "--max-concurrency",
+    type=int,
+    help="Maximum number of reads in progress, unlimited by default",
+)
+@click.option(
+    "--save-format",
+    type=click.Choice(["json", "cspro", "none"]),
+    default="json",
+    help="Format each read questionnaire is saved in, or none to skip saving. Defaults to json",
+)
+@click.option(
+    "--server-pid",
+    type=int,
+    help="Process id of the server to report the resident memory of (Linux only)",
+)
+@click.option(
+    "--job-timeout",
+    default=600.0,
+    type=float,
+    help="Seconds a read may take before it is counted as failed. Defaults to 600",
+)
+@click.option(
+    "--report",
+    "report_file",
+    type=click.Path(dir_okay=False, path_type=Path),
+    help="Write the full report as JSON to this file",
+)
+def load_test(
+    input_file: Path,
+    url: str,
+    jobs: int,
+    rate: float,
+    max_concurrency: int | None,
+    save_format: Literal["json", "cspro", "none"],
+    server_pid: int | None,
+    job_timeout: float,
+    report_file: Path | None,
+) -> None:
+    """Load test a running web server by reading and saving INPUT_FILE repeatedly.
+
+    Run the server against the stub LLM (survaize stub-llm) or replayed recordings so that
+    the results measure Survaize rather than the LLM API.
+    """
+    import asyncio
+
+    from survaize.loadtest.harness import LoadTestConfig, run_load_test
+
+    input_format = "json" if input_file.suffix.lower() == ".json" else "pdf"
+    config = LoadTestConfig(
+        base_url=url,
+        input_file=input_file,
+        input_format=input_format,
+        save_format=None if save_format == "none" else save_format,
+        jobs=jobs,
+        rate=rate,
+        max_concurrency=max_concurrency,
+        server_pid=server_pid,
+        job_timeout=job_timeout,
+    )
+    console.log(f"Starting {jobs} reads of {input_file} at {rate}/s against {url}")
+    report = asyncio.run(run_load_test(config))
+
+    console.log(
+        f"Completed {report.completed}/{len(report.results)} reads in {report.duration_seconds:.1f}s: "
+        + f"{report.throughput:.2f} reads/s, error rate {report.error_rate:.1%}"
+    )
+    for name, summary in report.latencies.items():
+        if summary:
+            console.log(
+                f"  {name}: p50 {summary.p50:.3f}s, p95 {summary.p95:.3f}s, p99 {summary.p99:.3f}s, "
+                + f"max {summary.max:.3f}s ({summary.count} samples)"
+            )
+    if report.failed:
+        console.log(f"[red]Errors by stage: {report.errors_by_stage}")
+    if report.rss_samples:
+        console.log(
+            f"  server RSS: start {report.rss_samples[0] / 2**20:.0f} MiB, "
+            + f"peak {max(report.rss_samples) / 2**20:.0f} MiB, end {report.rss_samples[-1] / 2**20:.0f} MiB"
+        )
+    if report_file:
+        report.save(report_file)
+        console.log(f"Report written to {report_file}")
+
+
 if __name__ == "__main__":
     cli()
@@ -15,6 +15,8 @@ from PIL import Image
 from survaize.interpreter.ai_interpreter import AIQuestionnaireInterpreter
 from survaize.interpreter.scanned_questionnaire import ScannedQuestionnaire
 from survaize.model.questionnaire import Questionnaire
+from survaize.telemetry.metrics import STAGE_DURATION
+from survaize.telemetry.profiler import profile_stage
 
 # Configure logger
 logger = logging.getLogger(__name__)
@@ -48,7 +50,8 @@ class PDFReader:
 
         if progress_callback:
             progress_callback(0, "Extracting pages")
-        pages = self._extract_pages(file)
+        with profile_stage("rasterize"), STAGE_DURATION.time(stage="rasterize"):
+            pages = self._extract_pages(file)
         if progress_callback:
             progress_callback(1, f"Extracted {len(pages)} pages")
         texts: list[str] = []
@@ -56,7 +59,8 @@ class PDFReader:
             if progress_callback:
                 percent = int(10 * (i - 1) / len(pages))
                 progress_callback(percent, f"Extracting image from page {i}/{len(pages)}")
-            texts.append(self._process_page(page))
+            with profile_stage("ocr_page", page=i), STAGE_DURATION.time(stage="ocr"):
+                texts.append(self._process_page(page))
 
         scanned_questionnaire = ScannedQuestionnaire(
             pages=pages,
@@ -101,12 +105,14 @@ class PDFReader:
         Returns:
             Extracted text from the page
         """
-        # Convert PIL image to OpenCV format for preprocessing
-        opencv_image = cv2.cvtColor(np.array(image), cv2.COLOR_RGB2BGR)
+        with profile_stage("denoise"):
+            # Convert PIL image to OpenCV format for preprocessing
+            opencv_image = cv2.cvtColor(np.array(image), cv2.COLOR_RGB2BGR)
 
-        # Basic image preprocessing
-        gray = cv2.cvtColor(opencv_image, cv2.COLOR_BGR2GRAY)
-        denoised = cv2.fastNlMeansDenoising(gray)
+            # Basic image preprocessing
+            gray = cv2.cvtColor(opencv_image, cv2.COLOR_BGR2GRAY)
+            denoised = cv2.fastNlMeansDenoising(gray)
 
         # Perform OCR
-        return pytesseract.image_to_string(denoised)  # type: ignore
+        with profile_stage("tesseract"):
+            return pytesseract.image_to_string(denoised)  # type: ignore
@@ -1,7 +1,9 @@
 from collections.abc import Callable
-from typing import IO, Protocol
+from typing import IO, TYPE_CHECKING, Protocol
 
-from survaize.model.questionnaire import Questionnaire
+if TYPE_CHECKING:
+    # Only needed for annotations, importing the model would load pydantic and its plugins
+    from survaize.model.questionnaire import Questionnaire
 
 
 class Reader(Protocol):
@@ -11,7 +13,7 @@ class Reader(Protocol):
         self,
         file: IO[bytes],
         progress_callback: Callable[[int, str], None] | None = None,
-    ) -> Questionnaire:
+    ) -> "Questionnaire":
         """Read a document and extract its content.
 
         Args:
@@ -1,24 +1,41 @@
+import threading
+from collections.abc import Callable
+
+from survaize.config.interpreter_config import InterpreterConfig
 from survaize.config.llm_config import LLMConfig
-from survaize.interpreter.ai_interpreter import AIQuestionnaireInterpreter
-from survaize.reader.json_reader import JSONReader
-from survaize.reader.pdf_reader import PDFReader
 from survaize.reader.reader import Reader
 
+# Input formats whose readers interpret documents with an LLM
+_LLM_INPUT_FORMATS = {"pdf"}
+
 
 class ReaderFactory:
-    """Factory for creating reader instances."""
+    """Factory for creating reader instances.
 
-    def __init__(self, llm_config: LLMConfig) -> None:
+    Readers are created on first use and their modules imported lazily, so that only
+    the dependencies of the formats actually read are loaded. In particular reading
+    JSON does not import OpenCV, Tesseract or the OpenAI client used for PDFs, and
+    no LLM client is constructed unless a reader that needs one is requested.
+    """
+
+    def __init__(
+        self, llm_config: LLMConfig | None = None, interpreter_config: InterpreterConfig | None = None
+    ) -> None:
         """Initialize the ReaderFactory.
 
         Args:
-            llm_config: Configuration for the LLM, required for PDFReader.
+            llm_config: Configuration for the LLM, required for PDFReader. May be omitted
+                when only formats that don't need an LLM (e.g. JSON) will be read.
+            interpreter_config: Options for the interpreter used by PDFReader (checkpointing etc.)
         """
-        interpreter = AIQuestionnaireInterpreter(llm_config)
-        self._readers: dict[str, Reader] = {
-            "pdf": PDFReader(interpreter),
-            "json": JSONReader(),
+        self._llm_config: LLMConfig | None = llm_config
+        self._interpreter_config: InterpreterConfig | None = interpreter_config
+        self._reader_creators: dict[str, Callable[[], Reader]] = {
+            "pdf": self._create_pdf_reader,
+            "json": self._create_json_reader,
         }
+        self._readers: dict[str, Reader] = {}
+        self._lock: threading.Lock = threading.Lock()
 
     def get(self, input_format: str) -> Reader:
         """Get a reader instance based on the input format.
@@ -32,12 +49,17 @@ class ReaderFactory:
         Raises:
             ValueError: If an unsupported input format is provided.
         """
-        reader = self._readers.get(input_format)
-        if not reader:
+        create_reader = self._reader_creators.get(input_format)
+        if not create_reader:
             supported_formats_str = ", ".join(self.get_supported_formats())
             raise ValueError(
                 f"Unsupported input format: {input_format}. Supported formats are: {supported_formats_str}"
             )
+        with self._lock:
+            reader = self._readers.get(input_format)
+            if reader is None:
+                reader = create_reader()
+                self._readers[input_format] = reader
         return reader
 
     def get_supported_formats(self) -> list[str]:
@@ -46,4 +68,29 @@ class ReaderFactory:
         Returns:
             A list of strings representing the supported input formats.
         """
-        return list(self._readers.keys())
+        return list(self._reader_creators.keys())
+
+    def requires_llm(self, input_format: str) -> bool:
+        """Check whether reading a format requires an LLM.
+
+        Args:
+            input_format: The input format (e.g., "pdf", "json").
+
+        Returns:
+            True if the reader for the format interprets documents with an LLM.
+        """
+        return input_format in _LLM_INPUT_FORMATS
+
+    def _create_pdf_reader(self) -> Reader:
+        if self._llm_config is None:
+            raise ValueError("An LLM configuration (API key) is required to read pdf questionnaires")
+
+        from survaize.interpreter.ai_interpreter import AIQuestionnaireInterpreter
+        from survaize.reader.pdf_reader import PDFReader
+
+        return PDFReader(AIQuestionnaireInterpreter(self._llm_config, interpreter_config=self._interpreter_config))
+
+    def _create_json_reader(self) -> Reader:
+        from survaize.reader.json_reader import JSONReader
+
+        return JSONReader()
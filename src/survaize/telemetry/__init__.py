@@ -0,0 +1 @@
+"""Instrumentation for measuring and diagnosing Survaize performance."""
@@ -0,0 +1,262 @@
+"""Process-wide metrics exposed in the Prometheus text format.
+
+The metrics are kept in memory by a small registry rather than exported through logfire so
+that they can be scraped from ``/metrics`` by monitoring that has no access to logfire. Only
+the standard library is used, so recording a metric costs no more than a dictionary update.
+"""
+
+import math
+import threading
+import time
+from collections.abc import Generator, Iterable
+from contextlib import contextmanager
+from typing import TypeVar
+
+# Durations from a fast stage on a small page to an LLM request near its timeout
+_DURATION_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+
+
+class _Metric:
+    type_name: str = ""
+
+    def __init__(self, name: str, documentation: str, label_names: Iterable[str] = ()) -> None:
+        self.name: str = name
+        self.documentation: str = documentation
+        self.label_names: tuple[str, ...] = tuple(label_names)
+        self._lock: threading.Lock = threading.Lock()
+
+    def _key(self, labels: dict[str, str]) -> tuple[str, ...]:
+        if set(labels) != set(self.label_names):
+            raise ValueError(f"Metric {self.name} expects labels {self.label_names}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.label_names)
+
+    def _format_labels(self, key: tuple[str, ...], extra: dict[str, str] | None = None) -> str:
+        pairs = list(zip(self.label_names, key, strict=True)) + list((extra or {}).items())
+        if not pairs:
+            return ""
+        return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+    def _render(self, samples: list[str]) -> str:
+        header = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type_name}"]
+        return "\n".join(header + samples)
+
+    def _render_values(self, values: dict[tuple[str, ...], float]) -> str:
+        return self._render(
+            [f"{self.name}{self._format_labels(key)} {_format_value(value)}" for key, value in sorted(values.items())]
+        )
+
+
+class Counter(_Metric):
+    """Value that only increases, e.g. the number of requests sent."""
+
+    type_name: str = "counter"
+
+    def __init__(self, name: str, documentation: str, label_names: Iterable[str] = ()) -> None:
+        super().__init__(name, documentation, label_names)
+        self._values: dict[tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        """Increase the counter of a label set.
+
+        Args:
+            amount: Non negative amount to add
+            labels: Value of each of the counter's labels
+        """
+        if amount < 0:
+            raise ValueError(f"Counter {self.name} can't decrease")
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: str) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0.0)
+
+    def render(self) -> str:
+        with self._lock:
+            values = dict(self._values)
+        return self._render_values(values)
+
+
+class Gauge(_Metric):
+    """Value that goes up and down, e.g. the number of jobs in progress."""
+
+    type_name: str = "gauge"
+
+    def __init__(self, name: str, documentation: str, label_names: Iterable[str] = ()) -> None:
+        super().__init__(name, documentation, label_names)
+        self._values: dict[tuple[str, ...], float] = {}
+
+    def set(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels: str) -> None:
+        self.inc(-amount, **labels)
+
+    def value(self, **labels: str) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0.0)
+
+    def render(self) -> str:
+        with self._lock:
+            values = dict(self._values)
+        return self._render_values(values)
+
+
+class Histogram(_Metric):
+    """Distribution of observed values, e.g. durations, counted in cumulative buckets."""
+
+    type_name: str = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        label_names: Iterable[str] = (),
+        buckets: Iterable[float] = _DURATION_BUCKETS,
+    ) -> None:
+        super().__init__(name, documentation, label_names)
+        self.buckets: tuple[float, ...] = (*sorted(buckets), math.inf)
+        # Count of observations in each bucket (not cumulative), sum and count by label set
+        self._counts: dict[tuple[str, ...], list[int]] = {}
+        self._sums: dict[tuple[str, ...], float] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        """Record an observation.
+
+        Args:
+            value: Observed value
+            labels: Value of each of the histogram's labels
+        """
+        key = self._key(labels)
+        bucket = next(i for i, bound in enumerate(self.buckets) if value <= bound)
+        with self._lock:
+            counts = self._counts.setdefault(key, [0] * len(self.buckets))
+            counts[bucket] += 1
+            self._sums[key] = self._sums.get(key, 0.0) + value
+
+    @contextmanager
+    def time(self, **labels: str) -> Generator[None]:
+        """Observe the wall clock duration of a block in seconds, including when it raises."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def count(self, **labels: str) -> int:
+        with self._lock:
+            return sum(self._counts.get(self._key(labels), []))
+
+    def render(self) -> str:
+        with self._lock:
+            snapshot = sorted((key, list(counts), self._sums[key]) for key, counts in self._counts.items())
+        lines: list[str] = []
+        for key, counts, total in snapshot:
+            cumulative = 0
+            for bound, count in zip(self.buckets, counts, strict=True):
+                cumulative += count
+                labels = self._format_labels(key, {"le": _format_value(bound)})
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            lines.append(f"{self.name}_sum{self._format_labels(key)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{self._format_labels(key)} {cumulative}")
+        return self._render(lines)
+
+
+M = TypeVar("M", Counter, Gauge, Histogram)
+
+
+class MetricsRegistry:
+    """Collection of metrics rendered together."""
+
+    def __init__(self) -> None:
+        self._metrics: dict[str, Counter | Gauge | Histogram] = {}
+        self._lock: threading.Lock = threading.Lock()
+
+    def counter(self, name: str, documentation: str, label_names: Iterable[str] = ()) -> Counter:
+        return self._register(Counter(name, documentation, label_names))
+
+    def gauge(self, name: str, documentation: str, label_names: Iterable[str] = ()) -> Gauge:
+        return self._register(Gauge(name, documentation, label_names))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        label_names: Iterable[str] = (),
+        buckets: Iterable[float] = _DURATION_BUCKETS,
+    ) -> Histogram:
+        return self._register(Histogram(name, documentation, label_names, buckets))
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format."""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return "\n".join(metric.render() for metric in metrics) + "\n"
+
+    def _register(self, metric: M) -> M:
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Metric {metric.name} is already registered")
+            self._metrics[metric.name] = metric
+        return metric
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if value == int(value):
+        return str(int(value))
+    return repr(value)
+
+
+REGISTRY = MetricsRegistry()
+"""Registry of the metrics of the process, served by the web backend at ``/metrics``."""
+
+JOBS_ACCEPTED = REGISTRY.counter("survaize_jobs_accepted_total", "Questionnaire read jobs accepted")
+JOBS = REGISTRY.counter(
+    "survaize_jobs_total", "Finished questionnaire read jobs by status (succeeded, failed)", ("status",)
+)
+JOB_QUEUE_DEPTH = REGISTRY.gauge("survaize_job_queue_depth", "Accepted read jobs waiting for a worker thread")
+JOBS_RUNNING = REGISTRY.gauge("survaize_jobs_running", "Read jobs being processed")
+ACTIVE_WEBSOCKETS = REGISTRY.gauge("survaize_active_websockets", "Open progress websockets")
+STAGE_DURATION = REGISTRY.histogram(
+    "survaize_stage_duration_seconds",
+    "Duration of pipeline stages (rasterize, ocr, llm, merge, write) in seconds",
+    ("stage",),
+)
+LLM_REQUESTS = REGISTRY.counter(
+    "survaize_llm_requests_total", "LLM requests by model and outcome (success, error)", ("model", "outcome")
+)
+LLM_TOKENS = REGISTRY.counter(
+    "survaize_llm_tokens_total", "LLM tokens by model and type (prompt, completion, cached)", ("model", "type")
+)
+LLM_RETRIES = REGISTRY.counter(
+    "survaize_llm_retries_total",
+    "LLM requests retried by model and reason (rate_limit, validation)",
+    ("model", "reason"),
+)
+LLM_VALIDATION_FAILURES = REGISTRY.counter(
+    "survaize_llm_validation_failures_total", "LLM responses that failed validation by model", ("model",)
+)
+LLM_CONCURRENCY_LIMIT = REGISTRY.gauge(
+    "survaize_llm_concurrency_limit",
+    "Limit on concurrent LLM requests to each endpoint set by the adaptive concurrency limiter",
+    ("endpoint",),
+)
+LLM_CIRCUIT_STATE = REGISTRY.gauge(
+    "survaize_llm_circuit_state",
+    "State of the circuit breaker of each LLM endpoint (0 closed, 1 half-open, 2 open)",
+    ("endpoint",),
+)
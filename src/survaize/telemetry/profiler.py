@@ -0,0 +1,274 @@
+"""Per-stage profiling of questionnaire conversions.
+
+Pipeline code marks its stages with :func:`profile_stage`, which costs nothing unless a
+:class:`Profiler` has been activated for the current context with :func:`profiling`.
+"""
+
+import json
+import os
+import threading
+import time
+import tracemalloc
+from collections.abc import Generator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from pathlib import Path
+
+
+@dataclass
+class StageRecord:
+    """Measurements for a single execution of a stage."""
+
+    name: str
+    page: int | None
+    # Start time in seconds relative to the start of the profile
+    start_seconds: float
+    wall_seconds: float
+    # CPU time of the current thread plus any child processes (e.g. Tesseract)
+    cpu_seconds: float
+    # Peak memory allocated by Python (including numpy buffers) while the stage ran
+    peak_memory_bytes: int
+    thread_id: int
+    args: dict[str, object] = field(default_factory=dict)
+
+    def to_dict(self) -> dict[str, object]:
+        return {
+            "name": self.name,
+            "page": self.page,
+            "start_seconds": round(self.start_seconds, 6),
+            "wall_seconds": round(self.wall_seconds, 6),
+            "cpu_seconds": round(self.cpu_seconds, 6),
+            "peak_memory_bytes": self.peak_memory_bytes,
+            "thread_id": self.thread_id,
+            "args": self.args,
+        }
+
+
+@dataclass
+class _OpenStage:
+    page: int | None
+    peak_memory_bytes: int
+
+
+class Profiler:
+    """Records wall time, CPU time and peak memory of pipeline stages."""
+
+    def __init__(self) -> None:
+        self.records: list[StageRecord] = []
+        self._origin: float = time.perf_counter()
+        self._lock: threading.Lock = threading.Lock()
+        self._local: threading.local = threading.local()
+
+    @contextmanager
+    def stage(self, name: str, page: int | None = None, **args: object) -> Generator[None]:
+        """Measure a stage.
+
+        Args:
+            name: Name of the stage, e.g. "ocr" or "llm_request"
+            page: Page the stage is working on, inherited from the enclosing stage if omitted
+            args: Additional details to include in the report
+        """
+        stack = self._stack()
+        if page is None and stack:
+            page = stack[-1].page
+
+        tracing_memory = tracemalloc.is_tracing()
+        if tracing_memory:
+            current_memory, peak_memory = tracemalloc.get_traced_memory()
+            # Carry the peak reached so far over to the enclosing stage before resetting it
+            if stack:
+                stack[-1].peak_memory_bytes = max(stack[-1].peak_memory_bytes, peak_memory)
+            tracemalloc.reset_peak()
+        else:
+            current_memory = 0
+        stack.append(_OpenStage(page=page, peak_memory_bytes=current_memory))
+
+        start = time.perf_counter()
+        start_cpu = _cpu_time()
+        try:
+            yield
+        finally:
+            wall = time.perf_counter() - start
+            cpu = _cpu_time() - start_cpu
+            open_stage = stack.pop()
+            peak = open_stage.peak_memory_bytes
+            if tracing_memory and tracemalloc.is_tracing():
+                peak = max(peak, tracemalloc.get_traced_memory()[1])
+                if stack:
+                    stack[-1].peak_memory_bytes = max(stack[-1].peak_memory_bytes, peak)
+            record = StageRecord(
+                name=name,
+                page=page,
+                start_seconds=start - self._origin,
+                wall_seconds=wall,
+                cpu_seconds=cpu,
+                peak_memory_bytes=peak,
+                thread_id=threading.get_ident(),
+                args=args,
+            )
+            with self._lock:
+                self.records.append(record)
+
+    def report(self) -> dict[str, object]:
+        """Summarize the recorded stages.
+
+        Returns:
+            JSON serializable report with totals per stage, per page and the individual records
+        """
+        with self._lock:
+            records = sorted(self.records, key=lambda r: r.start_seconds)
+
+        pages: dict[str, dict[str, dict[str, float | int]]] = {}
+        for record in records:
+            if record.page is not None:
+                _accumulate(pages.setdefault(str(record.page), {}), record)
+        stages: dict[str, dict[str, float | int]] = {}
+        for record in records:
+            _accumulate(stages, record)
+
+        end = max((r.start_seconds + r.wall_seconds for r in records), default=0.0)
+        return {
+            "total_wall_seconds": round(end, 6),
+            "stages": stages,
+            "pages": dict(sorted(pages.items(), key=lambda item: int(item[0]))),
+            "records": [record.to_dict() for record in records],
+        }
+
+    def chrome_trace(self) -> dict[str, object]:
+        """Convert the recorded stages to the Chrome trace event format.
+
+        The result can be opened in chrome://tracing or https://ui.perfetto.dev.
+        """
+        with self._lock:
+            records = list(self.records)
+        events: list[dict[str, object]] = [
+            {
+                "name": record.name if record.page is None else f"{record.name} (page {record.page})",
+                "cat": record.name,
+                "ph": "X",
+                "ts": round(record.start_seconds * 1_000_000),
+                "dur": round(record.wall_seconds * 1_000_000),
+                "pid": os.getpid(),
+                "tid": record.thread_id,
+                "args": {
+                    "page": record.page,
+                    "cpu_ms": round(record.cpu_seconds * 1000, 3),
+                    "peak_memory_bytes": record.peak_memory_bytes,
+                    **record.args,
+                },
+            }
+            for record in records
+        ]
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def save(self, report_path: Path, trace_path: Path) -> None:
+        """Save the JSON report and the Chrome trace.
+
+        Args:
+            report_path: Path of the JSON report file
+            trace_path: Path of the Chrome trace file
+        """
+        report_path.parent.mkdir(parents=True, exist_ok=True)
+        report_path.write_text(json.dumps(self.report(), indent=2, default=str), encoding="utf-8")
+        trace_path.parent.mkdir(parents=True, exist_ok=True)
+        trace_path.write_text(json.dumps(self.chrome_trace(), default=str), encoding="utf-8")
+
+    def _stack(self) -> list[_OpenStage]:
+        stack: list[_OpenStage] | None = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = []
+            self._local.stack = stack
+        return stack
+
+
+def _cpu_time() -> float:
+    times = os.times()
+    return time.thread_time() + times.children_user + times.children_system
+
+
+def _accumulate(totals: dict[str, dict[str, float | int]], record: StageRecord) -> None:
+    stage = totals.setdefault(
+        record.name, {"count": 0, "wall_seconds": 0.0, "cpu_seconds": 0.0, "peak_memory_bytes": 0}
+    )
+    stage["count"] += 1
+    stage["wall_seconds"] = round(stage["wall_seconds"] + record.wall_seconds, 6)
+    stage["cpu_seconds"] = round(stage["cpu_seconds"] + record.cpu_seconds, 6)
+    stage["peak_memory_bytes"] = max(stage["peak_memory_bytes"], record.peak_memory_bytes)
+
+
+_current_profiler: ContextVar[Profiler | None] = ContextVar("survaize_profiler", default=None)
+
+
+class _MemoryTracing:
+    """Reference count of the profilers tracing memory.
+
+    tracemalloc is process wide, it is started by the first profiler and stopped once the last
+    one is done, unless it was already tracing before.
+    """
+
+    def __init__(self) -> None:
+        self._users: int = 0
+        self._started: bool = False
+        self._lock: threading.Lock = threading.Lock()
+
+    def acquire(self) -> None:
+        with self._lock:
+            if self._users == 0 and not tracemalloc.is_tracing():
+                tracemalloc.start()
+                self._started = True
+            self._users += 1
+
+    def release(self) -> None:
+        with self._lock:
+            self._users -= 1
+            if self._users == 0 and self._started:
+                tracemalloc.stop()
+                self._started = False
+
+
+_memory_tracing = _MemoryTracing()
+
+
+@contextmanager
+def profiling(profiler: Profiler, trace_memory: bool = True) -> Generator[Profiler]:
+    """Activate a profiler for the stages run in the current context.
+
+    Peak memory is measured with tracemalloc, whose peak is shared by the whole process. It is
+    therefore only accurate while a single profiled conversion runs at a time, the peaks of
+    concurrent conversions include each other's allocations.
+
+    Args:
+        profiler: The profiler to record stages in
+        trace_memory: Whether to trace memory allocations to measure peak memory, this
+            slows down allocation heavy code
+
+    Yields:
+        The active profiler
+    """
+    if trace_memory:
+        _memory_tracing.acquire()
+    token = _current_profiler.set(profiler)
+    try:
+        yield profiler
+    finally:
+        _current_profiler.reset(token)
+        if trace_memory:
+            _memory_tracing.release()
+
+
+@contextmanager
+def profile_stage(name: str, page: int | None = None, **args: object) -> Generator[None]:
+    """Measure a stage with the active profiler, if any.
+
+    Args:
+        name: Name of the stage
+        page: Page the stage is working on, inherited from the enclosing stage if omitted
+        args: Additional details to include in the report
+    """
+    profiler = _current_profiler.get()
+    if profiler is None:
+        yield
+        return
+    with profiler.stage(name, page, **args):
+        yield
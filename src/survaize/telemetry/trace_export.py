@@ -0,0 +1,145 @@
+"""Export of logfire spans to local files, for machines that can't send them to logfire.
+
+Spans are grouped by trace, so that each conversion or web job gets its own file, and only
+the most recent files are kept. Files are written in the Chrome trace event format, which
+can be opened in https://ui.perfetto.dev or chrome://tracing, or as OTLP JSON lines, the
+format of the OpenTelemetry collector's file exporter, to import them into another backend.
+"""
+
+import json
+import os
+import threading
+from collections import OrderedDict
+from collections.abc import Sequence
+from datetime import UTC, datetime
+from enum import Enum
+from pathlib import Path
+
+from google.protobuf.json_format import MessageToDict
+from opentelemetry.exporter.otlp.proto.common.trace_encoder import encode_spans
+from opentelemetry.sdk.trace import ReadableSpan, SpanProcessor
+from opentelemetry.sdk.trace.export import BatchSpanProcessor, SpanExporter, SpanExportResult
+from typing_extensions import override
+
+
+class TraceFormat(Enum):
+    """Format of the local trace files."""
+
+    CHROME = "chrome"
+    OTLP_JSON = "otlp-json"
+
+
+_EXTENSIONS = {TraceFormat.CHROME: ".trace.json", TraceFormat.OTLP_JSON: ".otlp.jsonl"}
+
+
+class LocalTraceExporter(SpanExporter):
+    """Writes spans to one file per trace in a directory, keeping the most recent files.
+
+    Spans are appended to their trace's file as they end. Chrome trace files are therefore
+    written in the JSON array format without the closing bracket, which trace viewers accept.
+    """
+
+    def __init__(self, directory: Path, trace_format: TraceFormat = TraceFormat.CHROME, max_files: int = 100) -> None:
+        """Initialize the exporter.
+
+        Args:
+            directory: Directory to write the trace files to
+            trace_format: Format of the trace files
+            max_files: Number of trace files kept, the oldest files are deleted beyond it
+        """
+        self.directory: Path = directory
+        self.trace_format: TraceFormat = trace_format
+        self.max_files: int = max_files
+        # File of each recent trace, the oldest traces are forgotten along with their files
+        self._files: OrderedDict[int, Path] = OrderedDict()
+        self._lock: threading.Lock = threading.Lock()
+
+    @override
+    def export(self, spans: Sequence[ReadableSpan]) -> SpanExportResult:
+        traces: dict[int, list[ReadableSpan]] = {}
+        for span in spans:
+            if span.context is not None:
+                traces.setdefault(span.context.trace_id, []).append(span)
+        try:
+            with self._lock:
+                for trace_id, trace_spans in traces.items():
+                    self._write(self._trace_file(trace_id), trace_spans)
+        except OSError:
+            return SpanExportResult.FAILURE
+        return SpanExportResult.SUCCESS
+
+    @override
+    def shutdown(self) -> None:
+        pass
+
+    def _write(self, path: Path, spans: list[ReadableSpan]) -> None:
+        if self.trace_format is TraceFormat.OTLP_JSON:
+            line = json.dumps(MessageToDict(encode_spans(spans)), separators=(",", ":"))
+            with path.open("a", encoding="utf-8") as f:
+                f.write(line + "\n")
+            return
+        with path.open("a", encoding="utf-8") as f:
+            for span in spans:
+                f.write(json.dumps(_chrome_event(span), default=str) + ",\n")
+
+    def _trace_file(self, trace_id: int) -> Path:
+        path = self._files.get(trace_id)
+        if path is not None:
+            return path
+        self.directory.mkdir(parents=True, exist_ok=True)
+        timestamp = datetime.now(UTC).strftime("%Y%m%dT%H%M%S%f")
+        path = self.directory / f"{timestamp}-{trace_id:032x}{_EXTENSIONS[self.trace_format]}"
+        if self.trace_format is TraceFormat.CHROME:
+            path.write_text("[\n", encoding="utf-8")
+        self._files[trace_id] = path
+        if len(self._files) > self.max_files:
+            self._files.popitem(last=False)
+        self._rotate()
+        return path
+
+    def _rotate(self) -> None:
+        # File names start with their creation time so they sort from oldest to newest
+        files = sorted(self.directory.glob(f"*{_EXTENSIONS[self.trace_format]}"))
+        for path in files[: max(0, len(files) - self.max_files)]:
+            path.unlink(missing_ok=True)
+
+
+def _chrome_event(span: ReadableSpan) -> dict[str, object]:
+    start = span.start_time or 0
+    end = span.end_time or start
+    attributes = dict(span.attributes or {})
+    # Logs are spans without duration, shown as instant events
+    is_log = attributes.get("logfire.span_type") == "log"
+    return {
+        # Formatted message of logfire spans, e.g. "Interpret page 3" rather than "Interpret {page_label}"
+        "name": attributes.get("logfire.msg", span.name),
+        "cat": span.instrumentation_scope.name if span.instrumentation_scope else "span",
+        "ph": "i" if is_log else "X",
+        "ts": start // 1000,
+        **({"s": "t"} if is_log else {"dur": (end - start) // 1000}),
+        "pid": os.getpid(),
+        "tid": attributes.get("thread.id", 0),
+        "args": {
+            "trace_id": f"{span.context.trace_id:032x}" if span.context else None,
+            "span_id": f"{span.context.span_id:016x}" if span.context else None,
+            "parent_span_id": f"{span.parent.span_id:016x}" if span.parent else None,
+            **attributes,
+        },
+    }
+
+
+def local_span_processor_from_env() -> SpanProcessor | None:
+    """Create the processor exporting spans to local files if ``SURVAIZE_TRACE_DIR`` is set.
+
+    ``SURVAIZE_TRACE_FORMAT`` selects ``chrome`` (default) or ``otlp-json`` files and
+    ``SURVAIZE_TRACE_MAX_FILES`` the number of trace files kept (default 100).
+    """
+    directory = os.environ.get("SURVAIZE_TRACE_DIR")
+    if not directory:
+        return None
+    exporter = LocalTraceExporter(
+        Path(directory),
+        TraceFormat(os.environ.get("SURVAIZE_TRACE_FORMAT", TraceFormat.CHROME.value)),
+        int(os.environ.get("SURVAIZE_TRACE_MAX_FILES", "100")),
+    )
+    return BatchSpanProcessor(exporter)
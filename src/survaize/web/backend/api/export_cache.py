@@ -0,0 +1,90 @@
+"""Cache of generated questionnaire exports keyed by questionnaire content."""
+
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+
+from survaize.model.questionnaire import Questionnaire
+
+
+@dataclass(frozen=True)
+class CachedExport:
+    """A generated export ready to be returned to the client."""
+
+    content: bytes
+    media_type: str
+    filename: str
+
+
+def questionnaire_content_hash(questionnaire: Questionnaire) -> str:
+    """Compute a hash of a questionnaire that only depends on its content.
+
+    The questionnaire is serialized to JSON with sorted keys and no whitespace so that
+    equivalent questionnaires posted with different key order or formatting hash the same.
+
+    Args:
+        questionnaire: The questionnaire to hash
+
+    Returns:
+        Hex encoded SHA-256 digest of the canonical questionnaire JSON
+    """
+    canonical = json.dumps(
+        questionnaire.model_dump(mode="json"),
+        sort_keys=True,
+        separators=(",", ":"),
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class ExportCache:
+    """Bounded least recently used cache of generated exports."""
+
+    def __init__(self, max_entries: int = 32) -> None:
+        """Initialize the cache.
+
+        Args:
+            max_entries: Maximum number of exports to keep, the least recently used
+                export is evicted when the cache is full
+        """
+        self.max_entries: int = max_entries
+        self._entries: OrderedDict[str, CachedExport] = OrderedDict()
+        self._lock: threading.Lock = threading.Lock()
+
+    def get(self, key: str) -> CachedExport | None:
+        """Get a cached export, marking it as recently used.
+
+        Args:
+            key: Cache key of the export
+
+        Returns:
+            The cached export or None if it is not in the cache
+        """
+        with self._lock:
+            export = self._entries.get(key)
+            if export is not None:
+                self._entries.move_to_end(key)
+            return export
+
+    def put(self, key: str, export: CachedExport) -> None:
+        """Add an export to the cache, evicting the least recently used entries if needed.
+
+        Args:
+            key: Cache key of the export
+            export: The generated export
+        """
+        with self._lock:
+            self._entries[key] = export
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Remove all exports from the cache."""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
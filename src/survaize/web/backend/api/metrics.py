@@ -0,0 +1,22 @@
+"""Prometheus metrics endpoint of the web backend."""
+
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from survaize.telemetry.metrics import REGISTRY
+
+router = APIRouter()
+
+# Version of the Prometheus text exposition format
+_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def metrics() -> PlainTextResponse:
+    """
+    Metrics of the server in the Prometheus text format.
+
+    Returns:
+        Job, pipeline stage, LLM and websocket metrics
+    """
+    return PlainTextResponse(REGISTRY.render(), media_type=_CONTENT_TYPE)
@@ -1,20 +1,35 @@
 import asyncio
 import logging
-import shutil
-import tempfile
+import os
+from contextlib import nullcontext
 from io import BytesIO
 from pathlib import Path
 from typing import Annotated, Literal, TypedDict
+from urllib.parse import quote
 from uuid import uuid4
 
-from fastapi import APIRouter, BackgroundTasks, Depends, Form, HTTPException, UploadFile, WebSocket
-from fastapi.responses import FileResponse
+import logfire
+from fastapi import APIRouter, BackgroundTasks, Depends, Form, Header, HTTPException, UploadFile, WebSocket
+from fastapi.responses import Response
 from pydantic import BaseModel
-from starlette.background import BackgroundTask
 
+from survaize.config.interpreter_config import InterpreterConfig
 from survaize.config.llm_config import LLMConfig, create_llm_config_from_env
+from survaize.interpreter.deadline import PageDeadlineExceededError
 from survaize.model.questionnaire import Questionnaire
 from survaize.reader.reader_factory import ReaderFactory
+from survaize.telemetry.metrics import (
+    ACTIVE_WEBSOCKETS,
+    JOB_QUEUE_DEPTH,
+    JOBS,
+    JOBS_ACCEPTED,
+    JOBS_RUNNING,
+    STAGE_DURATION,
+)
+from survaize.telemetry.profiler import Profiler, profile_stage, profiling
+from survaize.web.backend.api.export_cache import CachedExport, ExportCache, questionnaire_content_hash
+from survaize.writer.output_sink import MemorySink, ZipSink
+from survaize.writer.writer import Writer
 from survaize.writer.writer_factory import WriterFactory
 
 router = APIRouter(prefix="/api")
@@ -30,19 +45,40 @@ class ProgressMessage(TypedDict, total=False):
     message: str
     questionnaire: dict[str, object]
     error: str
+    # Structured description of the error, e.g. which page exceeded its deadline
+    error_details: dict[str, object]
+    profile: dict[str, object]
+    trace: dict[str, object]
 
 
 progress_queues: dict[str, asyncio.Queue[ProgressMessage | None]] = {}
 
+# Generated exports keyed by ETag so repeated exports of the same questionnaire are free
+export_cache = ExportCache()
 
-def get_llm_config() -> LLMConfig:
-    """Dependency to get LLM configuration."""
+
+def get_llm_config() -> LLMConfig | None:
+    """Dependency to get LLM configuration, None when no API key is configured."""
+    if not os.environ.get("OPENAI_API_KEY"):
+        return None
     return create_llm_config_from_env()
 
 
-def get_reader_factory(llm_config: Annotated[LLMConfig, Depends(get_llm_config)]) -> ReaderFactory:
+def get_interpreter_config() -> InterpreterConfig:
+    """Dependency to get the interpreter options, pages are cached if SURVAIZE_PAGE_CACHE_DIR is set."""
+    page_cache_dir = os.environ.get("SURVAIZE_PAGE_CACHE_DIR")
+    return InterpreterConfig(
+        page_cache_dir=Path(page_cache_dir) if page_cache_dir else None,
+        pages_per_request=int(os.environ.get("SURVAIZE_PAGES_PER_REQUEST", "1")),
+    )
+
+
+def get_reader_factory(
+    llm_config: Annotated[LLMConfig | None, Depends(get_llm_config)],
+    interpreter_config: Annotated[InterpreterConfig, Depends(get_interpreter_config)],
+) -> ReaderFactory:
     """Dependency to get the questionnaire reader factory."""
-    return ReaderFactory(llm_config)
+    return ReaderFactory(llm_config, interpreter_config)
 
 
 def get_writer_factory() -> WriterFactory:
@@ -50,6 +86,11 @@ def get_writer_factory() -> WriterFactory:
     return WriterFactory()
 
 
+def get_export_cache() -> ExportCache:
+    """Dependency to get the cache of generated questionnaire exports."""
+    return export_cache
+
+
 @router.get("/health")
 async def health_check() -> dict[str, str]:
     """
@@ -73,12 +114,16 @@ async def read_questionnaire(
     format: Annotated[Literal["json", "pdf"], Form()],
     reader_factory: Annotated[ReaderFactory, Depends(get_reader_factory)],
     background_tasks: BackgroundTasks,
+    profile: Annotated[bool, Form()] = False,
 ) -> QuestionnaireJobResponse:
     """
     Read a questionnaire from a file (PDF or JSON).
 
     Args:
         file: The file to read (PDF or JSON)
+        profile: Whether to profile the job, the final progress message then includes a
+            report of the time and memory used by each stage and a Chrome trace. Memory is
+            measured for the whole process, it is only accurate for a single profiled job
 
     Returns:
         The questionnaire from the file
@@ -90,29 +135,48 @@ async def read_questionnaire(
         progress_queues[job_id] = queue
 
         async def process_job() -> None:
+            profiler = Profiler() if profile else None
             try:
                 reader = reader_factory.get(format)
 
                 def progress(percent: int, message: str) -> None:
                     queue.put_nowait({"progress": percent, "message": message})
 
-                questionnaire = await asyncio.to_thread(
-                    reader.read,
-                    BytesIO(contents),
-                    progress,
-                )
-                queue.put_nowait(
-                    {
-                        "progress": 100,
-                        "questionnaire": questionnaire.model_dump(exclude_none=True),
-                    }
-                )
+                def read() -> Questionnaire:
+                    JOB_QUEUE_DEPTH.dec()
+                    JOBS_RUNNING.inc()
+                    try:
+                        with (
+                            profiling(profiler) if profiler else nullcontext(),
+                            profile_stage("read", input_format=format),
+                        ):
+                            return reader.read(BytesIO(contents), progress)
+                    finally:
+                        JOBS_RUNNING.dec()
+
+                # The job is queued until a worker thread is available
+                with logfire.span("Read questionnaire job {job_id}", job_id=job_id, input_format=format):
+                    JOB_QUEUE_DEPTH.inc()
+                    questionnaire = await asyncio.to_thread(read)
+                result: ProgressMessage = {
+                    "progress": 100,
+                    "questionnaire": questionnaire.model_dump(exclude_none=True),
+                }
+            except PageDeadlineExceededError as exc:
+                result = {"error": str(exc), "error_details": exc.to_dict()}
             except Exception as exc:  # noqa: BLE001
-                queue.put_nowait({"error": str(exc)})
+                result = {"error": str(exc)}
+            JOBS.inc(status="failed" if "error" in result else "succeeded")
+            try:
+                if profiler:
+                    result["profile"] = profiler.report()
+                    result["trace"] = profiler.chrome_trace()
+                queue.put_nowait(result)
             finally:
                 queue.put_nowait(None)
 
         background_tasks.add_task(process_job)
+        JOBS_ACCEPTED.inc()
 
         return QuestionnaireJobResponse(job_id=job_id)
     except Exception as e:
@@ -133,6 +197,7 @@ async def questionnaire_progress(job_id: str, websocket: WebSocket) -> None:
         await websocket.close(code=1008)
         return
 
+    ACTIVE_WEBSOCKETS.inc()
     try:
         while True:
             update = await queue.get()
@@ -148,6 +213,7 @@ async def questionnaire_progress(job_id: str, websocket: WebSocket) -> None:
         logger.info(f"Closing WebSocket for job_id: {job_id}")
         await websocket.close()
         progress_queues.pop(job_id, None)
+        ACTIVE_WEBSOCKETS.dec()
 
 
 @router.post("/questionnaire/save/{format}")
@@ -155,61 +221,84 @@ async def save_questionnaire(
     format: Literal["json", "cspro"],
     questionnaire: Questionnaire,
     writer_factory: Annotated[WriterFactory, Depends(get_writer_factory)],
-) -> FileResponse:
+    export_cache: Annotated[ExportCache, Depends(get_export_cache)],
+    if_none_match: Annotated[str | None, Header()] = None,
+) -> Response:
     """
     Save a questionnaire to a file in the specified format.
 
+    Exports are cached by questionnaire content so repeated exports of an unchanged
+    questionnaire are not regenerated. The response carries an ETag derived from the
+    content. As this is a POST, a request whose If-None-Match header matches it gets a
+    412 Precondition Failed response (RFC 9110 reserves 304 for GET and HEAD), which
+    tells the client that the export it already has is current.
+
     Args:
         format: The format to save the questionnaire in (json or cspro)
         questionnaire: The questionnaire to save
+        if_none_match: ETags of exports the client already has
 
     Returns:
         The saved file
     """
-    # Create temporary directory for output
-    try:
-        temp_dir = tempfile.mkdtemp()
-        temp_dir_path = Path(temp_dir)
-        file_name = f"{questionnaire.title.replace(' ', '_')}"
+    etag = f'"{format}-{questionnaire_content_hash(questionnaire)}"'
+    if if_none_match and _etag_matches(if_none_match, etag):
+        return Response(status_code=412, headers={"ETag": etag})
 
-        writer = writer_factory.get(format)
+    try:
+        export = export_cache.get(etag)
+        if export is None:
+            with STAGE_DURATION.time(stage="write"):
+                export = _generate_export(format, questionnaire, writer_factory.get(format))
+            export_cache.put(etag, export)
+        else:
+            logger.info(f"Returning cached {format} export for {questionnaire.title}")
+
+        return Response(
+            content=export.content,
+            media_type=export.media_type,
+            headers={"ETag": etag, "Content-Disposition": _content_disposition(export.filename)},
+        )
 
-        # Determine output file path based on format
-        if format == "json":
-            output_path = temp_dir_path / f"{file_name}.json"
-            # For JSON we can use the writer directly
-            writer.write(questionnaire, output_path)
+    except Exception as e:
+        # TODO: more fine-grained error handling
+        logger.error(f"Error saving questionnaire: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Error saving questionnaire: {str(e)}") from e
 
-            # Set appropriate filename for download
-            download_filename = f"{file_name}.json"
-            media_type = "application/json"
 
-        elif format == "cspro":
-            # TODO: Better handling of CSPro files, move zipping logic to writer
+def _generate_export(format: Literal["json", "cspro"], questionnaire: Questionnaire, writer: Writer) -> CachedExport:
+    """Generate the file to download for a questionnaire export."""
+    file_name = f"{questionnaire.title.replace(' ', '_')}"
 
-            # For CSPro, we create a directory with all CSPro files
-            output_path = temp_dir_path / file_name
-            writer.write(questionnaire, output_path)
+    if format == "json":
+        # A single JSON file is generated so return it directly from memory
+        download_filename = f"{file_name}.json"
+        sink = MemorySink()
+        writer.write(questionnaire, sink, download_filename)
+        return CachedExport(
+            content=sink.files[download_filename],
+            media_type="application/json",
+            filename=download_filename,
+        )
 
-            # Create a zip file of the CSPro directory to return
+    # For CSPro, the writer generates a directory of files which we zip in memory
+    buffer = BytesIO()
+    with ZipSink(buffer) as zip_sink:
+        writer.write(questionnaire, zip_sink, file_name)
+    return CachedExport(content=buffer.getvalue(), media_type="application/zip", filename=f"{file_name}.zip")
 
-            zip_path = temp_dir_path / f"{file_name}.zip"
-            shutil.make_archive(str(zip_path).replace(".zip", ""), "zip", temp_dir_path, file_name)
 
-            # Set output_path to the zip file for download
-            output_path = zip_path
-            download_filename = f"{file_name}.zip"
-            media_type = "application/zip"
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    """Check whether an If-None-Match header value matches an ETag."""
+    if if_none_match.strip() == "*":
+        return True
+    candidates = (candidate.strip().removeprefix("W/") for candidate in if_none_match.split(","))
+    return etag in candidates
 
-        # Return the file
-        return FileResponse(
-            path=output_path,
-            filename=download_filename,
-            media_type=media_type,
-            background=BackgroundTask(shutil.rmtree, temp_dir, ignore_errors=True),
-        )
 
-    except Exception as e:
-        # TODO: more fine-grained error handling
-        logger.error(f"Error saving questionnaire: {str(e)}")
-        raise HTTPException(status_code=500, detail=f"Error saving questionnaire: {str(e)}") from e
+def _content_disposition(filename: str) -> str:
+    """Build an attachment Content-Disposition header, quoting non-ASCII file names."""
+    quoted_filename = quote(filename)
+    if quoted_filename != filename:
+        return f"attachment; filename*=utf-8''{quoted_filename}"
+    return f'attachment; filename="{filename}"'
@@ -5,6 +5,7 @@ import logfire
 from fastapi import FastAPI
 from fastapi.staticfiles import StaticFiles
 
+from survaize.web.backend.api.metrics import router as metrics_router
 from survaize.web.backend.api.routes import router as api_router
 
 logger = logging.getLogger(__name__)
@@ -26,6 +27,7 @@ def create_app() -> FastAPI:
 
     # Include API routes
     app.include_router(api_router)
+    app.include_router(metrics_router)
 
     # When installed as package mount the built frontend files from the package resources
     static_dir = resources.files("survaize.web.frontend").joinpath("dist")
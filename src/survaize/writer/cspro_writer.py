@@ -1,6 +1,6 @@
 import json
 import logging
-from pathlib import Path
+from pathlib import PurePosixPath
 from typing import Literal
 
 import logfire
@@ -36,6 +36,7 @@ from survaize.model.questionnaire import (
     QuestionType,
     SingleChoiceQuestion,
 )
+from survaize.writer.output_sink import OutputSink
 
 # Configure logger
 logger = logging.getLogger(__name__)
@@ -45,37 +46,33 @@ class CSProWriter:
     """Generates CSPro format output from questionnaires."""
 
     @logfire.instrument()
-    def write(self, questionnaire: Questionnaire, output_path: Path):
+    def write(self, questionnaire: Questionnaire, sink: OutputSink, name: str):
         """Generate a CSPro application from a questionnaire.
 
         This method creates a directory with all necessary CSPro files.
 
         Args:
             questionnaire: The structured questionnaire data
-            output_path: Path where the generated CSPro files should be saved
-
-        Returns:
-            Path to the generated CSPro application directory
+            sink: Output sink to write the generated CSPro files to
+            name: Name of the directory within the sink for the CSPro application
         """
-        # Create a directory for the CSPro application
         app_file_name = self._make_file_name(questionnaire.title)
-        app_dir = output_path
-        app_dir.mkdir(parents=True, exist_ok=True)
+        app_dir = PurePosixPath(name)
 
         logger.info(f"Generating CSPro application in: {app_dir}")
 
         # Generate all required CSPro files
         dictionary, dict_item_to_question = self._generate_data_dictionary(questionnaire)
         dictionary_file_name = f"{app_file_name}.dcf"
-        dictionary.save(app_dir / dictionary_file_name)
+        dictionary.save(sink, str(app_dir / dictionary_file_name))
 
         form_file = self._generate_form_file(dictionary, dictionary_file_name, dict_item_to_question)
-        form_file.save(app_dir / f"{app_file_name}.fmf")
-        self._generate_logic_file(questionnaire, app_dir / f"{app_file_name}.ent.apc")
+        form_file.save(sink, str(app_dir / f"{app_file_name}.fmf"))
+        self._generate_logic_file(questionnaire, sink, str(app_dir / f"{app_file_name}.ent.apc"))
         qsf_file = self._generate_question_text_file(questionnaire, dictionary.name)
-        qsf_file.save(app_dir / f"{app_file_name}.ent.qsf")
-        self._generate_application_file(questionnaire, app_dir / f"{app_file_name}.ent")
-        self._generate_message_file(questionnaire, app_dir / f"{app_file_name}.ent.mgf")
+        qsf_file.save(sink, str(app_dir / f"{app_file_name}.ent.qsf"))
+        self._generate_application_file(questionnaire, sink, str(app_dir / f"{app_file_name}.ent"))
+        self._generate_message_file(questionnaire, sink, str(app_dir / f"{app_file_name}.ent.mgf"))
 
         logger.info("CSPro application generated successfully")
 
@@ -611,16 +608,16 @@ class CSProWriter:
             levels=[form_level],
         )
 
-    def _generate_logic_file(self, questionnaire: Questionnaire, output_path: Path) -> None:
+    def _generate_logic_file(self, questionnaire: Questionnaire, sink: OutputSink, name: str) -> None:
         """Generate the CSPro logic (.ent.apc) file.
 
         Args:
             questionnaire: The questionnaire data
-            output_path: Path to save the generated file
+            sink: Output sink to write the generated file to
+            name: Name of the generated file within the sink
         """
-        logger.info(f"Generating logic file: {output_path}")
-        with open(output_path, "w") as f:
-            f.write(f"{{ Application '{questionnaire.title}' logic file generated by Survaize }}\n")
+        logger.info(f"Generating logic file: {name}")
+        sink.write_text(name, f"{{ Application '{questionnaire.title}' logic file generated by Survaize }}\n")
 
     def _generate_question_text_file(self, questionnaire: Questionnaire, dictionary_name: str) -> QsfFile:
         """Generate the CSPro question text (.ent.qsf) file in YAML format.
@@ -684,7 +681,7 @@ class CSProWriter:
 
         return QsfFile(languages=languages, styles=styles, questions=qsf_questions)
 
-    def _generate_application_file(self, questionnaire: Questionnaire, output_path: Path) -> None:
+    def _generate_application_file(self, questionnaire: Questionnaire, sink: OutputSink, name: str) -> None:
         """Generate the CSPro application (.ent) file.
 
         This method creates the main application file that references all other components
@@ -692,13 +689,14 @@ class CSProWriter:
 
         Args:
             questionnaire: The questionnaire data
-            output_path: Path to save the generated file
+            sink: Output sink to write the generated file to
+            name: Name of the generated file within the sink
         """
-        logger.info(f"Generating application file: {output_path}")
+        logger.info(f"Generating application file: {name}")
 
         # Create sanitized names for files
         app_name = self._to_dictionary_name(questionnaire.title)
-        file_base = output_path.stem  # Get base name without extension
+        file_base = PurePosixPath(name).stem  # Get base name without extension
 
         # Create the application structure
         application = {
@@ -759,22 +757,21 @@ class CSProWriter:
         }
 
         # Write the application file
-        with open(output_path, "w") as f:
-            json.dump(application, f, indent=2)
+        sink.write_text(name, json.dumps(application, indent=2))
 
-    def _generate_message_file(self, _questionnaire: Questionnaire, output_path: Path) -> None:
+    def _generate_message_file(self, _questionnaire: Questionnaire, sink: OutputSink, name: str) -> None:
         """Generate the CSPro message (.ent.mgf) file.
 
         Args:
             _questionnaire: The questionnaire data (currently unused)
-            output_path: Path to save the generated file
+            sink: Output sink to write the generated file to
+            name: Name of the generated file within the sink
         """
-        logger.info(f"Generating message file: {output_path}")
+        logger.info(f"Generating message file: {name}")
         # Stub implementation: This would create the message file
         # with error and warning messages
-        with open(output_path, "w") as f:
-            f.write("[CSPro Messages]\n")
-            # Real implementation would include validation messages
+        # Real implementation would include validation messages
+        sink.write_text(name, "[CSPro Messages]\n")
 
     def _replace_suffix(self, string: str, old_suffix: str, new_suffix: str) -> str:
         """Replace the end of a string if it matches old_suffix with new_suffix."""
@@ -1,9 +1,9 @@
 import logging
-from pathlib import Path
 
 import logfire
 
 from survaize.model.questionnaire import Questionnaire
+from survaize.writer.output_sink import OutputSink
 
 logger = logging.getLogger(__name__)
 
@@ -12,15 +12,15 @@ class JSONWriter:
     """Generates JSON format output from questionnaires."""
 
     @logfire.instrument()
-    def write(self, questionnaire: Questionnaire, output_path: Path):
+    def write(self, questionnaire: Questionnaire, sink: OutputSink, name: str):
         """Generate a JSON representation of a questionnaire.
 
         Args:
             questionnaire: The structured questionnaire data
-            output_path: Path where the JSON file should be saved
+            sink: Output sink to write the JSON file to
+            name: Name of the JSON file within the sink
 
         """
-        logger.info(f"Writing output to: {output_path}")
+        logger.info(f"Writing output to: {name}")
 
-        with open(output_path, "w") as f:
-            f.write(questionnaire.model_dump_json(indent=2, exclude_none=True))
+        sink.write_text(name, questionnaire.model_dump_json(indent=2, exclude_none=True))
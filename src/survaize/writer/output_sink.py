@@ -0,0 +1,112 @@
+"""Destinations that writers emit their generated files into."""
+
+import zipfile
+from pathlib import Path
+from types import TracebackType
+from typing import IO, Protocol, Self
+
+
+class OutputSink(Protocol):
+    """Protocol defining a destination for the files generated by a writer.
+
+    File names are relative POSIX paths (e.g. ``"MySurvey/MySurvey.dcf"``) so that the
+    same writer output can be placed in a directory (:class:`DirectorySink`), a zip archive
+    (:class:`ZipSink`) or memory (:class:`MemorySink`).
+    """
+
+    def write_bytes(self, name: str, data: bytes) -> None:
+        """Write a binary file to the sink.
+
+        Args:
+            name: Relative path of the file within the sink
+            data: Contents of the file
+        """
+        ...
+
+    def write_text(self, name: str, text: str) -> None:
+        """Write a UTF-8 encoded text file to the sink.
+
+        Args:
+            name: Relative path of the file within the sink
+            text: Contents of the file
+        """
+        ...
+
+
+class DirectorySink:
+    """Writes files to a directory on disk."""
+
+    def __init__(self, directory: Path) -> None:
+        """Initialize the sink.
+
+        Args:
+            directory: Directory that file names are resolved against
+        """
+        self.directory: Path = directory
+
+    def write_bytes(self, name: str, data: bytes) -> None:
+        path = self.directory / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(data)
+
+    def write_text(self, name: str, text: str) -> None:
+        self.write_bytes(name, text.encode("utf-8"))
+
+
+class ZipSink:
+    """Writes files into a zip archive on a binary stream.
+
+    The stream does not need to be seekable, so the archive can be written directly
+    to a network response. The archive is only complete once the sink is closed.
+    """
+
+    def __init__(self, file: IO[bytes]) -> None:
+        """Initialize the sink.
+
+        Args:
+            file: Binary stream to write the zip archive to
+        """
+        self._zip: zipfile.ZipFile = zipfile.ZipFile(file, mode="w", compression=zipfile.ZIP_DEFLATED)
+
+    def write_bytes(self, name: str, data: bytes) -> None:
+        self._zip.writestr(name, data)
+
+    def write_text(self, name: str, text: str) -> None:
+        self.write_bytes(name, text.encode("utf-8"))
+
+    def close(self) -> None:
+        """Write the zip central directory. The underlying stream is left open."""
+        self._zip.close()
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        self.close()
+
+
+class MemorySink:
+    """Keeps written files in memory as a mapping of file name to contents."""
+
+    def __init__(self) -> None:
+        self.files: dict[str, bytes] = {}
+
+    def write_bytes(self, name: str, data: bytes) -> None:
+        self.files[name] = data
+
+    def write_text(self, name: str, text: str) -> None:
+        self.write_bytes(name, text.encode("utf-8"))
+
+    def copy_to(self, sink: OutputSink) -> None:
+        """Write all files held in memory to another sink.
+
+        Args:
+            sink: Destination sink for the files
+        """
+        for name, data in self.files.items():
+            sink.write_bytes(name, data)
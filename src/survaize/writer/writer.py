@@ -1,17 +1,22 @@
-from pathlib import Path
-from typing import Protocol
+from typing import TYPE_CHECKING, Protocol
 
-from survaize.model.questionnaire import Questionnaire
+from survaize.writer.output_sink import OutputSink
+
+if TYPE_CHECKING:
+    # Only needed for annotations, importing the model would load pydantic and its plugins
+    from survaize.model.questionnaire import Questionnaire
 
 
 class Writer(Protocol):
-    """Protocol defining the interface for writing questionnaires to disk in various formats."""
+    """Protocol defining the interface for writing questionnaires in various formats."""
 
-    def write(self, questionnaire: Questionnaire, output_path: Path):
-        """Write a questionnaire to a file.
+    def write(self, questionnaire: "Questionnaire", sink: OutputSink, name: str):
+        """Write a questionnaire to an output sink.
 
         Args:
             questionnaire: The structured questionnaire data
-            output_path: Path where the questionnaire should be saved
+            sink: Output sink that the generated files are written to
+            name: Name of the output within the sink. Formats that produce a single file use
+                it as the file name, formats that produce several files use it as a directory.
         """
         ...
@@ -1,16 +1,22 @@
-from survaize.writer.cspro_writer import CSProWriter
-from survaize.writer.json_writer import JSONWriter
+import threading
+from collections.abc import Callable
+
 from survaize.writer.writer import Writer
 
 
 class WriterFactory:
-    """Factory for creating writer instances."""
+    """Factory for creating writer instances.
+
+    Writers are created on first use and their modules imported lazily.
+    """
 
     def __init__(self) -> None:
-        self._writers: dict[str, Writer] = {
-            "cspro": CSProWriter(),
-            "json": JSONWriter(),
+        self._writer_creators: dict[str, Callable[[], Writer]] = {
+            "cspro": self._create_cspro_writer,
+            "json": self._create_json_writer,
         }
+        self._writers: dict[str, Writer] = {}
+        self._lock: threading.Lock = threading.Lock()
 
     def get(self, output_format: str) -> Writer:
         """Get a writer instance based on the writer type.
@@ -24,12 +30,17 @@ class WriterFactory:
         Raises:
             ValueError: If an unsupported writer type is provided.
         """
-        writer = self._writers.get(output_format)
-        if not writer:
+        create_writer = self._writer_creators.get(output_format)
+        if not create_writer:
             supported_formats_str = ", ".join(self.get_supported_formats())
             raise ValueError(
                 f"Unsupported writer type: {output_format}. Supported formats are: {supported_formats_str}"
             )
+        with self._lock:
+            writer = self._writers.get(output_format)
+            if writer is None:
+                writer = create_writer()
+                self._writers[output_format] = writer
         return writer
 
     def get_supported_formats(self) -> list[str]:
@@ -38,4 +49,14 @@ class WriterFactory:
         Returns:
             A list of strings representing the supported input formats.
         """
-        return list(self._writers.keys())
+        return list(self._writer_creators.keys())
+
+    def _create_cspro_writer(self) -> Writer:
+        from survaize.writer.cspro_writer import CSProWriter
+
+        return CSProWriter()
+
+    def _create_json_writer(self) -> Writer:
+        from survaize.writer.json_writer import JSONWriter
+
+        return JSONWriter()
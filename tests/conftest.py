@@ -0,0 +1,127 @@
+"""Shared test fixtures."""
+
+import json
+import socket
+import threading
+import time
+from collections.abc import Callable, Iterator
+from pathlib import Path
+from unittest.mock import MagicMock
+
+import httpx
+import openai
+import pytest
+import uvicorn
+from fastapi import FastAPI
+from PIL import Image
+
+from survaize.config.llm_config import LLMConfig, OpenAIProviderType
+from survaize.interpreter.scanned_questionnaire import ScannedQuestionnaire
+
+
+class FakeClock:
+    """Monotonic clock that only advances when told to or when sleeping."""
+
+    def __init__(self) -> None:
+        self.now: float = 0.0
+        self.sleeps: list[float] = []
+
+    def __call__(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+def _error_response(status_code: int, headers: dict[str, str] | None = None) -> MagicMock:
+    response = MagicMock()
+    response.status_code = status_code
+    response.headers = httpx.Headers(headers)
+    return response
+
+
+def rate_limit_error(retry_after: str | None = None) -> openai.RateLimitError:
+    """429 error of the OpenAI client, with a retry-after header if given."""
+    headers = {"retry-after": retry_after} if retry_after else None
+    return openai.RateLimitError("Rate limit reached", response=_error_response(429, headers), body=None)
+
+
+def server_error(status_code: int = 500) -> openai.InternalServerError:
+    """5xx error of the OpenAI client."""
+    return openai.InternalServerError("Server error", response=_error_response(status_code), body=None)
+
+
+def bad_request_error() -> openai.BadRequestError:
+    """400 error of the OpenAI client, e.g. for a request over the context length."""
+    return openai.BadRequestError("Context length exceeded", response=_error_response(400), body=None)
+
+
+def timeout_error() -> openai.APITimeoutError:
+    """Timeout of a request of the OpenAI client."""
+    return openai.APITimeoutError(request=MagicMock())
+
+
+@pytest.fixture()
+def llm_config() -> LLMConfig:
+    """Configuration of a fake OpenAI deployment, for tests that patch create_openai_client."""
+    return LLMConfig(
+        provider=OpenAIProviderType.OPENAI,
+        api_key="fake-api-key",
+        api_version=None,
+        api_url=None,
+        model="gpt-4.1",
+    )
+
+
+@pytest.fixture()
+def make_document() -> Callable[..., ScannedQuestionnaire]:
+    """Create scanned questionnaires with a blank page for each OCR text given."""
+
+    def make(*texts: str) -> ScannedQuestionnaire:
+        img = Image.new("RGB", (100, 100), color="white")
+        return ScannedQuestionnaire(pages=[img] * len(texts), extracted_text=list(texts), source_path=Path("test.pdf"))
+
+    return make
+
+
+@pytest.fixture()
+def make_completion() -> Callable[[dict[str, object]], MagicMock]:
+    """Create mock chat completions returning content as JSON and using 10 prompt and 5 completion tokens."""
+
+    def make(content: dict[str, object]) -> MagicMock:
+        completion = MagicMock()
+        completion.choices[0].message.content = json.dumps(content)
+        completion.usage.prompt_tokens = 10
+        completion.usage.completion_tokens = 5
+        completion.usage.prompt_tokens_details.cached_tokens = 0
+        return completion
+
+    return make
+
+
+@pytest.fixture()
+def serve() -> Iterator[Callable[[FastAPI], str]]:
+    """Serve applications over HTTP on free ports for the duration of a test.
+
+    Returns:
+        Function starting a server for an application and returning its base URL
+    """
+    servers: list[tuple[uvicorn.Server, threading.Thread]] = []
+
+    def start(app: FastAPI) -> str:
+        with socket.socket() as s:
+            s.bind(("127.0.0.1", 0))
+            port: int = s.getsockname()[1]
+        server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+        thread = threading.Thread(target=server.run, daemon=True)
+        thread.start()
+        while not server.started:
+            time.sleep(0.01)
+        servers.append((server, thread))
+        return f"http://127.0.0.1:{port}"
+
+    yield start
+    for server, thread in servers:
+        server.should_exit = True
+        thread.join()
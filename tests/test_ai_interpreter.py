@@ -8,6 +8,7 @@ from unittest.mock import MagicMock, patch
 import pytest
 from PIL import Image
 
+from survaize.config.interpreter_config import InterpreterConfig
 from survaize.config.llm_config import LLMConfig, OpenAIProviderType
 from survaize.interpreter.ai_interpreter import AIQuestionnaireInterpreter
 from survaize.interpreter.scanned_questionnaire import ScannedQuestionnaire
@@ -185,3 +186,80 @@ def test_interpret_logs_usage(
         interpreter.interpret(mock_document)
 
         assert any("Token usage - prompt: 3" in r.getMessage() and "total: 7" in r.getMessage() for r in caplog.records)
+
+
+def test_interpret_multiple_pages_per_request(mock_llm_config: LLMConfig) -> None:
+    """Verify pages after the first are sent in groups of pages_per_request."""
+    img = Image.new("RGB", (100, 100), color="white")
+    document = ScannedQuestionnaire(
+        pages=[img] * 4,
+        extracted_text=[f"OCR page {i}" for i in range(1, 5)],
+        source_path=Path("test.pdf"),
+    )
+    with patch("survaize.interpreter.ai_interpreter.create_openai_client") as mock_factory:
+        mock_client = MagicMock()
+        mock_factory.return_value = mock_client
+
+        completion1 = MagicMock()
+        completion1.choices[0].message.content = json.dumps(
+            {"title": "Test Survey", "id_fields": ["id"], "sections": [], "trailing_sections": []}
+        )
+        partial = MagicMock()
+        partial.choices[0].message.content = json.dumps({"sections": [], "trailing_sections": []})
+        mock_client.chat.completions.create.side_effect = [completion1, partial, partial]
+
+        messages: list[str] = []
+        interpreter = AIQuestionnaireInterpreter(
+            mock_llm_config, interpreter_config=InterpreterConfig(pages_per_request=2)
+        )
+        interpreter.interpret(document, lambda _, message: messages.append(message))
+
+        assert messages == ["Examining page 1/4", "Examining pages 2-3/4", "Examining page 4/4", "Completed"]
+        calls = mock_client.chat.completions.create.call_args_list
+        assert len(calls) == 3
+        content = calls[1].kwargs["messages"][1]["content"]
+        assert content[0]["text"] == "Pages 2 to 3 of the questionnaire"
+        assert sum(1 for part in content if part["type"] == "image_url") == 2
+        assert [part["text"] for part in content if part.get("text", "").startswith("OCR")] == [
+            "OCR Text of page 2:\nOCR page 2",
+            "OCR Text of page 3:\nOCR page 3",
+        ]
+
+
+def test_static_system_prompt_and_cached_tokens(mock_llm_config: LLMConfig, caplog: pytest.LogCaptureFixture) -> None:
+    """Verify page specific content follows an identical system prompt and cached tokens are counted."""
+    img = Image.new("RGB", (100, 100), color="white")
+    document = ScannedQuestionnaire(
+        pages=[img] * 3, extracted_text=["OCR page 1", "OCR page 2", "OCR page 3"], source_path=Path("test.pdf")
+    )
+    with patch("survaize.interpreter.ai_interpreter.create_openai_client") as mock_factory:
+        mock_client = MagicMock()
+        mock_factory.return_value = mock_client
+
+        completion1 = MagicMock()
+        completion1.choices[0].message.content = json.dumps(
+            {"title": "Test Survey", "id_fields": ["id"], "sections": [], "trailing_sections": []}
+        )
+        completion2 = MagicMock()
+        completion2.choices[0].message.content = json.dumps({"sections": [], "trailing_sections": []})
+        for completion, cached in ((completion1, 0), (completion2, 75)):
+            completion.usage.prompt_tokens = 100
+            completion.usage.completion_tokens = 10
+            completion.usage.prompt_tokens_details.cached_tokens = cached
+        mock_client.chat.completions.create.side_effect = [completion1, completion2, completion2]
+
+        interpreter = AIQuestionnaireInterpreter(mock_llm_config)
+        caplog.set_level(logging.INFO)
+        interpreter.interpret(document)
+
+        calls = mock_client.chat.completions.create.call_args_list
+        page2_messages = calls[1].kwargs["messages"]
+        page3_messages = calls[2].kwargs["messages"]
+        assert calls[0].kwargs["messages"][0]["role"] == "system"
+        assert page2_messages[0]["role"] == "system"
+        # The instructions are the same for every page so the provider can cache them
+        assert page2_messages[0] == page3_messages[0]
+        assert page2_messages[1]["content"][0]["text"] == "Page 2 of the questionnaire"
+        assert page3_messages[1]["content"][0]["text"] == "Page 3 of the questionnaire"
+
+        assert any("cached prompt: 150 (50%)" in r.getMessage() for r in caplog.records)
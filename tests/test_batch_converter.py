@@ -0,0 +1,43 @@
+import json
+import shutil
+from pathlib import Path
+
+from survaize.config.llm_config import LLMConfig
+from survaize.convert.batch import BatchConverter, find_input_files
+from survaize.convert.converter import QuestionnaireConverter
+
+fixture_path = Path(__file__).parent / "fixtures" / "PopstanHouseholdSurvey" / "PopstanHouseholdQuestionnaire.json"
+
+
+def test_batch_continues_past_failures(tmp_path: Path, llm_config: LLMConfig) -> None:
+    input_dir = tmp_path / "input"
+    input_dir.mkdir()
+    shutil.copy(fixture_path, input_dir / "first.json")
+    shutil.copy(fixture_path, input_dir / "second.json")
+    (input_dir / "broken.json").write_text("{not json")
+    (input_dir / "notes.txt").write_text("not a questionnaire")
+
+    input_files = find_input_files(str(input_dir), ["json", "pdf"])
+    assert [p.name for p in input_files] == ["broken.json", "first.json", "second.json"]
+
+    converter = QuestionnaireConverter(llm_config)
+    progress: list[tuple[str, int]] = []
+    summary = BatchConverter(converter, max_workers=2).convert(
+        input_files,
+        tmp_path / "output",
+        "cspro",
+        progress_callback=lambda input_file, percent, _msg: progress.append((input_file.name, percent)),
+    )
+
+    assert summary.succeeded == 2
+    assert summary.failed == 1
+    assert [r.status for r in summary.results] == ["failed", "succeeded", "succeeded"]
+    assert (tmp_path / "output" / "first" / "PopstanHouseholdSurvey.dcf").exists()
+    assert ("first.json", 100) in progress
+
+    summary_file = tmp_path / "output" / "batch_summary.json"
+    summary.save(summary_file)
+    data = json.loads(summary_file.read_text())
+    assert data["failed"] == 1
+    assert data["files"][0]["error"]
+    assert data["usage"]["total_tokens"] == 0
@@ -0,0 +1,150 @@
+"""Test that interpretations can be resumed from page checkpoints."""
+
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import replace
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from survaize.config.interpreter_config import InterpreterConfig
+from survaize.config.llm_config import LLMConfig
+from survaize.interpreter.ai_interpreter import AIQuestionnaireInterpreter
+from survaize.interpreter.checkpoint import CheckpointStore, InterpretationCheckpoint, checkpoint_key
+from survaize.interpreter.scanned_questionnaire import ScannedQuestionnaire
+
+
+@pytest.fixture
+def three_page_document(make_document: Callable[..., ScannedQuestionnaire]) -> ScannedQuestionnaire:
+    return make_document("OCR page 1", "OCR page 2", "OCR page 3")
+
+
+def _section(section_id: str, number: str) -> dict[str, object]:
+    return {"id": section_id, "number": number, "title": f"Section {number}", "questions": [], "occurrences": 1}
+
+
+@pytest.fixture
+def pages(make_completion: Callable[[dict[str, object]], MagicMock]) -> list[MagicMock]:
+    """Completions of the three pages of the document."""
+    first_page: dict[str, object] = {
+        "title": "Test Survey",
+        "description": "Test description",
+        "id_fields": ["test_id"],
+        "sections": [_section("section_a", "A")],
+        "trailing_sections": [],
+    }
+    return [
+        make_completion(first_page),
+        make_completion({"sections": [_section("section_b", "B")], "trailing_sections": []}),
+        make_completion({"sections": [_section("section_c", "C")], "trailing_sections": []}),
+    ]
+
+
+def test_resume_after_failed_page(
+    three_page_document: ScannedQuestionnaire, llm_config: LLMConfig, pages: list[MagicMock], tmp_path: Path
+):
+    """A failed interpretation resumes after the last completed page without repeating requests."""
+    checkpoint_dir = tmp_path / "checkpoints"
+    store = CheckpointStore(checkpoint_dir)
+    key = checkpoint_key(three_page_document, llm_config.models, pages_per_request=1)
+
+    with patch("survaize.interpreter.ai_interpreter.create_openai_client") as mock_factory:
+        mock_client = MagicMock()
+        mock_factory.return_value = mock_client
+        mock_client.chat.completions.create.side_effect = [pages[0], ConnectionError("network down")]
+
+        interpreter = AIQuestionnaireInterpreter(llm_config, interpreter_config=InterpreterConfig(checkpoint_dir))
+        with pytest.raises(ConnectionError):
+            interpreter.interpret(three_page_document)
+
+    checkpoint = store.load(key)
+    assert checkpoint is not None
+    assert checkpoint.completed_pages == 1
+    assert checkpoint.usage.total_tokens == 15
+
+    with patch("survaize.interpreter.ai_interpreter.create_openai_client") as mock_factory:
+        mock_client = MagicMock()
+        mock_factory.return_value = mock_client
+        mock_client.chat.completions.create.side_effect = pages[1:]
+
+        progress: list[str] = []
+        interpreter = AIQuestionnaireInterpreter(
+            llm_config, interpreter_config=InterpreterConfig(checkpoint_dir, resume=True)
+        )
+        result = interpreter.interpret(three_page_document, lambda _, message: progress.append(message))
+
+        # Only the pages that were not completed are sent to the LLM
+        assert mock_client.chat.completions.create.call_count == 2
+
+    assert progress[0] == "Resuming from page 2/3"
+    assert [section.id for section in result.sections] == ["section_a", "section_b", "section_c"]
+    # The checkpoint is removed once the interpretation completes
+    assert store.load(key) is None
+
+
+def test_without_resume_starts_over(
+    three_page_document: ScannedQuestionnaire, llm_config: LLMConfig, pages: list[MagicMock], tmp_path: Path
+):
+    """Existing checkpoints are ignored unless resuming is requested."""
+    checkpoint_dir = tmp_path / "checkpoints"
+
+    with patch("survaize.interpreter.ai_interpreter.create_openai_client") as mock_factory:
+        mock_client = MagicMock()
+        mock_factory.return_value = mock_client
+        mock_client.chat.completions.create.side_effect = [pages[0], ConnectionError("network down")]
+        interpreter = AIQuestionnaireInterpreter(llm_config, interpreter_config=InterpreterConfig(checkpoint_dir))
+        with pytest.raises(ConnectionError):
+            interpreter.interpret(three_page_document)
+
+        mock_client.chat.completions.create.side_effect = pages
+        result = interpreter.interpret(three_page_document)
+
+        assert mock_client.chat.completions.create.call_count == 5
+    assert len(result.sections) == 3
+
+
+def test_resume_ignores_checkpoint_made_with_other_settings(
+    three_page_document: ScannedQuestionnaire, llm_config: LLMConfig, pages: list[MagicMock], tmp_path: Path
+):
+    """Pages interpreted with other models or page groupings are not mixed into the result."""
+    checkpoint_dir = tmp_path / "checkpoints"
+
+    with patch("survaize.interpreter.ai_interpreter.create_openai_client") as mock_factory:
+        mock_client = MagicMock()
+        mock_factory.return_value = mock_client
+        mock_client.chat.completions.create.side_effect = [pages[0], ConnectionError("network down")]
+        interpreter = AIQuestionnaireInterpreter(llm_config, interpreter_config=InterpreterConfig(checkpoint_dir))
+        with pytest.raises(ConnectionError):
+            interpreter.interpret(three_page_document)
+
+        mock_client.chat.completions.create.side_effect = pages
+        interpreter = AIQuestionnaireInterpreter(
+            replace(llm_config, model="gpt-4.1-mini"),
+            interpreter_config=InterpreterConfig(checkpoint_dir, resume=True),
+        )
+        interpreter.interpret(three_page_document)
+
+        assert mock_client.chat.completions.create.call_count == 5
+
+
+def test_concurrent_saves_of_same_checkpoint(tmp_path: Path):
+    """Writers of the same checkpoint don't fail on each other's temporary file."""
+    store = CheckpointStore(tmp_path)
+    checkpoint = InterpretationCheckpoint.model_validate(
+        {
+            "key": "same-document",
+            "total_pages": 3,
+            "completed_pages": 1,
+            "questionnaire": {"title": "Test Survey", "id_fields": ["test_id"], "sections": []},
+            "context": [],
+            "usage": {},
+        }
+    )
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        for future in [executor.submit(store.save, checkpoint) for _ in range(32)]:
+            future.result()
+
+    assert store.load("same-document") == checkpoint
+    assert [path.name for path in tmp_path.iterdir()] == ["same-document.json"]
@@ -0,0 +1,172 @@
+"""Test the circuit breaker of LLM deployments and the fallback endpoint."""
+
+from collections.abc import Callable
+from dataclasses import replace
+from unittest.mock import MagicMock, patch
+
+import openai
+import pytest
+
+from survaize.config.llm_config import LLMConfig, LLMEndpoint
+from survaize.interpreter.ai_interpreter import AIQuestionnaireInterpreter
+from survaize.interpreter.circuit_breaker import (
+    CircuitBreaker,
+    CircuitOpenError,
+    CircuitState,
+    shared_circuit_breaker,
+)
+from survaize.interpreter.endpoint_pool import EndpointPool, PoolMember
+from survaize.interpreter.scanned_questionnaire import ScannedQuestionnaire
+from tests.conftest import FakeClock, server_error, timeout_error
+
+
+def test_breaker_opens_on_failure_rate_and_probes_for_recovery():
+    clock = FakeClock()
+    breaker = CircuitBreaker("primary", min_requests=4, open_seconds=30, clock=clock)
+
+    breaker.record_success(1.0)
+    breaker.record_success(1.0)
+    breaker.record_failure()
+    assert breaker.state is CircuitState.CLOSED
+    breaker.record_failure()
+    assert breaker.state is CircuitState.OPEN
+    assert not breaker.acquire()
+
+    clock.now += 30
+    assert breaker.state is CircuitState.HALF_OPEN
+    # A single probe is let through
+    assert breaker.acquire()
+    assert not breaker.available()
+    breaker.record_failure()
+    assert breaker.state is CircuitState.OPEN
+
+    clock.now += 30
+    assert breaker.acquire()
+    breaker.record_success(1.0)
+    assert breaker.state is CircuitState.CLOSED
+
+
+def test_slow_requests_count_as_failures():
+    breaker = CircuitBreaker("primary", min_requests=2, slow_request_seconds=10)
+
+    breaker.record_success(5.0)
+    breaker.record_success(60.0)
+
+    assert breaker.state is CircuitState.OPEN
+
+
+def test_open_breaker_routes_to_fallback_and_probes_primary():
+    clock = FakeClock()
+    breaker = CircuitBreaker("primary", min_requests=2, open_seconds=30, clock=clock)
+    pool = EndpointPool(
+        [PoolMember("primary", "primary", breaker=breaker)],
+        clock=clock,
+        fallback=PoolMember("fallback", "fallback"),
+    )
+    calls: list[str] = []
+    primary_healthy = False
+
+    def request(name: str) -> str:
+        calls.append(name)
+        if name == "primary" and not primary_healthy:
+            raise timeout_error()
+        return name
+
+    # Each failure of the primary fails over to the fallback until the breaker opens
+    assert pool.call(request) == "fallback"
+    assert pool.call(request) == "fallback"
+    assert breaker.state is CircuitState.OPEN
+    assert calls == ["primary", "fallback", "primary", "fallback"]
+
+    # While open, requests go straight to the fallback
+    calls.clear()
+    assert pool.call(request) == "fallback"
+    assert calls == ["fallback"]
+
+    # Once the primary recovers, the half open probe closes the breaker
+    primary_healthy = True
+    clock.now += 30
+    assert pool.call(request) == "primary"
+    assert breaker.state is CircuitState.CLOSED
+
+
+def test_open_breaker_without_fallback_fails_fast():
+    breaker = CircuitBreaker("primary", min_requests=1)
+    pool = EndpointPool([PoolMember("primary", "primary", breaker=breaker)])
+
+    def request(_: str) -> str:
+        raise server_error(503)
+
+    with pytest.raises(openai.InternalServerError):
+        pool.call(request)
+    request_mock = MagicMock()
+    with pytest.raises(CircuitOpenError):
+        pool.call(request_mock)
+    request_mock.assert_not_called()
+
+
+def test_half_open_breaker_shared_by_pools_sends_a_single_probe():
+    clock = FakeClock()
+    breaker = CircuitBreaker("primary", min_requests=1, open_seconds=30, clock=clock)
+    breaker.record_failure()
+    clock.now += 30
+    # Pools of two interpreters using the same deployment
+    pools = [EndpointPool([PoolMember("primary", "primary", breaker=breaker)], clock=clock) for _ in range(2)]
+    nested: list[Exception] = []
+
+    def probe(name: str) -> str:
+        # The other pool saw the breaker as available before this probe was let through
+        try:
+            with patch.object(breaker, "available", return_value=True):
+                pools[1].call(lambda other: other)
+        except CircuitOpenError as e:
+            nested.append(e)
+        return name
+
+    assert pools[0].call(probe) == "primary"
+    assert len(nested) == 1
+    assert breaker.state is CircuitState.CLOSED
+
+
+def test_open_fallback_breaker_fails_fast():
+    primary_breaker = CircuitBreaker("primary", min_requests=1)
+    fallback_breaker = CircuitBreaker("fallback", min_requests=1)
+    primary_breaker.record_failure()
+    fallback_breaker.record_failure()
+    pool = EndpointPool(
+        [PoolMember("primary", "primary", breaker=primary_breaker)],
+        fallback=PoolMember("fallback", "fallback", breaker=fallback_breaker),
+    )
+
+    request_mock = MagicMock()
+    with pytest.raises(CircuitOpenError, match="fallback"):
+        pool.call(request_mock)
+    request_mock.assert_not_called()
+
+
+def test_fallback_model_on_same_url_has_its_own_breaker(
+    llm_config: LLMConfig,
+    make_document: Callable[..., ScannedQuestionnaire],
+    make_completion: Callable[[dict[str, object]], MagicMock],
+):
+    config = replace(
+        llm_config,
+        api_url="https://same-url.example.com",
+        fallback=LLMEndpoint(api_url="https://same-url.example.com", model="gpt-4.1-mini"),
+    )
+    primary_breaker = shared_circuit_breaker("https://same-url.example.com", 30.0, None)
+    for _ in range(primary_breaker.min_requests):
+        primary_breaker.record_failure()
+    document = make_document("OCR text")
+    completion = make_completion({"title": "Test Survey", "id_fields": ["id"], "sections": [], "trailing_sections": []})
+
+    with patch("survaize.interpreter.ai_interpreter.create_openai_client") as mock_factory:
+        primary, fallback = MagicMock(), MagicMock()
+        mock_factory.side_effect = [primary, fallback]
+        fallback.chat.completions.create.return_value = completion
+
+        result = AIQuestionnaireInterpreter(config).interpret(document)
+
+    assert result.title == "Test Survey"
+    primary.chat.completions.create.assert_not_called()
+    assert fallback.chat.completions.create.call_args.kwargs["model"] == "gpt-4.1-mini"
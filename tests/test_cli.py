@@ -0,0 +1,113 @@
+"""Test the command line interface."""
+
+import os
+from collections.abc import Iterator
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+from click.testing import CliRunner
+
+from survaize.config.llm_config import DEFAULT_AZURE_API_VERSION, OpenAIProviderType, create_llm_config_from_env
+from survaize.main import cli
+from survaize.web.backend.api.routes import get_interpreter_config
+
+fixture_path = Path(__file__).parent / "fixtures" / "PopstanHouseholdSurvey" / "PopstanHouseholdQuestionnaire.json"
+
+
+@pytest.fixture
+def environment(monkeypatch: pytest.MonkeyPatch) -> Iterator[None]:
+    """Run commands without the LLM settings of the environment, removing those they set afterwards."""
+    with patch.dict(os.environ):
+        for name in list(os.environ):
+            if name.startswith(("OPENAI_", "SURVAIZE_")):
+                monkeypatch.delenv(name)
+        yield
+
+
+@pytest.mark.usefixtures("environment")
+def test_convert_json_without_api_key(tmp_path: Path) -> None:
+    output_dir = tmp_path / "cspro"
+
+    result = CliRunner().invoke(cli, ["convert", str(fixture_path), str(output_dir), "--format", "cspro"])
+
+    assert result.exit_code == 0, result.output
+    assert (output_dir / "PopstanHouseholdSurvey.dcf").exists()
+
+
+@pytest.mark.usefixtures("environment")
+def test_convert_pdf_without_api_key_is_usage_error(tmp_path: Path) -> None:
+    pdf_file = tmp_path / "survey.pdf"
+    pdf_file.write_bytes(b"%PDF-1.4")
+
+    result = CliRunner().invoke(cli, ["convert", str(pdf_file), str(tmp_path / "out.json")])
+
+    assert result.exit_code == 2
+    assert "API key is required" in result.output
+
+
+@pytest.mark.usefixtures("environment")
+def test_azure_without_api_url_is_usage_error(tmp_path: Path) -> None:
+    args = ["convert", str(fixture_path), str(tmp_path / "out.json"), "--api-key", "key", "--api-provider", "azure"]
+
+    with patch("survaize.main.configure_logfire"):
+        result = CliRunner().invoke(cli, args)
+
+    assert result.exit_code == 2
+    assert "Azure requires a url" in result.output
+
+
+@pytest.mark.usefixtures("environment")
+def test_ui_passes_options_to_web_server() -> None:
+    args = ["ui", "--no-browser", "--api-key", "key", "--requests-per-minute", "30", "--hedge-percentile", "0.9"]
+    args += ["--fallback-api-url", "https://fallback/v1", "--fallback-model", "gpt-4.1-mini"]
+    args += ["--page-deadline", "60", "--no-page-cache", "--pages-per-request", "2"]
+
+    with (
+        patch("survaize.main.configure_logfire"),
+        patch("survaize.web.backend.server.run_server") as run_server,
+    ):
+        result = CliRunner().invoke(cli, args)
+
+    assert result.exit_code == 0, result.output
+    run_server.assert_called_once()
+    assert os.environ["OPENAI_REQUESTS_PER_MINUTE"] == "30"
+    assert os.environ["OPENAI_FALLBACK_API_URL"] == "https://fallback/v1"
+    assert "SURVAIZE_PAGE_CACHE_DIR" not in os.environ
+    llm_config = create_llm_config_from_env()
+    assert llm_config.hedge_percentile == 0.9
+    assert llm_config.page_deadline_seconds == 60
+    assert llm_config.fallback is not None
+    assert llm_config.fallback.model == "gpt-4.1-mini"
+    assert get_interpreter_config().pages_per_request == 2
+
+
+@pytest.mark.usefixtures("environment")
+def test_ui_passes_azure_api_version_to_web_server() -> None:
+    args = [
+        "ui",
+        "--no-browser",
+        "--api-key",
+        "key",
+        "--api-provider",
+        "azure",
+        "--api-url",
+        "https://azure.example.com",
+    ]
+
+    with patch("survaize.main.configure_logfire"), patch("survaize.web.backend.server.run_server"):
+        result = CliRunner().invoke(cli, args)
+
+    assert result.exit_code == 0, result.output
+    llm_config = create_llm_config_from_env()
+    assert llm_config.provider == OpenAIProviderType.AZURE
+    assert llm_config.api_version == DEFAULT_AZURE_API_VERSION
+
+
+@pytest.mark.usefixtures("environment")
+def test_azure_environment_uses_default_api_version(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("OPENAI_API_KEY", "key")
+    monkeypatch.setenv("OPENAI_PROVIDER", "azure")
+    monkeypatch.setenv("OPENAI_API_URL", "https://azure.example.com")
+
+    assert create_llm_config_from_env().api_version == DEFAULT_AZURE_API_VERSION
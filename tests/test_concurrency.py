@@ -0,0 +1,125 @@
+"""Test the adaptive concurrency limiter."""
+
+import contextlib
+import threading
+from unittest.mock import MagicMock
+
+import openai
+import pytest
+
+from survaize.interpreter.concurrency import AdaptiveConcurrencyLimiter
+from survaize.interpreter.deadline import PageDeadlineExceededError
+from survaize.telemetry.metrics import REGISTRY
+from tests.conftest import FakeClock, bad_request_error, rate_limit_error, server_error, timeout_error
+
+
+def _complete(limiter: AdaptiveConcurrencyLimiter, clock: FakeClock, latency: float, overloaded: bool = False) -> None:
+    with contextlib.suppress(openai.RateLimitError), limiter.acquire():
+        clock.now += latency
+        if overloaded:
+            raise rate_limit_error()
+
+
+def test_limit_increases_additively_while_latency_is_stable():
+    clock = FakeClock()
+    limiter = AdaptiveConcurrencyLimiter("test", initial_limit=2, max_limit=4, clock=clock)
+
+    # A full window of requests at the current limit raises it by one
+    for _ in range(2):
+        _complete(limiter, clock, latency=1.0)
+    assert limiter.limit == 3
+    for _ in range(3):
+        _complete(limiter, clock, latency=1.0)
+    assert limiter.limit == 4
+    # The limit never exceeds the maximum
+    for _ in range(10):
+        _complete(limiter, clock, latency=1.0)
+    assert limiter.limit == 4
+
+
+def test_slow_requests_do_not_increase_limit():
+    clock = FakeClock()
+    limiter = AdaptiveConcurrencyLimiter("test", initial_limit=2, clock=clock)
+
+    _complete(limiter, clock, latency=1.0)
+    # Latency spikes well above the smoothed latency hold the limit
+    for _ in range(3):
+        _complete(limiter, clock, latency=10.0)
+    assert limiter.limit == 2
+
+
+def test_overload_backs_off_multiplicatively_once_per_window():
+    clock = FakeClock()
+    limiter = AdaptiveConcurrencyLimiter("test", initial_limit=8, clock=clock)
+
+    # Two requests in flight at the same time both fail, the limit is only halved once
+    with pytest.raises(openai.RateLimitError), limiter.acquire(), limiter.acquire():
+        raise rate_limit_error()
+    assert limiter.limit == 4
+
+    _complete(limiter, clock, latency=1.0, overloaded=True)
+    assert limiter.limit == 2
+    _complete(limiter, clock, latency=1.0, overloaded=True)
+    _complete(limiter, clock, latency=1.0, overloaded=True)
+    assert limiter.limit == 1
+
+
+@pytest.mark.parametrize(
+    "error",
+    [rate_limit_error(), timeout_error(), openai.APIConnectionError(request=MagicMock()), server_error(503)],
+)
+def test_overload_errors_back_off(error: Exception):
+    limiter = AdaptiveConcurrencyLimiter("test", initial_limit=4)
+
+    with pytest.raises(type(error)), limiter.acquire():
+        raise error
+    assert limiter.limit == 2
+
+
+@pytest.mark.parametrize(
+    "error",
+    [bad_request_error(), PageDeadlineExceededError("page 1", 1.0, 1.0, 1), KeyboardInterrupt(), ValueError()],
+)
+def test_other_errors_leave_limit_unchanged(error: BaseException):
+    clock = FakeClock()
+    limiter = AdaptiveConcurrencyLimiter("test", initial_limit=2, clock=clock)
+
+    # Failed requests neither back off nor count towards raising the limit
+    for _ in range(2):
+        with pytest.raises(type(error)), limiter.acquire():
+            clock.now += 1.0
+            raise error
+    assert limiter.limit == 2
+    assert limiter.in_flight == 0
+
+
+def test_limit_metric_is_labelled_by_endpoint():
+    AdaptiveConcurrencyLimiter("https://west.example.com", initial_limit=3)
+    AdaptiveConcurrencyLimiter("https://east.example.com", initial_limit=5)
+
+    metrics = REGISTRY.render()
+    assert 'survaize_llm_concurrency_limit{endpoint="https://west.example.com"} 3' in metrics
+    assert 'survaize_llm_concurrency_limit{endpoint="https://east.example.com"} 5' in metrics
+
+
+def test_acquire_blocks_at_limit():
+    limiter = AdaptiveConcurrencyLimiter("test", initial_limit=1)
+    acquired = threading.Event()
+
+    def worker() -> None:
+        with limiter.acquire():
+            acquired.set()
+
+    with limiter.acquire():
+        thread = threading.Thread(target=worker)
+        thread.start()
+        assert not acquired.wait(0.1)
+        assert limiter.in_flight == 1
+    thread.join(timeout=5)
+    assert acquired.is_set()
+
+
+@pytest.mark.parametrize("initial_limit", [0, 100])
+def test_initial_limit_is_clamped(initial_limit: int):
+    limiter = AdaptiveConcurrencyLimiter("test", min_limit=1, max_limit=10, initial_limit=initial_limit)
+    assert 1 <= limiter.limit <= 10
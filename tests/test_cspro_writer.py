@@ -2,6 +2,7 @@ from pathlib import Path
 
 from survaize.reader.json_reader import JSONReader
 from survaize.writer.cspro_writer import CSProWriter
+from survaize.writer.output_sink import MemorySink
 
 test_data_dir = Path(__file__).parent / "fixtures" / "PopstanHouseholdSurvey"
 cspro_fixture_dir = test_data_dir / "cspro"
@@ -13,33 +14,29 @@ def read_text(path: Path) -> str:
     return path.read_text(encoding="utf-8").replace("\r\n", "\n")
 
 
-def test_cspro_writer_generates_expected_files(tmp_path: Path) -> None:
+def test_cspro_writer_generates_expected_files() -> None:
     """CSProWriter.write should generate files matching the cspro fixtures."""
     # Read questionnaire from JSON fixture
     reader = JSONReader()
     with open(json_fixture_file, "rb") as f:
         questionnaire = reader.read(f)
 
-    # Prepare output path
-    output_file = tmp_path / "PopstanHouseholdSurvey"
-
-    # Run writer
+    # Run writer into memory
     writer = CSProWriter()
-    writer.write(questionnaire, output_file)
-
-    assert output_file.is_dir(), f"Generated directory not found: {output_file}"
+    sink = MemorySink()
+    writer.write(questionnaire, sink, "PopstanHouseholdSurvey")
 
     # Compare each fixture file with generated file
     for fixture_path in sorted(cspro_fixture_dir.iterdir()):
-        gen_path = output_file / fixture_path.name
-        assert gen_path.exists(), f"Missing generated file: {gen_path.name}"
+        gen_name = f"PopstanHouseholdSurvey/{fixture_path.name}"
+        assert gen_name in sink.files, f"Missing generated file: {fixture_path.name}"
         # Compare contents
         expected = read_text(fixture_path)
-        actual = read_text(gen_path)
+        actual = sink.files[gen_name].decode("utf-8").replace("\r\n", "\n")
         assert actual == expected, f"Contents differ for file {fixture_path.name}"
 
     # Ensure no extra files were generated
-    generated_files = {p.name for p in output_file.iterdir()}
+    generated_files = {name.removeprefix("PopstanHouseholdSurvey/") for name in sink.files}
     fixture_files = {p.name for p in cspro_fixture_dir.iterdir()}
     assert generated_files == fixture_files, (
         f"Unexpected generated files: {sorted(generated_files - fixture_files)}; "
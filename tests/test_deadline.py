@@ -0,0 +1,159 @@
+"""Test LLM request timeouts and page deadlines."""
+
+import time
+from collections.abc import Callable
+from dataclasses import replace
+from unittest.mock import MagicMock, patch
+
+import openai
+import pytest
+
+from survaize.config.llm_config import LLMConfig
+from survaize.interpreter.ai_interpreter import AIQuestionnaireInterpreter
+from survaize.interpreter.concurrency import AdaptiveConcurrencyLimiter
+from survaize.interpreter.deadline import PageDeadlineExceededError, page_deadline
+from survaize.interpreter.openai_recorder import create_openai_client
+from survaize.interpreter.rate_limiter import shared_rate_limiter
+from survaize.interpreter.scanned_questionnaire import ScannedQuestionnaire
+from tests.conftest import server_error, timeout_error
+
+
+@pytest.fixture
+def deadline_config(llm_config: LLMConfig) -> Callable[..., LLMConfig]:
+    """Create configurations with short timeouts, each test uses its own URL so that limiters are not shared."""
+
+    def make(api_url: str, page_deadline_seconds: float | None = None) -> LLMConfig:
+        return replace(
+            llm_config,
+            api_url=api_url,
+            connect_timeout=5.0,
+            read_timeout=60.0,
+            sdk_max_retries=1,
+            page_deadline_seconds=page_deadline_seconds,
+        )
+
+    return make
+
+
+def test_client_uses_configured_timeouts_and_retries(deadline_config: Callable[..., LLMConfig]):
+    client = create_openai_client(deadline_config("http://timeouts-test"))
+
+    assert isinstance(client, openai.OpenAI)
+    assert client.timeout == openai.Timeout(60.0, connect=5.0)
+    assert client.max_retries == 1
+
+
+def test_request_timeout_is_bounded_by_page_deadline(
+    deadline_config: Callable[..., LLMConfig], make_document: Callable[..., ScannedQuestionnaire]
+):
+    def create(**kwargs: object) -> MagicMock:
+        timeout = kwargs["timeout"]
+        assert isinstance(timeout, float)
+        time.sleep(timeout)
+        raise timeout_error()
+
+    with patch("survaize.interpreter.ai_interpreter.create_openai_client") as mock_factory:
+        mock_client = MagicMock()
+        mock_factory.return_value = mock_client
+        mock_client.chat.completions.create.side_effect = create
+
+        with pytest.raises(PageDeadlineExceededError) as exc_info:
+            AIQuestionnaireInterpreter(deadline_config("http://deadline-timeout-test", 0.2)).interpret(
+                make_document("OCR text")
+            )
+
+    assert mock_client.chat.completions.create.call_args.kwargs["timeout"] <= 0.2
+    assert exc_info.value.to_dict()["pages"] == "page 1"
+    assert isinstance(exc_info.value.__cause__, openai.APITimeoutError)
+
+
+def test_validation_retries_stop_at_page_deadline(
+    deadline_config: Callable[..., LLMConfig],
+    make_document: Callable[..., ScannedQuestionnaire],
+    make_completion: Callable[[dict[str, object]], MagicMock],
+):
+    invalid = make_completion({"title": "Missing fields"})
+
+    def create(**_: object) -> MagicMock:
+        time.sleep(0.3)
+        return invalid
+
+    with patch("survaize.interpreter.ai_interpreter.create_openai_client") as mock_factory:
+        mock_client = MagicMock()
+        mock_factory.return_value = mock_client
+        mock_client.chat.completions.create.side_effect = create
+
+        with pytest.raises(PageDeadlineExceededError) as exc_info:
+            AIQuestionnaireInterpreter(deadline_config("http://deadline-retries-test", 0.5)).interpret(
+                make_document("OCR text")
+            )
+
+    details = exc_info.value.to_dict()
+    assert details["type"] == "page_deadline_exceeded"
+    assert details["attempts"] == 2
+    assert mock_client.chat.completions.create.call_count == 2
+
+
+def test_interpreter_clients_leave_retries_to_the_pool(deadline_config: Callable[..., LLMConfig]):
+    client = create_openai_client(deadline_config("http://timeouts-test"), max_retries=0)
+    assert isinstance(client, openai.OpenAI)
+    assert client.max_retries == 0
+
+    with patch("survaize.interpreter.ai_interpreter.create_openai_client") as mock_factory:
+        _ = AIQuestionnaireInterpreter(deadline_config("http://pool-retries-test"))
+
+    assert mock_factory.call_args.kwargs["max_retries"] == 0
+
+
+def test_failed_request_is_retried_within_page_deadline(
+    deadline_config: Callable[..., LLMConfig],
+    make_document: Callable[..., ScannedQuestionnaire],
+    make_completion: Callable[[dict[str, object]], MagicMock],
+):
+    completion = make_completion({"title": "Test Survey", "id_fields": ["id"], "sections": [], "trailing_sections": []})
+
+    with patch("survaize.interpreter.ai_interpreter.create_openai_client") as mock_factory:
+        mock_client = MagicMock()
+        mock_factory.return_value = mock_client
+        mock_client.chat.completions.create.side_effect = [
+            server_error(),
+            completion,
+        ]
+
+        result = AIQuestionnaireInterpreter(deadline_config("http://deadline-retry-test", 30.0)).interpret(
+            make_document("OCR text")
+        )
+
+    assert result.title == "Test Survey"
+    assert mock_client.chat.completions.create.call_count == 2
+
+
+def test_rate_limit_wait_beyond_page_deadline_fails_fast(
+    deadline_config: Callable[..., LLMConfig], make_document: Callable[..., ScannedQuestionnaire]
+):
+    config = replace(deadline_config("http://deadline-rate-limit-test", 0.5), requests_per_minute=600)
+    shared_rate_limiter("http://deadline-rate-limit-test", 600, None).pause(30)
+
+    with patch("survaize.interpreter.ai_interpreter.create_openai_client") as mock_factory:
+        mock_client = MagicMock()
+        mock_factory.return_value = mock_client
+        start = time.monotonic()
+
+        with pytest.raises(PageDeadlineExceededError):
+            AIQuestionnaireInterpreter(config).interpret(make_document("OCR text"))
+
+    assert time.monotonic() - start < 5
+    mock_client.chat.completions.create.assert_not_called()
+
+
+def test_concurrency_slot_wait_stops_at_page_deadline():
+    limiter = AdaptiveConcurrencyLimiter("test", initial_limit=1, max_limit=1)
+
+    # The only slot is taken while the second request waits for one
+    with (
+        limiter.acquire(),
+        page_deadline(0.1, "page 2"),
+        pytest.raises(PageDeadlineExceededError),
+        limiter.acquire(),
+    ):
+        pass
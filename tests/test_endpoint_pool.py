@@ -0,0 +1,245 @@
+"""Test routing LLM requests across several deployments."""
+
+import json
+from collections import Counter
+from collections.abc import Callable
+from dataclasses import replace
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+import openai
+import pytest
+
+from survaize.config.llm_config import LLMConfig, LLMEndpoint, OpenAIProviderType, RoutingPolicy, load_endpoints
+from survaize.interpreter.ai_interpreter import AIQuestionnaireInterpreter
+from survaize.interpreter.circuit_breaker import CircuitBreaker, CircuitOpenError, CircuitState
+from survaize.interpreter.endpoint_pool import EndpointPool, PoolMember
+from survaize.interpreter.scanned_questionnaire import ScannedQuestionnaire
+from tests.conftest import FakeClock, rate_limit_error, server_error
+
+
+def test_weighted_round_robin_follows_weights():
+    pool = EndpointPool(
+        [PoolMember("a", "a", weight=2), PoolMember("b", "b", weight=1)],
+        policy=RoutingPolicy.WEIGHTED_ROUND_ROBIN,
+    )
+
+    picks = [pool.call(lambda name: name) for _ in range(6)]
+
+    assert Counter(picks) == {"a": 4, "b": 2}
+    # Smooth round robin interleaves endpoints
+    assert picks[:3] == ["a", "b", "a"]
+
+
+def test_least_outstanding_prefers_idle_endpoint():
+    pool = EndpointPool([PoolMember("a", "a"), PoolMember("b", "b")])
+    nested: list[str] = []
+
+    def request(name: str) -> str:
+        # While "a" has a request in flight, the next request goes to "b"
+        if not nested:
+            nested.append(pool.call(lambda other: other))
+        return name
+
+    assert pool.call(request) == "a"
+    assert nested == ["b"]
+
+
+def test_failing_endpoint_fails_over_and_cools_down():
+    clock = FakeClock()
+    pool = EndpointPool([PoolMember("a", "a"), PoolMember("b", "b")], cooldown=5.0, clock=clock)
+    calls: list[str] = []
+
+    def request(name: str) -> str:
+        calls.append(name)
+        if name == "a":
+            raise server_error()
+        return name
+
+    assert pool.call(request) == "b"
+    # "a" is skipped while it cools down
+    assert pool.call(request) == "b"
+    assert calls == ["a", "b", "b"]
+
+    clock.now = 10.0
+    assert pool.call(request) == "b"
+    assert calls == ["a", "b", "b", "a", "b"]
+
+
+def test_error_raised_when_all_endpoints_fail():
+    pool = EndpointPool([PoolMember("a", "a"), PoolMember("b", "b")])
+
+    def request(_: str) -> str:
+        raise server_error()
+
+    with pytest.raises(openai.InternalServerError):
+        pool.call(request)
+    assert all(member.outstanding == 0 for member in pool.members)
+
+
+def test_waits_for_first_endpoint_to_recover_when_all_are_rate_limited():
+    clock = FakeClock()
+    pool = EndpointPool(
+        [PoolMember("a", "a"), PoolMember("b", "b")], clock=clock, rate_limit_waits=1, sleep=clock.sleep
+    )
+    retry_after = {"a": "7", "b": "3"}
+    calls: list[str] = []
+
+    def request(name: str) -> str:
+        calls.append(name)
+        if calls.count(name) == 1:
+            raise rate_limit_error(retry_after[name])
+        return name
+
+    assert pool.call(request) == "b"
+    assert calls == ["a", "b", "b"]
+    assert clock.sleeps == [3.0]
+
+
+def test_rate_limit_error_raised_when_waits_are_exhausted():
+    pool = EndpointPool([PoolMember("a", "a"), PoolMember("b", "b")], rate_limit_waits=0)
+
+    def request(_: str) -> str:
+        raise rate_limit_error("0")
+
+    with pytest.raises(openai.RateLimitError):
+        pool.call(request)
+
+
+def test_failed_request_is_retried_after_backoff():
+    clock = FakeClock()
+    pool = EndpointPool([PoolMember("a", "a")], clock=clock, sleep=clock.sleep, retries=2)
+    calls: list[str] = []
+
+    def request(name: str) -> str:
+        calls.append(name)
+        if len(calls) < 3:
+            raise server_error()
+        return name
+
+    assert pool.call(request) == "a"
+    assert calls == ["a", "a", "a"]
+    assert clock.sleeps == [0.5, 1.0]
+
+
+def test_every_failed_attempt_counts_towards_the_breaker():
+    clock = FakeClock()
+    breaker = CircuitBreaker("a", min_requests=2, clock=clock)
+    pool = EndpointPool([PoolMember("a", "a", breaker=breaker)], clock=clock, sleep=clock.sleep, retries=5)
+    calls: list[str] = []
+
+    def request(name: str) -> str:
+        calls.append(name)
+        raise server_error()
+
+    # The retries of a single request open the breaker, which stops them
+    with pytest.raises(CircuitOpenError):
+        pool.call(request)
+    assert len(calls) == 2
+    assert breaker.state is CircuitState.OPEN
+
+
+def test_load_endpoints(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setenv("WEST_KEY", "west-key")
+    path = tmp_path / "endpoints.json"
+    path.write_text(
+        json.dumps(
+            [
+                {"api_url": "https://west.example.com", "api_key_env": "WEST_KEY", "provider": "azure", "weight": 2},
+                {"api_url": "https://east.example.com"},
+            ]
+        )
+    )
+
+    assert load_endpoints(path) == (
+        LLMEndpoint(
+            api_url="https://west.example.com", api_key="west-key", provider=OpenAIProviderType.AZURE, weight=2
+        ),
+        LLMEndpoint(api_url="https://east.example.com"),
+    )
+
+    path.write_text(json.dumps([{"api_url": "https://west.example.com", "weight": 0}]))
+    with pytest.raises(ValueError, match="weight"):
+        load_endpoints(path)
+
+
+def test_interpreter_fails_over_to_another_deployment(
+    llm_config: LLMConfig,
+    make_document: Callable[..., ScannedQuestionnaire],
+    make_completion: Callable[[dict[str, object]], MagicMock],
+):
+    config = replace(
+        llm_config,
+        api_url="https://primary.example.com",
+        endpoints=(LLMEndpoint(api_url="https://secondary.example.com"),),
+    )
+    document = make_document("OCR text")
+    completion = make_completion({"title": "Test Survey", "id_fields": ["id"], "sections": [], "trailing_sections": []})
+
+    with patch("survaize.interpreter.ai_interpreter.create_openai_client") as mock_factory:
+        primary, secondary = MagicMock(), MagicMock()
+        mock_factory.side_effect = [primary, secondary]
+        primary.chat.completions.create.side_effect = server_error()
+        secondary.chat.completions.create.return_value = completion
+
+        result = AIQuestionnaireInterpreter(config).interpret(document)
+
+    assert [call.args[0].api_url for call in mock_factory.call_args_list] == [
+        "https://primary.example.com",
+        "https://secondary.example.com",
+    ]
+    assert primary.chat.completions.create.call_count == 1
+    assert result.title == "Test Survey"
+
+
+def test_interpreter_sends_endpoint_model_to_its_deployment(
+    llm_config: LLMConfig,
+    make_document: Callable[..., ScannedQuestionnaire],
+    make_completion: Callable[[dict[str, object]], MagicMock],
+):
+    config = replace(
+        llm_config,
+        provider=OpenAIProviderType.AZURE,
+        api_version="2025-04-01-preview",
+        api_url="https://primary.example.com",
+        endpoints=(LLMEndpoint(api_url="https://eu.example.com", model="eu-deployment"),),
+    )
+    document = make_document("OCR text")
+    completion = make_completion({"title": "Test Survey", "id_fields": ["id"], "sections": [], "trailing_sections": []})
+
+    with patch("survaize.interpreter.ai_interpreter.create_openai_client") as mock_factory:
+        primary, eu = MagicMock(), MagicMock()
+        mock_factory.side_effect = [primary, eu]
+        primary.chat.completions.create.side_effect = server_error()
+        eu.chat.completions.create.return_value = completion
+
+        AIQuestionnaireInterpreter(config).interpret(document)
+
+    assert primary.chat.completions.create.call_args.kwargs["model"] == "gpt-4.1"
+    assert eu.chat.completions.create.call_args.kwargs["model"] == "eu-deployment"
+
+
+def test_interpreter_waits_when_every_deployment_is_rate_limited(
+    llm_config: LLMConfig,
+    make_document: Callable[..., ScannedQuestionnaire],
+    make_completion: Callable[[dict[str, object]], MagicMock],
+):
+    config = replace(
+        llm_config,
+        api_url="https://limited-primary.example.com",
+        requests_per_minute=6000,
+        endpoints=(LLMEndpoint(api_url="https://limited-secondary.example.com"),),
+    )
+    document = make_document("OCR text")
+    completion = make_completion({"title": "Test Survey", "id_fields": ["id"], "sections": [], "trailing_sections": []})
+
+    with patch("survaize.interpreter.ai_interpreter.create_openai_client") as mock_factory:
+        primary, secondary = MagicMock(), MagicMock()
+        mock_factory.side_effect = [primary, secondary]
+        primary.chat.completions.create.side_effect = [rate_limit_error("0.01"), completion]
+        secondary.chat.completions.create.side_effect = [rate_limit_error("0.01"), completion]
+
+        result = AIQuestionnaireInterpreter(config).interpret(document)
+
+    assert result.title == "Test Survey"
+    assert primary.chat.completions.create.call_count + secondary.chat.completions.create.call_count == 3
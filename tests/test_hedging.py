@@ -0,0 +1,283 @@
+"""Test hedged LLM requests."""
+
+import threading
+import time
+from collections.abc import Callable, Generator
+from contextlib import contextmanager, nullcontext
+from dataclasses import replace
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from survaize.config.llm_config import LLMConfig
+from survaize.interpreter.ai_interpreter import AIQuestionnaireInterpreter
+from survaize.interpreter.concurrency import shared_concurrency_limiter
+from survaize.interpreter.hedging import LatencyTracker, RequestHedger, shared_request_hedger
+from survaize.interpreter.rate_limiter import shared_rate_limiter
+from survaize.interpreter.scanned_questionnaire import ScannedQuestionnaire
+from survaize.interpreter.usage import track_usage
+
+
+def _warm_up(hedger: RequestHedger) -> None:
+    for _ in range(hedger.min_samples):
+        hedger.latencies.record(0.01)
+
+
+def _wait_for(condition: Callable[[], bool]) -> bool:
+    """Wait for a condition set by a request left running in the background."""
+    for _ in range(500):
+        if condition():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+def test_latency_percentile_needs_enough_samples():
+    tracker = LatencyTracker()
+    for latency in range(1, 5):
+        tracker.record(latency)
+    assert tracker.percentile(0.5, min_samples=5) is None
+
+    for latency in range(5, 101):
+        tracker.record(latency)
+    assert tracker.percentile(0.95, min_samples=5) == 96
+
+
+def test_fast_call_is_not_hedged():
+    hedger = RequestHedger()
+    _warm_up(hedger)
+    calls: list[int] = []
+
+    def call() -> str:
+        calls.append(1)
+        return "response"
+
+    result = hedger.run(lambda _: call(), nullcontext)
+
+    assert result.value == "response"
+    assert not result.hedged
+    assert len(calls) == 1
+
+
+def test_slow_call_is_hedged_and_first_response_wins():
+    hedger = RequestHedger()
+    _warm_up(hedger)
+    release_primary = threading.Event()
+    attempts = 0
+    lock = threading.Lock()
+
+    def call() -> str:
+        nonlocal attempts
+        with lock:
+            attempts += 1
+            attempt = attempts
+        if attempt == 1:
+            release_primary.wait(5)
+            return "primary"
+        return "hedge"
+
+    result = hedger.run(lambda _: call(), nullcontext)
+    release_primary.set()
+
+    assert result.value == "hedge"
+    assert result.hedged
+    # The primary request is left running and its response will be discarded
+    assert result.abandoned is not None
+    assert result.abandoned.result(5) == "primary"
+
+
+def test_failed_hedge_waits_for_other_request():
+    hedger = RequestHedger()
+    _warm_up(hedger)
+    attempts = 0
+    lock = threading.Lock()
+
+    def call() -> str:
+        nonlocal attempts
+        with lock:
+            attempts += 1
+            attempt = attempts
+        if attempt == 1:
+            threading.Event().wait(0.2)
+            return "primary"
+        raise RuntimeError("hedge failed")
+
+    result = hedger.run(lambda _: call(), nullcontext)
+    assert result.value == "primary"
+    assert result.hedged
+    assert result.abandoned is None
+
+
+def test_error_raised_when_both_requests_fail():
+    hedger = RequestHedger()
+    _warm_up(hedger)
+
+    def call() -> str:
+        threading.Event().wait(0.05)
+        raise RuntimeError("failed")
+
+    with pytest.raises(RuntimeError, match="failed"):
+        hedger.run(lambda _: call(), nullcontext)
+
+
+def test_each_request_holds_its_capacity_until_it_completes():
+    hedger = RequestHedger()
+    _warm_up(hedger)
+    release_primary = threading.Event()
+    held: list[str] = []
+    lock = threading.Lock()
+
+    @contextmanager
+    def reserve() -> Generator[str]:
+        with lock:
+            name = "primary" if "primary" not in held else "hedge"
+            held.append(name)
+        try:
+            yield name
+        finally:
+            with lock:
+                held.remove(name)
+
+    def call(name: str) -> str:
+        if name == "primary":
+            release_primary.wait(5)
+        return name
+
+    result = hedger.run(call, reserve)
+
+    assert result.value == "hedge"
+    assert result.abandoned is not None
+    # The abandoned request keeps its capacity until it completes
+    assert _wait_for(lambda: held == ["primary"])
+    release_primary.set()
+    assert result.abandoned.result(5) == "primary"
+    assert _wait_for(lambda: not held)
+
+
+def test_hedge_waiting_for_capacity_is_not_sent():
+    hedger = RequestHedger()
+    _warm_up(hedger)
+    slot = threading.Semaphore(1)
+    hedge_waiting = threading.Event()
+    returned = threading.Event()
+    hedge_released = threading.Event()
+    calls: list[int] = []
+
+    @contextmanager
+    def reserve() -> Generator[None]:
+        hedge = not slot.acquire(blocking=False)
+        if hedge:
+            hedge_waiting.set()
+            _ = slot.acquire()
+        try:
+            yield
+        finally:
+            if not hedge:
+                # Hold the slot until the caller has the response
+                _ = returned.wait(5)
+            slot.release()
+            if hedge:
+                hedge_released.set()
+
+    def call(_: None) -> str:
+        calls.append(1)
+        assert hedge_waiting.wait(5)
+        return "primary"
+
+    result = hedger.run(call, reserve)
+    returned.set()
+
+    assert result.value == "primary"
+    assert result.hedged
+    assert result.abandoned is None
+    # The hedge gets the slot once the primary request releases it and gives up
+    assert hedge_released.wait(5)
+    assert len(calls) == 1
+
+
+def test_interpreter_hedges_slow_request_and_counts_overhead(
+    llm_config: LLMConfig,
+    make_document: Callable[..., ScannedQuestionnaire],
+    make_completion: Callable[[dict[str, object]], MagicMock],
+):
+    config = replace(
+        llm_config,
+        api_url="http://hedging-test",
+        hedge_percentile=0.9,
+        adaptive_concurrency=True,
+        max_concurrent_requests=4,
+    )
+    _warm_up(shared_request_hedger("http://hedging-test", "gpt-4.1", 0.9))
+    document = make_document("OCR text")
+
+    def completion(title: str, total_tokens: int) -> MagicMock:
+        response = make_completion({"title": title, "id_fields": ["id"], "sections": [], "trailing_sections": []})
+        response.usage.total_tokens = total_tokens
+        response.usage.prompt_tokens_details.cached_tokens = 0
+        return response
+
+    release_primary = threading.Event()
+    calls = 0
+    lock = threading.Lock()
+
+    def create(**_: object) -> MagicMock:
+        nonlocal calls
+        with lock:
+            calls += 1
+            call = calls
+        if call == 1:
+            release_primary.wait(5)
+            return completion("Slow", 40)
+        return completion("Fast", 15)
+
+    with patch("survaize.interpreter.ai_interpreter.create_openai_client") as mock_factory:
+        mock_client = MagicMock()
+        mock_factory.return_value = mock_client
+        mock_client.chat.completions.create.side_effect = create
+
+        with track_usage() as usage:
+            result = AIQuestionnaireInterpreter(config).interpret(document)
+
+        # The slow request keeps its concurrency slot and is only counted once it completes
+        limiter = shared_concurrency_limiter("http://hedging-test", 4)
+        assert limiter.in_flight == 1
+        assert usage.hedge_overhead_tokens == 0
+        release_primary.set()
+        assert _wait_for(lambda: usage.hedge_overhead_tokens > 0)
+        assert _wait_for(lambda: limiter.in_flight == 0)
+
+    assert result.title == "Fast"
+    assert usage.requests == 1
+    assert usage.hedged_requests == 1
+    assert usage.hedge_rate == 1.0
+    assert usage.total_tokens == 15
+    assert usage.hedge_overhead_tokens == 40
+
+
+def test_interpreter_does_not_hedge_time_spent_waiting_for_rate_limits(
+    llm_config: LLMConfig,
+    make_document: Callable[..., ScannedQuestionnaire],
+    make_completion: Callable[[dict[str, object]], MagicMock],
+):
+    config = replace(
+        llm_config,
+        api_url="http://hedging-rate-limit-test",
+        hedge_percentile=0.9,
+        requests_per_minute=6000,
+    )
+    _warm_up(shared_request_hedger("http://hedging-rate-limit-test", "gpt-4.1", 0.9))
+    # Requests wait much longer for the rate limit than the hedge delay
+    shared_rate_limiter("http://hedging-rate-limit-test", 6000, None).pause(0.3)
+    document = make_document("OCR text")
+    completion = make_completion({"title": "Test Survey", "id_fields": ["id"], "sections": [], "trailing_sections": []})
+
+    with patch("survaize.interpreter.ai_interpreter.create_openai_client") as mock_factory:
+        mock_client = MagicMock()
+        mock_factory.return_value = mock_client
+        mock_client.chat.completions.create.return_value = completion
+
+        with track_usage() as usage:
+            AIQuestionnaireInterpreter(config).interpret(document)
+
+    assert mock_client.chat.completions.create.call_count == 1
+    assert usage.hedged_requests == 0
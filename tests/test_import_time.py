@@ -0,0 +1,62 @@
+"""Guard CLI startup time by checking what importing the CLI loads."""
+
+import subprocess
+import sys
+from pathlib import Path
+
+# Dependencies only needed to read PDFs
+PDF_MODULES = {"cv2", "pdf2image", "pytesseract", "PIL", "openai"}
+# Dependencies that are slow to import and not needed to start the CLI
+HEAVY_MODULES = PDF_MODULES | {"numpy", "uvicorn", "fastapi", "logfire"}
+
+# Generous budget for importing the CLI module, it takes ~0.1s when heavy modules are not loaded
+IMPORT_TIME_BUDGET_SECONDS = 1.0
+
+fixture_path = Path(__file__).parent / "fixtures" / "PopstanHouseholdSurvey" / "PopstanHouseholdQuestionnaire.json"
+
+
+def import_times(code: str) -> dict[str, int]:
+    """Run code in a fresh interpreter with -X importtime.
+
+    Returns:
+        Mapping of imported module name to cumulative import time in microseconds
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times: dict[str, int] = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _self_us, cumulative_us, module = line.removeprefix("import time:").split("|")
+        times[module.strip()] = int(cumulative_us)
+    return times
+
+
+def loaded_modules(times: dict[str, int], packages: set[str]) -> set[str]:
+    return {module for module in times if module.split(".")[0] in packages}
+
+
+def test_cli_import_is_fast() -> None:
+    times = import_times("import survaize.main")
+
+    assert loaded_modules(times, HEAVY_MODULES) == set()
+    assert times["survaize.main"] / 1_000_000 < IMPORT_TIME_BUDGET_SECONDS
+
+
+def test_json_to_cspro_does_not_load_pdf_dependencies(tmp_path: Path) -> None:
+    code = f"""
+from pathlib import Path
+from survaize.config.llm_config import LLMConfig
+from survaize.convert.converter import QuestionnaireConverter
+
+config = LLMConfig(api_key="fake-api-key", api_version=None, api_url=None, model="m")
+QuestionnaireConverter(config).convert(Path({str(fixture_path)!r}), Path({str(tmp_path / "out")!r}), "cspro")
+"""
+    times = import_times(code)
+
+    assert "survaize.writer.cspro_writer" in times
+    assert loaded_modules(times, PDF_MODULES) == set()
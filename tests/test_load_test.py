@@ -0,0 +1,97 @@
+"""Test the web API load test harness."""
+
+import asyncio
+import os
+import sys
+from collections.abc import Callable
+from pathlib import Path
+
+import pytest
+from fastapi import FastAPI, WebSocket
+
+from survaize.loadtest.harness import LatencySummary, LoadTestConfig, run_load_test
+from survaize.web.backend.app import create_app
+
+fixture_path = Path("tests/fixtures/PopstanHouseholdSurvey/PopstanHouseholdQuestionnaire.json")
+
+
+def test_latency_summary_percentiles():
+    summary = LatencySummary.from_samples([float(i) for i in range(1, 101)])
+
+    assert summary is not None
+    assert (summary.count, summary.p50, summary.p95, summary.p99, summary.max) == (100, 50.0, 95.0, 99.0, 100.0)
+    assert LatencySummary.from_samples([]) is None
+
+
+def test_latency_summary_small_sample_tail_is_not_max():
+    summary = LatencySummary.from_samples([float(i) for i in range(1, 21)])
+
+    assert summary is not None
+    assert (summary.p50, summary.p95, summary.p99) == (10.0, 19.0, 20.0)
+
+
+def test_load_test_reads_and_saves_questionnaires(serve: Callable[[FastAPI], str]):
+    config = LoadTestConfig(
+        base_url=serve(create_app()),
+        input_file=fixture_path,
+        input_format="json",
+        save_format="cspro",
+        jobs=4,
+        rate=50.0,
+        server_pid=os.getpid(),
+    )
+
+    report = asyncio.run(run_load_test(config))
+
+    assert (report.completed, report.failed) == (4, 0)
+    assert report.throughput > 0
+    latencies = report.latencies
+    for stage in ("upload", "first_progress", "completed", "save"):
+        summary = latencies[stage]
+        assert summary is not None and summary.count == 4
+    if sys.platform == "linux":
+        assert report.to_dict()["server_rss_bytes"] is not None
+
+
+def test_load_test_counts_failed_jobs(serve: Callable[[FastAPI], str], tmp_path: Path):
+    invalid = tmp_path / "invalid.json"
+    invalid.write_text('{"title": "Missing sections"}')
+    config = LoadTestConfig(base_url=serve(create_app()), input_file=invalid, input_format="json", jobs=2, rate=50.0)
+
+    report = asyncio.run(run_load_test(config))
+
+    assert report.failed == 2
+    assert report.error_rate == pytest.approx(1.0)
+    assert report.errors_by_stage == {"upload": 0, "progress": 2, "save": 0}
+
+
+def test_load_test_latency_includes_wait_for_concurrency_slot(serve: Callable[[FastAPI], str]):
+    app = FastAPI()
+
+    @app.post("/api/questionnaire/read")
+    async def read() -> dict[str, str]:
+        await asyncio.sleep(0.2)
+        return {"job_id": "job"}
+
+    @app.websocket("/api/questionnaire/read/{job_id}")
+    async def progress(websocket: WebSocket, job_id: str) -> None:
+        await websocket.accept()
+        await websocket.send_json({"questionnaire": {"job_id": job_id}})
+        await websocket.close()
+
+    config = LoadTestConfig(
+        base_url=serve(app),
+        input_file=fixture_path,
+        input_format="json",
+        save_format=None,
+        jobs=3,
+        rate=1000.0,
+        max_concurrency=1,
+    )
+
+    report = asyncio.run(run_load_test(config))
+
+    # All jobs were due at once, the last one waited for the two before it
+    completed = sorted(result.completed_seconds or 0.0 for result in report.results)
+    assert report.completed == 3
+    assert completed[-1] >= 0.6
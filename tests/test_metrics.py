@@ -0,0 +1,128 @@
+"""Test the Prometheus metrics registry and the /metrics endpoint."""
+
+import json
+from dataclasses import replace
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+import pytest
+from fastapi.testclient import TestClient
+from PIL import Image
+
+from survaize.config.llm_config import LLMConfig
+from survaize.interpreter.ai_interpreter import AIQuestionnaireInterpreter
+from survaize.interpreter.scanned_questionnaire import ScannedQuestionnaire
+from survaize.telemetry.metrics import (
+    JOBS,
+    JOBS_ACCEPTED,
+    LLM_REQUESTS,
+    LLM_RETRIES,
+    LLM_TOKENS,
+    LLM_VALIDATION_FAILURES,
+    STAGE_DURATION,
+    MetricsRegistry,
+)
+from survaize.web.backend.app import create_app
+
+fixture_path = Path("tests/fixtures/PopstanHouseholdSurvey/PopstanHouseholdQuestionnaire.json")
+
+
+def test_registry_renders_prometheus_text_format():
+    registry = MetricsRegistry()
+    requests = registry.counter("requests_total", "Requests", ("model",))
+    in_flight = registry.gauge("in_flight", "Requests in flight")
+    duration = registry.histogram("duration_seconds", "Duration", ("stage",), buckets=(0.1, 1.0))
+
+    requests.inc(model='gpt "4"')
+    requests.inc(2, model='gpt "4"')
+    in_flight.set(3)
+    in_flight.dec()
+    duration.observe(0.05, stage="llm")
+    duration.observe(0.5, stage="llm")
+    duration.observe(5.0, stage="llm")
+
+    assert registry.render().splitlines() == [
+        "# HELP requests_total Requests",
+        "# TYPE requests_total counter",
+        'requests_total{model="gpt \\"4\\""} 3',
+        "# HELP in_flight Requests in flight",
+        "# TYPE in_flight gauge",
+        "in_flight 2",
+        "# HELP duration_seconds Duration",
+        "# TYPE duration_seconds histogram",
+        'duration_seconds_bucket{stage="llm",le="0.1"} 1',
+        'duration_seconds_bucket{stage="llm",le="1"} 2',
+        'duration_seconds_bucket{stage="llm",le="+Inf"} 3',
+        'duration_seconds_sum{stage="llm"} 5.55',
+        'duration_seconds_count{stage="llm"} 3',
+    ]
+    with pytest.raises(ValueError):
+        requests.inc(stage="llm")
+    with pytest.raises(ValueError):
+        registry.counter("requests_total", "Duplicate")
+
+
+def test_metrics_endpoint_reports_jobs_and_writes():
+    client = TestClient(create_app())
+    accepted = JOBS_ACCEPTED.value()
+    succeeded = JOBS.value(status="succeeded")
+    writes = STAGE_DURATION.count(stage="write")
+
+    with open(fixture_path, "rb") as f:
+        job_id = client.post(
+            "/api/questionnaire/read", files={"file": ("q.json", f, "application/json")}, data={"format": "json"}
+        ).json()["job_id"]
+    with client.websocket_connect(f"/api/questionnaire/read/{job_id}") as ws:
+        while "questionnaire" not in (message := ws.receive_json()):
+            assert "error" not in message
+    client.post(
+        "/api/questionnaire/save/cspro", content=fixture_path.read_bytes(), headers={"Content-Type": "application/json"}
+    )
+
+    response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    assert JOBS_ACCEPTED.value() == accepted + 1
+    assert JOBS.value(status="succeeded") == succeeded + 1
+    # Accepted jobs are not counted again among the finished ones
+    assert 'survaize_jobs_total{status="accepted"}' not in response.text
+    assert STAGE_DURATION.count(stage="write") >= writes
+    assert "survaize_active_websockets 0" in response.text
+    assert "survaize_job_queue_depth 0" in response.text
+    assert "# TYPE survaize_stage_duration_seconds histogram" in response.text
+
+
+def test_interpreter_records_llm_metrics(llm_config: LLMConfig):
+    model = "metrics-test-model"
+    invalid = MagicMock()
+    invalid.choices[0].message.content = json.dumps({"title": "Missing fields"})
+    valid = MagicMock()
+    valid.choices[0].message.content = json.dumps(
+        {
+            "title": "Test Survey",
+            "id_fields": ["test_id"],
+            "sections": [{"id": "a", "number": "A", "title": "A", "questions": [], "occurrences": 1}],
+        }
+    )
+    valid.usage.prompt_tokens = 100
+    valid.usage.completion_tokens = 20
+    valid.usage.prompt_tokens_details = None
+    config = replace(
+        llm_config,
+        api_url="http://metrics-test",
+        model=model,
+    )
+    document = ScannedQuestionnaire(
+        pages=[Image.new("RGB", (100, 100), color="white")], extracted_text=["OCR text"], source_path=Path("test.pdf")
+    )
+
+    with patch("survaize.interpreter.ai_interpreter.create_openai_client") as mock_factory:
+        mock_factory.return_value.chat.completions.create.side_effect = [invalid, valid]
+        AIQuestionnaireInterpreter(config).interpret(document)
+
+    assert LLM_REQUESTS.value(model=model, outcome="success") == 2
+    assert LLM_VALIDATION_FAILURES.value(model=model) == 1
+    assert LLM_RETRIES.value(model=model, reason="validation") == 1
+    assert LLM_TOKENS.value(model=model, type="prompt") == 100
+    assert LLM_TOKENS.value(model=model, type="completion") == 20
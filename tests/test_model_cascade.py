@@ -0,0 +1,102 @@
+"""Test that pages are escalated through the model cascade."""
+
+from collections.abc import Callable
+from dataclasses import replace
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from survaize.config.llm_config import LLMConfig
+from survaize.interpreter.ai_interpreter import AIQuestionnaireInterpreter
+from survaize.interpreter.scanned_questionnaire import ScannedQuestionnaire
+from survaize.interpreter.usage import track_usage
+
+MakeCompletion = Callable[[dict[str, object]], MagicMock]
+
+
+@pytest.fixture
+def cascade_config(llm_config: LLMConfig) -> LLMConfig:
+    return replace(llm_config, model="strong-model", cascade_models=("fast-model",))
+
+
+FIRST_PAGE: dict[str, object] = {
+    "title": "Test Survey",
+    "id_fields": ["name"],
+    "sections": [
+        {
+            "id": "section_a",
+            "number": "A",
+            "title": "Section A",
+            "occurrences": 1,
+            "questions": [{"number": "A1", "id": "name", "text": "Name?", "type": "text"}],
+        }
+    ],
+    "trailing_sections": [],
+}
+EMPTY_PAGE: dict[str, object] = {"sections": [], "trailing_sections": []}
+INVALID: dict[str, object] = {"title": "Missing fields"}
+
+
+def _models(create: MagicMock) -> list[str]:
+    return [call.kwargs["model"] for call in create.call_args_list]
+
+
+def test_invalid_response_escalates_to_next_model(
+    cascade_config: LLMConfig,
+    make_document: Callable[..., ScannedQuestionnaire],
+    make_completion: MakeCompletion,
+):
+    """A validation failure from the fast model is escalated without asking it to fix the response."""
+    with patch("survaize.interpreter.ai_interpreter.create_openai_client") as mock_factory:
+        mock_client = MagicMock()
+        mock_factory.return_value = mock_client
+        mock_client.chat.completions.create.side_effect = [
+            make_completion(page) for page in (INVALID, FIRST_PAGE, EMPTY_PAGE)
+        ]
+
+        with track_usage() as usage:
+            AIQuestionnaireInterpreter(cascade_config).interpret(make_document("Name?", "Notes"))
+
+        assert _models(mock_client.chat.completions.create) == ["fast-model", "strong-model", "fast-model"]
+    assert usage.pages_by_model == {"strong-model": 1, "fast-model": 1}
+    # Tokens used by the escalated attempt are still counted
+    assert usage.prompt_tokens == 30
+
+
+def test_empty_result_with_ocr_text_escalates(
+    cascade_config: LLMConfig,
+    make_document: Callable[..., ScannedQuestionnaire],
+    make_completion: MakeCompletion,
+):
+    """A page with substantial OCR text but no questions extracted is escalated."""
+    long_text = "What is the highest level of education you have completed? " * 5
+    with patch("survaize.interpreter.ai_interpreter.create_openai_client") as mock_factory:
+        mock_client = MagicMock()
+        mock_factory.return_value = mock_client
+        mock_client.chat.completions.create.side_effect = [
+            make_completion(page) for page in (FIRST_PAGE, EMPTY_PAGE, EMPTY_PAGE)
+        ]
+
+        with track_usage() as usage:
+            AIQuestionnaireInterpreter(cascade_config).interpret(make_document("Name?", long_text))
+
+        assert _models(mock_client.chat.completions.create) == ["fast-model", "fast-model", "strong-model"]
+    assert usage.pages_by_model == {"fast-model": 1, "strong-model": 1}
+
+
+def test_last_model_failure_is_raised(
+    cascade_config: LLMConfig,
+    make_document: Callable[..., ScannedQuestionnaire],
+    make_completion: MakeCompletion,
+):
+    """The last model of the cascade keeps the usual retries and its failure is raised."""
+    with patch("survaize.interpreter.ai_interpreter.create_openai_client") as mock_factory:
+        mock_client = MagicMock()
+        mock_factory.return_value = mock_client
+        mock_client.chat.completions.create.return_value = make_completion(INVALID)
+
+        interpreter = AIQuestionnaireInterpreter(cascade_config, max_retries=2)
+        with pytest.raises(ValueError, match="after 2 attempts"):
+            interpreter.interpret(make_document("Name?"))
+
+        assert _models(mock_client.chat.completions.create) == ["fast-model", "strong-model", "strong-model"]
@@ -0,0 +1,211 @@
+"""Test recording and replaying OpenAI chat completions."""
+
+import base64
+import gzip
+import json
+import random
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import cast
+from unittest.mock import MagicMock
+
+import pytest
+from openai import OpenAI
+from openai.types import CompletionUsage
+from openai.types.chat import ChatCompletion
+
+from survaize.interpreter.openai_recorder import (
+    RecordingClient,
+    RecordingMode,
+    RecordingNotFoundError,
+    RecordingStore,
+    request_hash,
+)
+
+
+def _completion(content: str) -> ChatCompletion:
+    return ChatCompletion.model_validate(
+        {
+            "id": f"chatcmpl-{content}",
+            "object": "chat.completion",
+            "created": 0,
+            "model": "gpt-4.1",
+            "choices": [
+                {
+                    "index": 0,
+                    "finish_reason": "stop",
+                    "message": {"role": "assistant", "content": content},
+                }
+            ],
+        }
+    )
+
+
+def _request(page: int) -> dict[str, object]:
+    return {
+        "model": "gpt-4.1",
+        "messages": [{"role": "user", "content": f"Page {page}"}],
+        "response_format": {"type": "json_object"},
+    }
+
+
+def _record(directory: Path, pages: list[int]) -> Path:
+    def create(**kwargs: object) -> ChatCompletion:
+        return _completion(str(kwargs["messages"]))
+
+    client = MagicMock()
+    client.chat.completions.create.side_effect = create
+    recorder = RecordingClient(cast(OpenAI, client), RecordingMode.RECORD, directory)
+    for page in pages:
+        recorder.chat.completions.create(**_request(page))
+    (recording_dir,) = directory.iterdir()
+    return recording_dir
+
+
+def test_request_hash_ignores_timeout_and_key_order():
+    request = _request(1)
+    reordered = {"response_format": request["response_format"], "messages": request["messages"], "model": "gpt-4.1"}
+
+    assert request_hash(request) == request_hash({**reordered, "timeout": 10.0})
+    assert request_hash(request) != request_hash(_request(2))
+
+
+def test_replay_serves_requests_in_any_order_and_thread(tmp_path: Path):
+    recording_dir = _record(tmp_path, [1, 2, 3, 4])
+    index = json.loads((recording_dir / "index.json").read_text())
+    assert len(index["recordings"]) == 4
+
+    replayer = RecordingClient(cast(OpenAI, MagicMock()), RecordingMode.REPLAY, recording_dir)
+    pages = [4, 2, 3, 1]
+
+    def replay(page: int) -> ChatCompletion:
+        return replayer.chat.completions.create(**_request(page))
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        responses = list(executor.map(replay, pages))
+
+    assert [response.choices[0].message.content for response in responses] == [
+        str(_request(page)["messages"]) for page in pages
+    ]
+
+
+def test_repeated_requests_replay_in_recorded_order(tmp_path: Path):
+    client = MagicMock()
+    client.chat.completions.create.side_effect = [_completion("first"), _completion("second")]
+    recorder = RecordingClient(cast(OpenAI, client), RecordingMode.RECORD, tmp_path)
+    recorder.chat.completions.create(**_request(1))
+    recorder.chat.completions.create(**_request(1))
+
+    (recording_dir,) = tmp_path.iterdir()
+    store = RecordingStore(recording_dir)
+    contents = [store.replay(_request(1)).choices[0].message.content for _ in range(3)]
+
+    # The last response is repeated once the recordings are used up
+    assert contents == ["first", "second", "second"]
+
+
+def test_sequential_recordings_are_indexed(tmp_path: Path):
+    for number, page in enumerate([1, 2], start=1):
+        (tmp_path / f"{number:03d}.json").write_text(
+            json.dumps(
+                {"request": {"args": [], "kwargs": _request(page)}, "response": _completion(str(page)).model_dump()}
+            )
+        )
+
+    store = RecordingStore(tmp_path)
+
+    assert store.replay(_request(2)).choices[0].message.content == "2"
+    assert store.replay(_request(1)).choices[0].message.content == "1"
+
+
+def test_missing_recording_raises(tmp_path: Path):
+    store = RecordingStore(tmp_path)
+
+    with pytest.raises(RecordingNotFoundError):
+        store.replay(_request(1))
+
+
+def test_images_are_stored_once_and_records_compressed(tmp_path: Path):
+    image_url = "data:image/png;base64," + base64.b64encode(b"png bytes" * 1000).decode("ascii")
+
+    def request(page: int) -> dict[str, object]:
+        return {
+            "model": "gpt-4.1",
+            "messages": [
+                {
+                    "role": "user",
+                    "content": [
+                        {"type": "text", "text": f"Page {page}"},
+                        {"type": "image_url", "image_url": {"url": image_url}},
+                    ],
+                }
+            ],
+            "response_format": {"type": "json_object"},
+        }
+
+    client = MagicMock()
+    client.chat.completions.create.side_effect = [_completion("1"), _completion("2")]
+    recorder = RecordingClient(cast(OpenAI, client), RecordingMode.RECORD, tmp_path)
+    recorder.chat.completions.create(**request(1))
+    recorder.chat.completions.create(**request(2))
+
+    (recording_dir,) = tmp_path.iterdir()
+    assert len(list((recording_dir / "blobs").iterdir())) == 1
+    records = sorted(recording_dir.glob("*.json.gz"))
+    assert len(records) == 2
+    with gzip.open(records[0], "rt") as f:
+        assert "base64" not in f.read()
+
+    store = RecordingStore(recording_dir)
+    assert store.replay(request(2)).choices[0].message.content == "2"
+    file_name = json.loads((recording_dir / "index.json").read_text())["recordings"][request_hash(request(1))][0]
+    assert store.load_request(file_name) == request(1)
+
+
+def test_replay_sleeps_for_scaled_recorded_latency(tmp_path: Path):
+    RecordingStore(tmp_path).record(_request(1), _completion("1"), latency_seconds=2.0)
+    sleeps: list[float] = []
+
+    instant = RecordingStore(tmp_path, sleep=sleeps.append)
+    instant.replay(_request(1))
+    assert sleeps == []
+
+    scaled = RecordingStore(tmp_path, latency_scale=0.5, sleep=sleeps.append)
+    scaled.replay(_request(1))
+    assert sleeps == [1.0]
+
+    sleeps.clear()
+    jittered = RecordingStore(
+        tmp_path, latency_scale=1.0, latency_jitter=0.25, sleep=sleeps.append, rng=random.Random(42)
+    )
+    for _ in range(20):
+        jittered.replay(_request(1))
+    assert all(1.5 <= latency <= 2.5 for latency in sleeps)
+    assert len(set(sleeps)) > 1
+
+
+def test_recording_includes_latency_and_usage(tmp_path: Path):
+    completion = _completion("1")
+    completion.usage = CompletionUsage(prompt_tokens=10, completion_tokens=5, total_tokens=15)
+    RecordingStore(tmp_path).record(_request(1), completion, latency_seconds=1.5)
+
+    (record,) = tmp_path.glob("*.json.gz")
+    with gzip.open(record, "rt") as f:
+        data = json.load(f)
+    assert data["latency_seconds"] == 1.5
+    assert data["usage"]["total_tokens"] == 15
+
+
+def test_clients_recording_to_a_directory_share_the_session(tmp_path: Path):
+    clients = [MagicMock(), MagicMock()]
+    for page, client in enumerate(clients, start=1):
+        client.chat.completions.create.return_value = _completion(f"page {page}")
+    # E.g. the deployments of a pool, created in the same second
+    recorders = [RecordingClient(cast(OpenAI, client), RecordingMode.RECORD, tmp_path) for client in clients]
+
+    for page, recorder in enumerate(recorders, start=1):
+        recorder.chat.completions.create(**_request(page))
+
+    (recording_dir,) = tmp_path.iterdir()
+    store = RecordingStore(recording_dir)
+    assert [store.replay(_request(page)).choices[0].message.content for page in (1, 2)] == ["page 1", "page 2"]
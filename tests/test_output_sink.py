@@ -0,0 +1,26 @@
+import zipfile
+from io import BytesIO
+from pathlib import Path
+
+from survaize.writer.output_sink import DirectorySink, MemorySink, ZipSink
+
+
+def test_memory_sink_copies_to_directory(tmp_path: Path) -> None:
+    sink = MemorySink()
+    sink.write_text("app/app.txt", "héllo")
+    sink.write_bytes("app/data.bin", b"\x00\x01")
+
+    sink.copy_to(DirectorySink(tmp_path))
+
+    assert (tmp_path / "app" / "app.txt").read_text(encoding="utf-8") == "héllo"
+    assert (tmp_path / "app" / "data.bin").read_bytes() == b"\x00\x01"
+
+
+def test_zip_sink_writes_archive() -> None:
+    buffer = BytesIO()
+    with ZipSink(buffer) as sink:
+        sink.write_text("app/app.txt", "héllo")
+
+    with zipfile.ZipFile(BytesIO(buffer.getvalue())) as archive:
+        assert archive.namelist() == ["app/app.txt"]
+        assert archive.read("app/app.txt").decode("utf-8") == "héllo"
@@ -0,0 +1,85 @@
+"""Test that revised documents only re-interpret changed pages."""
+
+from collections.abc import Callable
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from survaize.config.interpreter_config import InterpreterConfig
+from survaize.config.llm_config import LLMConfig
+from survaize.interpreter.ai_interpreter import AIQuestionnaireInterpreter
+from survaize.interpreter.scanned_questionnaire import ScannedQuestionnaire
+
+Interpret = Callable[[ScannedQuestionnaire, list[dict[str, object]]], MagicMock]
+
+
+def _page(section_id: str, question_id: str, first: bool = False) -> dict[str, object]:
+    section = {
+        "id": section_id,
+        "number": section_id[-1].upper(),
+        "title": section_id,
+        "occurrences": 1,
+        "questions": [{"number": "1", "id": question_id, "text": question_id, "type": "text"}],
+    }
+    content: dict[str, object] = {
+        "sections": [section],
+        "trailing_sections": [{"id": section_id, "question_ids": [question_id]}],
+    }
+    if first:
+        content.update({"title": "Test Survey", "description": "Test description", "id_fields": [question_id]})
+    return content
+
+
+@pytest.fixture
+def interpret(
+    llm_config: LLMConfig, tmp_path: Path, make_completion: Callable[[dict[str, object]], MagicMock]
+) -> Interpret:
+    """Interpret documents with the page cache in tmp_path, returning the mock sending the LLM requests."""
+
+    def run(document: ScannedQuestionnaire, pages: list[dict[str, object]]) -> MagicMock:
+        with patch("survaize.interpreter.ai_interpreter.create_openai_client") as mock_factory:
+            mock_client = MagicMock()
+            mock_factory.return_value = mock_client
+            mock_client.chat.completions.create.side_effect = [make_completion(page) for page in pages]
+            interpreter = AIQuestionnaireInterpreter(
+                llm_config, interpreter_config=InterpreterConfig(page_cache_dir=tmp_path)
+            )
+            interpreter.interpret(document)
+            return mock_client.chat.completions.create
+
+    return run
+
+
+def test_only_changed_pages_are_interpreted(interpret: Interpret, make_document: Callable[..., ScannedQuestionnaire]):
+    """Unchanged pages whose context is unchanged are reused from the previous run."""
+    original = [_page("section_a", "q1", first=True), _page("section_b", "q2"), _page("section_c", "q3")]
+    create = interpret(make_document("page 1", "page 2", "page 3"), original)
+    assert create.call_count == 3
+
+    # Revising the last page only sends that page
+    create = interpret(make_document("page 1", "page 2", "page 3 v2"), [_page("section_c", "q3")])
+    assert create.call_count == 1
+
+    # The same document again is served entirely from the cache
+    create = interpret(make_document("page 1", "page 2", "page 3"), [])
+    assert create.call_count == 0
+
+
+def test_changed_context_reinterprets_following_page(
+    interpret: Interpret, make_document: Callable[..., ScannedQuestionnaire]
+):
+    """A revised page whose trailing context changes also re-interprets the page after it."""
+    original = [_page("section_a", "q1", first=True), _page("section_b", "q2"), _page("section_c", "q3")]
+    interpret(make_document("page 1", "page 2", "page 3"), original)
+
+    # Page 2 changes but produces the same trailing context so page 3 is reused
+    create = interpret(make_document("page 1", "page 2 v2", "page 3"), [_page("section_b", "q2")])
+    assert create.call_count == 1
+
+    # Page 2 changes its trailing context so page 3 is interpreted again
+    create = interpret(
+        make_document("page 1", "page 2 v3", "page 3"),
+        [_page("section_b", "q2_revised"), _page("section_c", "q3")],
+    )
+    assert create.call_count == 2
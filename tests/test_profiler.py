@@ -0,0 +1,76 @@
+import json
+import tracemalloc
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+from PIL import Image
+
+from survaize.config.llm_config import LLMConfig
+from survaize.interpreter.ai_interpreter import AIQuestionnaireInterpreter
+from survaize.interpreter.scanned_questionnaire import ScannedQuestionnaire
+from survaize.telemetry.profiler import Profiler, profile_stage, profiling
+
+
+def test_stages_are_only_recorded_when_profiling() -> None:
+    profiler = Profiler()
+    with profile_stage("ignored"):
+        pass
+
+    with profiling(profiler), profile_stage("outer", page=2):
+        with profile_stage("inner"):
+            data = bytearray(1_000_000)
+        del data
+
+    records = {record.name: record for record in profiler.records}
+    assert set(records) == {"outer", "inner"}
+    assert records["inner"].page == 2
+    assert records["inner"].peak_memory_bytes >= 1_000_000
+    assert records["outer"].peak_memory_bytes >= records["inner"].peak_memory_bytes
+
+    report = profiler.report()
+    assert report["stages"]["inner"]["count"] == 1  # type: ignore[index]
+    assert set(report["pages"]["2"]) == {"outer", "inner"}  # type: ignore[index]
+
+
+def test_memory_is_traced_until_the_last_profiler_is_done() -> None:
+    first, second = Profiler(), Profiler()
+
+    with profiling(first):
+        with profiling(second), profile_stage("second"):
+            pass
+        # The first profiler still measures memory after the second one is done
+        assert tracemalloc.is_tracing()
+        with profile_stage("first"):
+            data = bytearray(1_000_000)
+        del data
+
+    assert not tracemalloc.is_tracing()
+    assert first.records[0].peak_memory_bytes >= 1_000_000
+
+
+def test_interpreter_stages_and_chrome_trace(tmp_path: Path, llm_config: LLMConfig) -> None:
+    img = Image.new("RGB", (100, 100), color="white")
+    document = ScannedQuestionnaire(pages=[img, img], extracted_text=["p1", "p2"], source_path=Path("test.pdf"))
+    completion1 = MagicMock()
+    completion1.choices[0].message.content = json.dumps(
+        {"title": "Survey", "id_fields": [], "sections": [], "trailing_sections": []}
+    )
+    completion2 = MagicMock()
+    completion2.choices[0].message.content = json.dumps({"sections": [], "trailing_sections": []})
+
+    with patch("survaize.interpreter.ai_interpreter.create_openai_client") as mock_factory:
+        mock_factory.return_value.chat.completions.create.side_effect = [completion1, completion2]
+        interpreter = AIQuestionnaireInterpreter(llm_config)
+        profiler = Profiler()
+        with profiling(profiler):
+            interpreter.interpret(document)
+
+    pages = {(record.name, record.page) for record in profiler.records}
+    assert {("interpret_page", 1), ("llm_request", 1), ("validate", 2), ("encode_image", 2), ("merge", 2)} <= pages
+
+    report_path = tmp_path / "profile.json"
+    trace_path = tmp_path / "trace.json"
+    profiler.save(report_path, trace_path)
+    trace = json.loads(trace_path.read_text())
+    assert all(event["ph"] == "X" for event in trace["traceEvents"])
+    assert json.loads(report_path.read_text())["pages"]["1"]["llm_request"]["count"] == 1
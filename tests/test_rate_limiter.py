@@ -0,0 +1,109 @@
+"""Test scheduling of LLM requests within rate limits."""
+
+from collections.abc import Callable
+from dataclasses import replace
+from unittest.mock import MagicMock, patch
+
+import httpx
+from openai.types.chat import ChatCompletionMessageParam
+
+from survaize.config.llm_config import LLMConfig
+from survaize.interpreter.ai_interpreter import AIQuestionnaireInterpreter
+from survaize.interpreter.rate_limiter import RateLimiter, TokenBucket, estimate_request_tokens, retry_after_seconds
+from survaize.interpreter.scanned_questionnaire import ScannedQuestionnaire
+from tests.conftest import FakeClock, rate_limit_error
+
+
+def test_token_bucket_waits_for_refill():
+    clock = FakeClock()
+    bucket = TokenBucket(capacity=10, refill_per_second=2, clock=clock)
+
+    assert bucket.reserve(10) == 0
+    # The bucket is empty so 4 tokens take 2 seconds to refill
+    assert bucket.reserve(4) == 2
+    clock.now += 2
+    assert bucket.reserve(2) == 1
+
+
+def test_rate_limiter_spaces_requests_to_stay_within_limits():
+    clock = FakeClock()
+    limiter = RateLimiter(requests_per_minute=60, tokens_per_minute=6000, clock=clock, sleep=clock.sleep)
+
+    for _ in range(3):
+        with limiter.acquire(estimated_tokens=3000) as reservation:
+            limiter.record_usage(reservation, total_tokens=3000)
+
+    # The first two requests use the full token budget, the third waits for 3000 tokens to refill at 100/s
+    assert clock.sleeps == [30]
+
+
+def test_rate_limiter_refunds_overestimated_tokens():
+    clock = FakeClock()
+    limiter = RateLimiter(requests_per_minute=None, tokens_per_minute=6000, clock=clock, sleep=clock.sleep)
+
+    for _ in range(4):
+        with limiter.acquire(estimated_tokens=3000) as reservation:
+            limiter.record_usage(reservation, total_tokens=1000)
+
+    assert clock.sleeps == []
+
+
+def test_rate_limiter_pause_holds_back_requests():
+    clock = FakeClock()
+    limiter = RateLimiter(requests_per_minute=600, tokens_per_minute=None, clock=clock, sleep=clock.sleep)
+
+    limiter.pause(5)
+    with limiter.acquire(estimated_tokens=100):
+        pass
+
+    assert clock.sleeps == [5]
+
+
+def test_retry_after_seconds():
+    assert retry_after_seconds(httpx.Headers({"retry-after": "3"}), default=1) == 3
+    assert retry_after_seconds(httpx.Headers({"retry-after-ms": "250", "retry-after": "1"}), default=1) == 0.25
+    assert retry_after_seconds(httpx.Headers({"retry-after": "Wed, 21 Oct 2015 07:28:00 GMT"}), default=1) == 1
+    assert retry_after_seconds(httpx.Headers(), default=2) == 2
+
+
+def test_estimate_request_tokens_counts_text_and_images():
+    messages: list[ChatCompletionMessageParam] = [
+        {"role": "system", "content": "x" * 400},
+        {
+            "role": "user",
+            "content": [
+                {"type": "text", "text": "y" * 40},
+                {"type": "image_url", "image_url": {"url": "data:image/png;base64,AAAA"}},
+            ],
+        },
+    ]
+    assert estimate_request_tokens(messages) == 110 + 1105 + 2000
+
+
+def test_interpreter_pauses_and_retries_on_429(
+    llm_config: LLMConfig,
+    make_document: Callable[..., ScannedQuestionnaire],
+    make_completion: Callable[[dict[str, object]], MagicMock],
+):
+    """A 429 pauses the shared limiter for the retry-after delay and the request is retried."""
+    config = replace(
+        llm_config,
+        api_url="http://rate-limit-test",
+        requests_per_minute=1000,
+    )
+    document = make_document("OCR text")
+
+    rate_limited = rate_limit_error("7")
+    completion = make_completion({"title": "Test Survey", "id_fields": ["id"], "sections": [], "trailing_sections": []})
+
+    with patch("survaize.interpreter.ai_interpreter.create_openai_client") as mock_factory:
+        mock_client = MagicMock()
+        mock_factory.return_value = mock_client
+        mock_client.chat.completions.create.side_effect = [rate_limited, completion]
+
+        with patch("survaize.interpreter.rate_limiter.RateLimiter.pause") as pause:
+            result = AIQuestionnaireInterpreter(config).interpret(document)
+
+    pause.assert_called_once_with(7.0)
+    assert mock_client.chat.completions.create.call_count == 2
+    assert result.title == "Test Survey"
@@ -0,0 +1,22 @@
+from unittest.mock import patch
+
+import pytest
+
+from survaize.config.llm_config import LLMConfig
+from survaize.reader.json_reader import JSONReader
+from survaize.reader.reader_factory import ReaderFactory
+
+
+def test_json_reader_does_not_create_llm_client(llm_config: LLMConfig) -> None:
+    with patch("survaize.interpreter.ai_interpreter.AIQuestionnaireInterpreter") as interpreter_class:
+        reader = ReaderFactory(llm_config).get("json")
+        interpreter_class.assert_not_called()
+    assert isinstance(reader, JSONReader)
+
+
+def test_pdf_reader_requires_llm_config() -> None:
+    factory = ReaderFactory()
+    assert isinstance(factory.get("json"), JSONReader)
+    assert factory.requires_llm("pdf")
+    with pytest.raises(ValueError, match="required to read pdf"):
+        factory.get("pdf")
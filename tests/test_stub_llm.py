@@ -0,0 +1,105 @@
+"""Test the stub LLM server used for load testing."""
+
+import json
+from collections.abc import Callable
+from dataclasses import replace
+from pathlib import Path
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from openai.types.chat import ChatCompletion
+from PIL import Image
+
+from survaize.config.llm_config import LLMConfig
+from survaize.interpreter.ai_interpreter import AIQuestionnaireInterpreter
+from survaize.interpreter.openai_recorder import RecordingStore
+from survaize.interpreter.scanned_questionnaire import ScannedQuestionnaire
+from survaize.loadtest.stub_llm import StubLLMConfig, create_stub_app
+from survaize.model.questionnaire import PartialQuestionnaire, Questionnaire
+
+
+def _request(text: str) -> dict[str, object]:
+    return {
+        "model": "gpt-4.1",
+        "messages": [
+            {"role": "system", "content": "Instructions"},
+            {"role": "user", "content": [{"type": "text", "text": text}]},
+        ],
+        "response_format": {"type": "json_object"},
+    }
+
+
+def _content(body: object) -> str:
+    content = ChatCompletion.model_validate(body).choices[0].message.content
+    assert content is not None
+    return content
+
+
+def test_synthesizes_questionnaire_for_requested_pages():
+    client = TestClient(create_stub_app(StubLLMConfig(latency_median=0)))
+
+    first = client.post("/v1/chat/completions", json=_request("OCR Text:\nTitle"))
+    pages = client.post(
+        "/openai/deployments/gpt-4.1/chat/completions?api-version=2025-04-01-preview",
+        json=_request("Pages 3 to 4 of the questionnaire"),
+    )
+
+    assert first.status_code == 200
+    assert Questionnaire.model_validate_json(_content(first.json())).sections[0].id == "S1"
+    partial = PartialQuestionnaire.model_validate_json(_content(pages.json()))
+    assert [section.id for section in partial.sections] == ["S3", "S4"]
+    assert pages.json()["usage"]["total_tokens"] > 0
+
+
+def test_rate_limit_returns_429_with_retry_after():
+    client = TestClient(create_stub_app(StubLLMConfig(latency_median=0, requests_per_minute=2)))
+
+    statuses = [client.post("/v1/chat/completions", json=_request("Page 2 of the questionnaire")) for _ in range(3)]
+
+    assert [response.status_code for response in statuses] == [200, 200, 429]
+    assert float(statuses[-1].headers["retry-after"]) > 0
+    assert statuses[-1].json()["error"]["code"] == "rate_limit_exceeded"
+
+
+def test_injects_errors_and_invalid_json():
+    failing = TestClient(create_stub_app(StubLLMConfig(latency_median=0, error_rate=1.0)))
+    invalid = TestClient(create_stub_app(StubLLMConfig(latency_median=0, invalid_json_rate=1.0)))
+
+    assert failing.post("/v1/chat/completions", json=_request("Page 2 of the questionnaire")).status_code == 500
+    with pytest.raises(json.JSONDecodeError):
+        json.loads(_content(invalid.post("/v1/chat/completions", json=_request("Page 2 of the questionnaire")).json()))
+
+
+def test_serves_matching_recordings(tmp_path: Path):
+    request = _request("Page 2 of the questionnaire")
+    recorded = ChatCompletion.model_validate(
+        {
+            "id": "chatcmpl-recorded",
+            "object": "chat.completion",
+            "created": 0,
+            "model": "gpt-4.1",
+            "choices": [
+                {"index": 0, "finish_reason": "stop", "message": {"role": "assistant", "content": '{"sections": []}'}}
+            ],
+        }
+    )
+    RecordingStore(tmp_path).record(request, recorded, latency_seconds=1.0)
+    client = TestClient(create_stub_app(StubLLMConfig(latency_median=0, recordings_dir=tmp_path)))
+
+    assert _content(client.post("/v1/chat/completions", json=request).json()) == '{"sections": []}'
+    assert "S3" in _content(client.post("/v1/chat/completions", json=_request("Page 3 of the questionnaire")).json())
+
+
+def test_interpreter_runs_against_stub(serve: Callable[[FastAPI], str], llm_config: LLMConfig):
+    stub = StubLLMConfig(latency_median=0.01, latency_sigma=0.1, invalid_json_rate=0.2, seed=1)
+    config = replace(
+        llm_config,
+        api_url=serve(create_stub_app(stub)) + "/v1",
+    )
+    pages = [Image.new("RGB", (100, 100), color="white") for _ in range(3)]
+    document = ScannedQuestionnaire(pages=pages, extracted_text=["OCR text"] * 3, source_path=Path("test.pdf"))
+
+    questionnaire = AIQuestionnaireInterpreter(config).interpret(document)
+
+    assert [section.id for section in questionnaire.sections] == ["S1", "S2", "S3"]
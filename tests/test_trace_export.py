@@ -0,0 +1,114 @@
+"""Test the export of spans to local trace files."""
+
+import json
+from dataclasses import replace
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+from logfire.testing import CaptureLogfire
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.sdk.trace.export import SimpleSpanProcessor
+from PIL import Image
+
+from survaize.config.llm_config import LLMConfig
+from survaize.interpreter.ai_interpreter import AIQuestionnaireInterpreter
+from survaize.interpreter.scanned_questionnaire import ScannedQuestionnaire
+from survaize.telemetry.trace_export import LocalTraceExporter, TraceFormat
+
+
+def _trace_jobs(exporter: LocalTraceExporter, jobs: list[str]) -> None:
+    provider = TracerProvider()
+    provider.add_span_processor(SimpleSpanProcessor(exporter))
+    tracer = provider.get_tracer("survaize-test")
+    for job in jobs:
+        with tracer.start_as_current_span(job), tracer.start_as_current_span("page", attributes={"image_bytes": 10}):
+            pass
+    provider.shutdown()
+
+
+def _read_chrome_trace(path: Path) -> list[dict[str, object]]:
+    # Events are appended as spans end so the array is not closed
+    text = path.read_text(encoding="utf-8")
+    return json.loads(text.rstrip().removesuffix(",") + "]")
+
+
+def test_writes_one_chrome_trace_per_job(tmp_path: Path):
+    _trace_jobs(LocalTraceExporter(tmp_path), ["job 1", "job 2"])
+
+    files = sorted(tmp_path.glob("*.trace.json"))
+    assert len(files) == 2
+    events = _read_chrome_trace(files[0])
+    by_name = {event["name"]: event for event in events}
+    assert set(by_name) == {"job 1", "page"}
+    page_args = by_name["page"]["args"]
+    assert isinstance(page_args, dict)
+    assert page_args["image_bytes"] == 10
+    assert page_args["parent_span_id"] == by_name["job 1"]["args"]["span_id"]  # type: ignore[index]
+
+
+def test_keeps_most_recent_files(tmp_path: Path):
+    _trace_jobs(LocalTraceExporter(tmp_path, max_files=2), ["job 1", "job 2", "job 3"])
+
+    files = sorted(tmp_path.glob("*.trace.json"))
+    assert [event["name"] for path in files for event in _read_chrome_trace(path) if event["name"] != "page"] == [
+        "job 2",
+        "job 3",
+    ]
+
+
+def test_writes_otlp_json_lines(tmp_path: Path):
+    _trace_jobs(LocalTraceExporter(tmp_path, TraceFormat.OTLP_JSON), ["job 1"])
+
+    (path,) = tmp_path.glob("*.otlp.jsonl")
+    batches = [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+    names = {
+        span["name"]
+        for batch in batches
+        for resource_spans in batch["resourceSpans"]
+        for scope_spans in resource_spans["scopeSpans"]
+        for span in scope_spans["spans"]
+    }
+    assert names == {"job 1", "page"}
+
+
+def test_page_spans_carry_usage(capfire: CaptureLogfire, llm_config: LLMConfig):
+    invalid = MagicMock()
+    invalid.choices[0].message.content = json.dumps({"title": "Missing fields"})
+    invalid.usage.prompt_tokens = 100
+    invalid.usage.completion_tokens = 5
+    invalid.usage.prompt_tokens_details = None
+    valid = MagicMock()
+    valid.choices[0].message.content = json.dumps(
+        {
+            "title": "Test Survey",
+            "id_fields": ["test_id"],
+            "sections": [{"id": "a", "number": "A", "title": "A", "questions": [], "occurrences": 1}],
+        }
+    )
+    valid.usage.prompt_tokens = 100
+    valid.usage.completion_tokens = 20
+    valid.usage.prompt_tokens_details = None
+    config = replace(
+        llm_config,
+        api_url="http://trace-export-test",
+    )
+    document = ScannedQuestionnaire(
+        pages=[Image.new("RGB", (100, 100), color="white")], extracted_text=["OCR text"], source_path=Path("test.pdf")
+    )
+
+    with patch("survaize.interpreter.ai_interpreter.create_openai_client") as mock_factory:
+        mock_factory.return_value.chat.completions.create.side_effect = [invalid, valid]
+        AIQuestionnaireInterpreter(config).interpret(document)
+
+    (attributes,) = [
+        span.attributes or {}
+        for span in capfire.exporter.exported_spans
+        if span.name == "Interpret {page_label}" and (span.attributes or {}).get("logfire.span_type") == "span"
+    ]
+    assert attributes["page"] == 1
+    assert attributes["prompt_tokens"] == 200
+    assert attributes["completion_tokens"] == 25
+    assert attributes["requests"] == 2
+    assert attributes["retries"] == 1
+    image_bytes = attributes["image_bytes"]
+    assert isinstance(image_bytes, int) and image_bytes > 0
@@ -0,0 +1,78 @@
+import json
+import zipfile
+from io import BytesIO
+from pathlib import Path
+from unittest.mock import patch
+
+from fastapi.testclient import TestClient
+
+from survaize.web.backend.api import routes
+from survaize.web.backend.api.export_cache import ExportCache
+from survaize.web.backend.app import create_app
+from survaize.writer.cspro_writer import CSProWriter
+
+fixture_dir = Path("tests/fixtures/PopstanHouseholdSurvey")
+fixture_path = fixture_dir / "PopstanHouseholdQuestionnaire.json"
+
+
+def test_save_cspro_returns_zip_of_application() -> None:
+    client = TestClient(create_app())
+    response = client.post(
+        "/api/questionnaire/save/cspro",
+        content=fixture_path.read_bytes(),
+        headers={"Content-Type": "application/json"},
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/zip"
+    assert 'filename="Popstan_Household_Survey.zip"' in response.headers["content-disposition"]
+
+    with zipfile.ZipFile(BytesIO(response.content)) as archive:
+        names = set(archive.namelist())
+        expected = {f"Popstan_Household_Survey/{p.name}" for p in (fixture_dir / "cspro").iterdir()}
+        assert names == expected
+        dictionary = archive.read("Popstan_Household_Survey/PopstanHouseholdSurvey.dcf").decode("utf-8")
+        assert dictionary == (fixture_dir / "cspro" / "PopstanHouseholdSurvey.dcf").read_text(encoding="utf-8")
+
+
+def test_save_json_returns_questionnaire() -> None:
+    client = TestClient(create_app())
+    response = client.post(
+        "/api/questionnaire/save/json",
+        content=fixture_path.read_bytes(),
+        headers={"Content-Type": "application/json"},
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/json"
+    assert 'filename="Popstan_Household_Survey.json"' in response.headers["content-disposition"]
+    assert response.json()["title"] == "Popstan Household Survey"
+
+
+def test_save_reuses_cached_export_and_honors_etag() -> None:
+    app = create_app()
+    cache = ExportCache()
+    app.dependency_overrides[routes.get_export_cache] = lambda: cache
+    client = TestClient(app)
+    body = fixture_path.read_bytes()
+    headers = {"Content-Type": "application/json"}
+
+    first = client.post("/api/questionnaire/save/cspro", content=body, headers=headers)
+    assert first.status_code == 200
+    etag = first.headers["etag"]
+    assert len(cache) == 1
+
+    # Re-serialized with different formatting, the questionnaire content is unchanged
+    reformatted = json.dumps(json.loads(body))
+    with patch.object(CSProWriter, "write") as write:
+        second = client.post("/api/questionnaire/save/cspro", content=reformatted, headers=headers)
+        write.assert_not_called()
+    assert second.status_code == 200
+    assert second.headers["etag"] == etag
+    assert second.content == first.content
+
+    unchanged = client.post("/api/questionnaire/save/cspro", content=body, headers={**headers, "If-None-Match": etag})
+    assert unchanged.status_code == 412
+    assert unchanged.headers["etag"] == etag
+
+    json_export = client.post("/api/questionnaire/save/json", content=body, headers={**headers, "If-None-Match": etag})
+    assert json_export.status_code == 200
+    assert json_export.headers["etag"] != etag